@@ -3,9 +3,23 @@ import requests
 import subprocess
 import time
 import os
+import sys
+import signal
+import shutil
+import tempfile
 import logging
 from pathlib import Path
 import json
+import copy
+import hashlib
+import importlib
+import uuid
+from unittest import mock
+from urllib.parse import urlsplit
+from filelock import FileLock
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from perf.results import percentile
 from _pytest.config import Config
 from _pytest.reports import TestReport
 
@@ -15,13 +29,44 @@ logging.basicConfig(level=logging.INFO,
 logger = logging.getLogger(__name__)
 
 # Define test constants
-API_BASE_URL = "http://localhost:5000"
+API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:5000")
 # 경로 처리를 위해 Path 객체 사용
 TEST_DATA_DIR = Path(os.path.dirname(__file__)) / "test_data"
+MOCK_SERVER_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent / "mock_server"
+
+# 공유 API 서버 상태 (pytest-xdist 워커 간 공유)
+SERVER_STATE_FILE = "api_server.json"
+SERVER_LOCK_FILE = "api_server.lock"
+SERVER_LOG_FILE = "api_server.log"
+SERVER_READY_FILE = "api_server.ready"
+# 서버 기동 대기 시간 기본값 (API_SERVER_START_TIMEOUT 환경 변수로 변경)
+SERVER_START_TIMEOUT_S = 300
+SERVER_READY_POLL_S = 0.05
+
+# API 테스트 모드: "http" (실제 서버) 또는 "inprocess" (Flask 테스트 클라이언트 + 초소형 모델)
+API_TEST_MODE = os.environ.get("API_TEST_MODE", "http")
+INPROCESS_BASE_URL = "http://inprocess.test"
 
 # 요구사항 추적을 위한 전역 저장소
 REQUIREMENT_TEST_RESULTS = {}
 
+# 요구사항 추적 결과 파일 및 워커별 부분 결과 디렉토리
+TRACE_RESULTS_DIR = Path(os.path.dirname(os.path.abspath(__file__))).parent / "scripts" / "temp"
+TRACE_RESULTS_FILE = TRACE_RESULTS_DIR / "req_test_results.json"
+TRACE_PARTS_DIR = TRACE_RESULTS_DIR / "req_trace_parts"
+
+# 증분 실행: 이전 실행의 테스트별 입력 지문/결과 (pytest 캐시 키)
+API_TESTS_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+INCREMENTAL_CACHE_KEY = "lunitcare/incremental"
+# 모든 테스트가 공통으로 의존하는 입력 (서버 소스, 테스트 데이터, 스키마, 픽스처/측정 코드)
+INCREMENTAL_SHARED_INPUTS = (
+    (MOCK_SERVER_DIR, ("*.py", "requirements.txt")),
+    (API_TESTS_DIR / "test_data", ("**/*",)),
+    (API_TESTS_DIR / "schemas", ("**/*",)),
+    (API_TESTS_DIR, ("conftest.py", "perf/*.py")),
+)
+INCREMENTAL_ENV_INPUTS = ("MODEL_NAME", "API_TEST_MODE", "API_BASE_URL")
+
 # ISO 13485 요구사항 ID 데코레이터
 def req_id(*ids):
     """
@@ -55,68 +100,308 @@ def ensure_test_images():
     
     return True
 
-@pytest.fixture(scope="session")
-def api_server(ensure_test_images):
-    """Start mock API server if not already running, or validate connection"""
-    # First, check if the server is already running
+def _server_ready(base_url):
+    """서버가 요청을 처리할 수 있는 상태인지 확인"""
     try:
-        response = requests.get(f"{API_BASE_URL}/analyze/metadata")
-        if response.status_code == 200:
-            logger.info("API server already running - using existing instance")
-            return API_BASE_URL
-    except requests.exceptions.ConnectionError:
-        logger.info("API server not detected - attempting to start server")
-    
-    # If not running, try to start it
-    try:
-        # Adjust paths based on your project structure
-        server_dir = "../mock_server"
-        server_process = subprocess.Popen(
-            ["python", "app.py"],
-            cwd=server_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        # Wait for server to start (max 10 seconds)
-        max_wait = 10
-        for i in range(max_wait):
-            try:
-                response = requests.get(f"{API_BASE_URL}/analyze/metadata")
-                if response.status_code == 200:
-                    logger.info(f"API server started successfully after {i+1} seconds")
-                    break
-            except requests.exceptions.ConnectionError:
-                if i == max_wait - 1:
-                    stdout, stderr = server_process.communicate(timeout=1)
-                    logger.error(f"Server failed to start. Stdout: {stdout.decode()}, Stderr: {stderr.decode()}")
-                    server_process.kill()
-                    pytest.fail(f"Could not start API server after {max_wait} seconds")
-                time.sleep(1)
-        
-        # Register finalizer to shut down server after tests
-        def finalizer():
+        return requests.get(f"{base_url}/analyze/metadata", timeout=2).status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
+class SharedApiServer:
+    """
+    세션(및 pytest-xdist 워커) 간에 하나의 API 서버를 공유하는 pytest 플러그인
+
+    상태 디렉토리의 파일 잠금 아래에서 처음 서버가 필요한 워커가 실행 중인 서버를 채택하거나
+    임시 포트로 새 서버를 시작하고, 나머지 워커는 상태 파일에서 같은 서버를 찾아 사용합니다.
+    상태 디렉토리는 컨트롤러가 만들어 workerinput 으로 워커에 전달하며, 직접 시작한 서버는
+    모든 워커가 끝난 뒤 컨트롤러의 세션 종료 시점에 정리합니다.
+    """
+    def __init__(self, config):
+        self.config = config
+        workerinput = getattr(config, "workerinput", None)
+        self.is_controller = workerinput is None
+        if self.is_controller:
+            self.state_dir = Path(tempfile.mkdtemp(prefix="lunitcare-qa-server-"))
+        else:
+            self.state_dir = Path(workerinput["api_server_state_dir"])
+        self.state_path = self.state_dir / SERVER_STATE_FILE
+        self.lock = FileLock(str(self.state_dir / SERVER_LOCK_FILE))
+        self.process = None
+        self.startup = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        """xdist 워커에 상태 디렉토리 전달"""
+        node.workerinput["api_server_state_dir"] = str(self.state_dir)
+
+    def _read_state(self):
+        if not self.state_path.exists():
+            return None
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _write_state(self, state):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def acquire(self):
+        """
+        공유 서버의 기본 URL 반환 (필요 시 채택 또는 시작)
+
+        Returns:
+            str: API 서버 기본 URL
+        """
+        with self.lock:
+            state = self._read_state()
+            if state and _server_ready(state["url"]):
+                return state["url"]
+
+            if _server_ready(API_BASE_URL):
+                logger.info(f"API server already running - using existing instance: {API_BASE_URL}")
+                self._write_state({"url": API_BASE_URL, "pid": None, "owned": False})
+                return API_BASE_URL
+
+            state = self._start_server()
+            self._write_state(state)
+            return state["url"]
+
+    def _start_server(self):
+        """
+        임시 포트(PORT=0)로 서버를 시작하고 준비 완료 신호(ready 파일)를 기다림
+
+        서버는 모델 로딩/워밍업과 포트 바인딩을 마친 뒤 READY_FILE 에 {"pid", "port", "startup_s"} 를
+        원자적으로 기록합니다. 서버 출력은 로그 파일로 저장합니다 (읽지 않는 PIPE 는 버퍼가 차면 교착됨).
+        """
+        ready_path = self.state_dir / SERVER_READY_FILE
+        log_path = self.state_dir / SERVER_LOG_FILE
+        timeout = float(os.environ.get("API_SERVER_START_TIMEOUT", SERVER_START_TIMEOUT_S))
+        logger.info("API server not detected - starting shared server")
+        # 응답하지 않는 이전 서버를 다시 시작하는 경우, 남은 ready 파일을 새 서버의 신호로 읽지 않도록 삭제
+        ready_path.unlink(missing_ok=True)
+
+        started = time.monotonic()
+        with open(log_path, "wb") as log_file:
+            self.process = subprocess.Popen(
+                [sys.executable, "app.py"],
+                cwd=str(MOCK_SERVER_DIR),
+                env=dict(os.environ, PORT="0", HOST="127.0.0.1", READY_FILE=str(ready_path)),
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+
+        while not ready_path.exists():
+            if self.process.poll() is not None or time.monotonic() - started > timeout:
+                self.process.kill()
+                self.process.wait()
+                pytest.fail(f"Could not start API server within {timeout:g} seconds (log: {log_path}):\n"
+                            f"{log_path.read_text(errors='replace')[-2000:]}")
+            time.sleep(SERVER_READY_POLL_S)
+
+        with open(ready_path) as f:
+            ready = json.load(f)
+        wait_s = time.monotonic() - started
+        logger.info(f"API server ready on port {ready['port']} after {wait_s:.2f} seconds "
+                    f"(server startup {ready['startup_s']:.2f} seconds)")
+        return {
+            "url": f"http://127.0.0.1:{ready['port']}",
+            "pid": self.process.pid,
+            "owned": True,
+            "startup_s": ready["startup_s"],
+            "wait_s": wait_s,
+        }
+
+    def shutdown(self):
+        """직접 시작한 서버 종료 및 상태 디렉토리 정리"""
+        state = self._read_state()
+        if state and state.get("owned"):
+            self.startup = state
             logger.info("Shutting down API server")
-            server_process.kill()
-            server_process.wait()
-        
-        pytest.register_fixture_finalizer(id(server_process), finalizer)
-        
-    except Exception as e:
-        logger.error(f"Failed to start API server: {str(e)}")
-        pytest.fail(f"Could not start API server: {str(e)}")
-    
-    return API_BASE_URL
+            if self.process is not None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+            else:
+                # 다른 워커 프로세스가 시작한 서버
+                try:
+                    os.kill(state["pid"], signal.SIGTERM)
+                except OSError:
+                    pass
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        """모든 워커 종료 후(컨트롤러) 공유 서버 정리"""
+        if self.is_controller:
+            self.shutdown()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """공유 서버를 직접 시작한 경우 기동 시간 보고"""
+        if self.startup:
+            terminalreporter.write_line(
+                f"API server startup: {self.startup['startup_s']:.2f}s "
+                f"(fixture wait {self.startup['wait_s']:.2f}s)"
+            )
+
+
+@pytest.fixture(scope="session")
+def api_server(request, ensure_test_images):
+    """공유 API 서버의 기본 URL (실행 중인 서버 채택 또는 새로 시작)"""
+    return request.config.pluginmanager.get_plugin("shared_api_server").acquire()
+
+class FlaskAppAdapter(BaseAdapter):
+    """
+    requests 요청을 Flask 테스트 클라이언트로 전달하는 트랜스포트 어댑터
+
+    테스트 코드는 HTTP 모드와 동일하게 requests.Session API 를 사용하고, 세션에 이 어댑터를
+    마운트하면 소켓 없이 같은 프로세스의 앱이 요청을 처리합니다.
+    """
+    def __init__(self, app):
+        super().__init__()
+        self.app = app
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        body = request.body
+        if hasattr(body, "read"):
+            body = body.read()
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        headers = {k: v for k, v in request.headers.items() if k.lower() != "content-length"}
+
+        result = self.app.test_client().open(
+            url.path, method=request.method, query_string=url.query, headers=headers, data=body or b""
+        )
+
+        response = requests.Response()
+        response.status_code = result.status_code
+        response.reason = result.status.partition(" ")[2]
+        response.headers = CaseInsensitiveDict(result.headers.items())
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = result.get_data()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _load_inprocess_app():
+    """mock_server 앱을 초소형 랜덤 가중치 모델로 현재 프로세스에 로딩"""
+    from tiny_model import TINY_MODEL_NAME
+
+    with mock.patch.dict(os.environ, {"MODEL_NAME": TINY_MODEL_NAME}):
+        return importlib.import_module("app").app
+
+
+@pytest.fixture(scope="session")
+def api_test_mode():
+    """API 테스트 모드 (API_TEST_MODE 환경 변수, 모듈/디렉토리 conftest 에서 재정의 가능)"""
+    return API_TEST_MODE
+
+@pytest.fixture(scope="session")
+def inprocess_app():
+    """초소형 모델을 사용하는 mock_server Flask 앱 (네트워크/모델 다운로드 없음)"""
+    if str(MOCK_SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(MOCK_SERVER_DIR))
+    started = time.monotonic()
+    app = _load_inprocess_app()
+    logger.info(f"In-process API app loaded in {time.monotonic() - started:.2f} seconds")
+    return app
+
+@pytest.fixture
+def api_base_url(request, api_test_mode):
+    """
+    테스트 대상 API 기본 URL
+
+    inprocess 모드에서도 real_model 마커가 있는 테스트(정확도/성능)는 실제 모델 서버를 사용합니다.
+    """
+    if api_test_mode == "inprocess" and request.node.get_closest_marker("real_model") is None:
+        request.getfixturevalue("inprocess_app")
+        return INPROCESS_BASE_URL
+    return request.getfixturevalue("api_server")
 
 @pytest.fixture
-def api_url(api_server):
+def api_client(request, api_base_url):
+    """API 요청용 requests 세션 (inprocess 모드에서는 Flask 테스트 클라이언트로 전달)"""
+    session = requests.Session()
+    if api_base_url == INPROCESS_BASE_URL:
+        session.mount(INPROCESS_BASE_URL, FlaskAppAdapter(request.getfixturevalue("inprocess_app")))
+    yield session
+    session.close()
+
+@pytest.fixture
+def api_url(api_base_url):
     """Return the base API URL"""
-    return f"{api_server}/analyze"
+    return f"{api_base_url}/analyze"
 
 @pytest.fixture
-def metadata_url(api_server):
+def metadata_url(api_base_url):
     """Return the metadata API URL"""
-    return f"{api_server}/analyze/metadata"
+    return f"{api_base_url}/analyze/metadata"
+
+@pytest.fixture
+def error_url(api_base_url):
+    """Return the error simulation API URL"""
+    return f"{api_base_url}/analyze/error"
+
+def _file_digest(file_path):
+    """업로드 파일 내용의 SHA-256 해시"""
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class AnalysisCache:
+    """
+    세션 동안 (URL, 업로드 필드, 파일 내용 해시, 폼 데이터) 별 분석 응답을 한 번만 요청하여 공유
+
+    응답은 복사본으로 반환하므로 한 테스트에서 응답을 수정해도 다른 테스트에 영향을 주지 않습니다.
+    """
+    def __init__(self):
+        self.responses = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, client, url, file_path, field="file", data=None):
+        key = (url, field, _file_digest(file_path), json.dumps(data, sort_keys=True) if data else None)
+        if key in self.responses:
+            self.hits += 1
+        else:
+            with open(file_path, "rb") as f:
+                self.responses[key] = client.post(url, files={field: f}, data=data)
+            self.misses += 1
+        return copy.deepcopy(self.responses[key])
+
+
+@pytest.fixture(scope="session")
+def analysis_cache():
+    """세션 단위 분석 응답 캐시"""
+    cache = AnalysisCache()
+    yield cache
+    logger.info(f"분석 응답 캐시: 요청 {cache.misses}회, 재사용 {cache.hits}회")
+
+@pytest.fixture
+def analyze(request, api_client, api_url, analysis_cache):
+    """
+    테스트 이미지의 분석 응답을 반환하는 함수: analyze(file_path, field="file", data=None)
+
+    응답 내용만 검사하는 테스트가 같은 파일의 분석 결과를 공유하도록 세션 캐시를 사용합니다.
+    응답 시간이나 반복 요청 간 일관성을 측정하는 테스트는 fresh_analysis 마커로 매번 새로 요청합니다.
+    """
+    fresh = request.node.get_closest_marker("fresh_analysis") is not None
+
+    def _analyze(file_path, field="file", data=None):
+        if fresh:
+            with open(file_path, "rb") as f:
+                return api_client.post(api_url, files={field: f}, data=data)
+        return analysis_cache.get(api_client, api_url, file_path, field, data)
+
+    return _analyze
 
 @pytest.fixture(scope="session")
 def expected_model_info():
@@ -152,68 +437,285 @@ def invalid_file():
         pytest.skip(f"Test file {file_path} not found")
     return str(file_path)
 
+def _latency_budget(marker):
+    """latency_budget 마커 인자 해석: latency_budget(threshold_ms, percentile=95, repetitions=5, warmup=1)"""
+    def _budget(threshold_ms, percentile=95, repetitions=5, warmup=1):
+        if repetitions < 1:
+            raise ValueError("latency_budget repetitions 는 1 이상이어야 합니다")
+        return {"threshold_ms": threshold_ms, "percentile": percentile, "repetitions": repetitions, "warmup": warmup}
+    return _budget(*marker.args, **marker.kwargs)
+
+
+class LatencyBudgetPlugin:
+    """
+    latency_budget 마커가 있는 테스트 본문을 워밍업 후 반복 실행하여 지연 시간 예산을 검증하는 pytest 플러그인
+
+    반복마다 테스트 본문(요청 + 기능 검증) 실행 시간을 측정하고, 지정한 백분위수(또는 "mean")가
+    임계값을 넘으면 실패 처리합니다. 측정 분포는 user_properties 로 보고되어 요구사항 추적 결과에 기록됩니다.
+    """
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_pyfunc_call(self, pyfuncitem):
+        marker = pyfuncitem.get_closest_marker("latency_budget")
+        if marker is None:
+            return None
+
+        budget = _latency_budget(marker)
+        testfunction = pyfuncitem.obj
+        testargs = {arg: pyfuncitem.funcargs[arg] for arg in pyfuncitem._fixtureinfo.argnames}
+
+        for _ in range(budget["warmup"]):
+            testfunction(**testargs)
+        samples = []
+        for _ in range(budget["repetitions"]):
+            started = time.perf_counter()
+            testfunction(**testargs)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        if budget["percentile"] == "mean":
+            measured = sum(samples) / len(samples)
+            label = "mean"
+        else:
+            measured = percentile(samples, budget["percentile"])
+            label = f"p{budget['percentile']}"
+        result = dict(budget, statistic=label, measured_ms=round(measured, 2),
+                      samples_ms=[round(sample, 2) for sample in samples], passed=measured <= budget["threshold_ms"])
+        pyfuncitem.user_properties.append(("latency_budget", result))
+
+        if not result["passed"]:
+            pytest.fail(f"지연 시간 예산 초과: {label}={measured:.1f}ms > {budget['threshold_ms']}ms "
+                        f"(반복 {budget['repetitions']}회, 워밍업 {budget['warmup']}회)")
+        return True
+
+
+def _write_json_atomic(path, data):
+    """임시 파일에 기록한 뒤 교체하여 읽는 쪽이 부분적으로 쓰인 파일을 보지 않도록 저장"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def merge_trace_parts(parts_dir):
+    """
+    워커별 부분 결과(노드 ID 별 결과)를 요구사항 ID 별 결과로 병합
+
+    하나라도 실패/오류가 있으면 Failed, 통과가 있으면 Passed, 모두 건너뛴 경우 NotRun 입니다.
+
+    Returns:
+        dict: {요구사항 ID: {"tests": [노드 ID], "status", "results": {노드 ID: {"outcome", "duration"}}}}
+    """
+    results = {}
+    for part_path in sorted(Path(parts_dir).glob("*.json")):
+        with open(part_path, encoding="utf-8") as f:
+            part = json.load(f)
+        for nodeid, entry in part.items():
+            for req_id in entry["req_ids"]:
+                requirement = results.setdefault(req_id, {"tests": [], "status": "NotRun", "results": {}})
+                if nodeid not in requirement["results"]:
+                    requirement["tests"].append(nodeid)
+                requirement["results"][nodeid] = {key: value for key, value in entry.items() if key != "req_ids"}
+
+    for requirement in results.values():
+        requirement["tests"].sort()
+        outcomes = {result["outcome"] for result in requirement["results"].values()}
+        if outcomes & {"failed", "error"}:
+            requirement["status"] = "Failed"
+        elif "passed" in outcomes:
+            requirement["status"] = "Passed"
+    return dict(sorted(results.items()))
+
+
 # ISO 13485 요구사항 추적을 위한 플러그인
 class RequirementTracePlugin:
     """
     테스트 결과를 캡처하여 요구사항 추적 정보를 생성하는 pytest 플러그인
+
+    각 프로세스(xdist 워커 또는 단일 세션)는 노드 ID 별 결과(outcome, duration)를 실행 ID
+    디렉토리에 부분 결과 파일로 저장하고, 모든 워커가 끝난 뒤 컨트롤러가 이를 병합하여
+    req_test_results.json 을 원자적으로 교체합니다.
     """
     def __init__(self, config):
         self.config = config
-        self.requirement_results = {}
-        self.test_to_req_map = {}
-    
-    @pytest.hookimpl(hookwrapper=True)
-    def pytest_runtest_protocol(self, item, nextitem):
-        """테스트 시작 전 요구사항 ID 매핑 준비"""
-        for marker in item.iter_markers(name="req_id"):
-            req_ids = marker.args[0]
-            for req_id in req_ids:
-                if req_id not in self.requirement_results:
-                    self.requirement_results[req_id] = {"tests": [], "status": "NotRun"}
-                # 요구사항 ID와 테스트 이름 매핑 저장
-                test_name = item.name
-                self.test_to_req_map[test_name] = req_ids
-                self.requirement_results[req_id]["tests"].append(test_name)
-        
-        yield
-    
+        workerinput = getattr(config, "workerinput", None)
+        self.is_controller = workerinput is None
+        self.worker_id = "master" if self.is_controller else workerinput["workerid"]
+        self.run_id = uuid.uuid4().hex if self.is_controller else workerinput["req_trace_run_id"]
+        self.test_results = {}
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        """xdist 워커에 실행 ID 전달"""
+        node.workerinput["req_trace_run_id"] = self.run_id
+
     @pytest.hookimpl(hookwrapper=True)
     def pytest_runtest_makereport(self, item, call):
-        """테스트 실행 후 결과를 요구사항 추적에 반영"""
+        """테스트 단계(setup/call/teardown) 결과를 노드 ID 별로 기록"""
         outcome = yield
         report = outcome.get_result()
-        
-        if report.when == "call":  # 테스트 실행 단계에서만 처리
-            test_name = item.name
-            if test_name in self.test_to_req_map:
-                req_ids = self.test_to_req_map[test_name]
-                for req_id in req_ids:
-                    if report.passed:
-                        if self.requirement_results[req_id]["status"] != "Failed":
-                            self.requirement_results[req_id]["status"] = "Passed"
-                    else:
-                        self.requirement_results[req_id]["status"] = "Failed"
-    
+
+        req_ids = [req_id for marker in item.iter_markers(name="req_id") for req_id in marker.args[0]]
+        if not req_ids:
+            return
+
+        entry = self.test_results.setdefault(item.nodeid, {
+            "req_ids": list(dict.fromkeys(req_ids)),
+            "outcome": "passed",
+            "duration": 0.0,
+        })
+        if report.when == "call":
+            entry["duration"] = round(report.duration, 4)
+            latency = dict(report.user_properties).get("latency_budget")
+            if latency is not None:
+                entry["latency"] = latency
+        if report.failed:
+            entry["outcome"] = "failed" if report.when == "call" else "error"
+        elif report.skipped and entry["outcome"] == "passed":
+            entry["outcome"] = "skipped"
+
+    def record_reused(self, item, previous):
+        """증분 실행으로 선택 해제된 테스트의 이전 통과 결과 기록"""
+        req_ids = [req_id for marker in item.iter_markers(name="req_id") for req_id in marker.args[0]]
+        if not req_ids:
+            return
+        entry = {"req_ids": list(dict.fromkeys(req_ids)), "outcome": "passed",
+                 "duration": previous.get("duration", 0.0), "reused": True}
+        if previous.get("latency") is not None:
+            entry["latency"] = previous["latency"]
+        self.test_results[item.nodeid] = entry
+
     def pytest_sessionfinish(self, session, exitstatus):
-        """테스트 세션 종료 시 결과 저장"""
+        """부분 결과 저장 후 (컨트롤러) 병합 결과 저장"""
         global REQUIREMENT_TEST_RESULTS
-        REQUIREMENT_TEST_RESULTS = self.requirement_results
-        
-        # JSON 파일로 결과 저장
-        results_dir = Path(os.path.dirname(__file__)) / ".." / "scripts" / "temp"
-        results_dir.mkdir(exist_ok=True, parents=True)
-        
-        with open(results_dir / "req_test_results.json", "w") as f:
-            json.dump(self.requirement_results, f, indent=2)
-        
-        logger.info(f"요구사항 추적 결과가 저장되었습니다: {results_dir / 'req_test_results.json'}")
+
+        parts_dir = TRACE_PARTS_DIR / self.run_id
+        parts_dir.mkdir(exist_ok=True, parents=True)
+        _write_json_atomic(parts_dir / f"{self.worker_id}.json", self.test_results)
+        if not self.is_controller:
+            return
+
+        REQUIREMENT_TEST_RESULTS = merge_trace_parts(parts_dir)
+        _write_json_atomic(TRACE_RESULTS_FILE, REQUIREMENT_TEST_RESULTS)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+        logger.info(f"요구사항 추적 결과가 저장되었습니다: {TRACE_RESULTS_FILE}")
+
+
+def _digest_inputs(digest, base_dir, patterns):
+    for pattern in patterns:
+        for path in sorted(base_dir.glob(pattern)):
+            if path.is_file() and "__pycache__" not in path.parts:
+                digest.update(str(path.relative_to(base_dir)).encode("utf-8"))
+                digest.update(path.read_bytes())
+
+
+class IncrementalSelectionPlugin:
+    """
+    입력이 바뀌지 않은 테스트를 건너뛰는 증분 실행 pytest 플러그인 (--incremental)
+
+    테스트 지문은 공통 입력(서버 소스, 모델/모드 환경 변수, 테스트 데이터, 스키마, conftest/perf)과
+    테스트 모듈 파일의 해시입니다. 이전 실행에서 같은 지문으로 통과한 테스트는 선택 해제하고,
+    요구사항 추적 결과에는 이전 통과 결과를 그대로 기록합니다. 결과는 모든 실행에서
+    (xdist 사용 시 컨트롤러가) pytest 캐시에 저장하며, --full-run 은 캐시를 무시하고 전체를 실행합니다.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config.getoption("incremental") and not config.getoption("full_run")
+        self.cache = getattr(config, "cache", None)
+        self.is_controller = not hasattr(config, "workerinput")
+        self.outcomes = {}
+        self._shared_digest = None
+        self._fingerprints = {}
+
+    def _shared(self):
+        if self._shared_digest is None:
+            digest = hashlib.sha256()
+            for base_dir, patterns in INCREMENTAL_SHARED_INPUTS:
+                _digest_inputs(digest, base_dir, patterns)
+            for name in INCREMENTAL_ENV_INPUTS:
+                digest.update(f"{name}={os.environ.get(name, '')}".encode("utf-8"))
+            self._shared_digest = digest.hexdigest()
+        return self._shared_digest
+
+    def fingerprint(self, module_path):
+        """테스트 모듈 단위 입력 지문"""
+        module_path = Path(module_path).resolve()
+        if module_path not in self._fingerprints:
+            digest = hashlib.sha256(self._shared().encode("utf-8"))
+            digest.update(module_path.read_bytes())
+            self._fingerprints[module_path] = digest.hexdigest()
+        return self._fingerprints[module_path]
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, session, config, items):
+        """이전과 같은 지문으로 통과한 테스트 선택 해제"""
+        if not self.enabled or self.cache is None:
+            return
+        previous = self.cache.get(INCREMENTAL_CACHE_KEY, {})
+        selected, reused = [], []
+        for item in items:
+            entry = previous.get(item.nodeid)
+            if entry and entry["outcome"] == "passed" and entry["fingerprint"] == self.fingerprint(item.path):
+                reused.append(item)
+            else:
+                selected.append(item)
+        if not reused:
+            return
+
+        trace = config.pluginmanager.get_plugin("requirement_trace_plugin")
+        for item in reused:
+            trace.record_reused(item, previous[item.nodeid])
+        config.hook.pytest_deselected(items=reused)
+        items[:] = selected
+
+    def pytest_runtest_logreport(self, report):
+        """테스트 결과 수집 (xdist 사용 시 컨트롤러가 모든 워커의 결과를 수신)"""
+        if not self.is_controller:
+            return
+        state = self.outcomes.setdefault(report.nodeid, {"fspath": report.fspath, "outcome": "passed", "duration": 0.0})
+        if report.when == "call":
+            state["duration"] = round(report.duration, 4)
+            state["latency"] = dict(report.user_properties).get("latency_budget")
+        if report.failed:
+            state["outcome"] = "failed"
+        elif report.skipped and state["outcome"] == "passed":
+            state["outcome"] = "skipped"
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        """이번 실행 결과와 지문을 캐시에 저장 (선택 해제된 테스트는 이전 결과 유지)"""
+        if not self.is_controller or self.cache is None or not self.outcomes:
+            return
+        previous = self.cache.get(INCREMENTAL_CACHE_KEY, {})
+        for nodeid, state in self.outcomes.items():
+            previous[nodeid] = {
+                "fingerprint": self.fingerprint(session.config.rootpath / state["fspath"]),
+                "outcome": state["outcome"],
+                "duration": state["duration"],
+                "latency": state.get("latency"),
+            }
+        self.cache.set(INCREMENTAL_CACHE_KEY, previous)
+
+
+def pytest_addoption(parser):
+    """증분 실행 옵션"""
+    group = parser.getgroup("lunitcare", "LunitCare QA")
+    group.addoption("--incremental", action="store_true", default=False,
+                    help="입력 지문이 같고 이전 실행에서 통과한 테스트는 건너뜀")
+    group.addoption("--full-run", action="store_true", default=False,
+                    help="--incremental 을 무시하고 전체 테스트 실행 (결과는 캐시에 갱신)")
 
 
 def pytest_configure(config):
     """pytest 설정 시 요구사항 추적 플러그인 등록"""
     # 요구사항 ID 마커 등록
     config.addinivalue_line("markers", "req_id(ids): ISO 13485 요구사항 추적을 위한 ID 매핑")
+    config.addinivalue_line("markers", "real_model: 실제 모델 서버가 필요한 테스트 (inprocess 모드에서도 HTTP 사용)")
+    config.addinivalue_line("markers", "fresh_analysis: analyze 픽스처의 세션 캐시를 사용하지 않고 매번 새로 요청")
+    config.addinivalue_line("markers", "latency_budget(threshold_ms, percentile=95, repetitions=5, warmup=1): "
+                                       "테스트 본문을 반복 실행하여 지연 시간 백분위수(또는 \"mean\") 예산 검증")
     
     # 플러그인 등록
     plugin = RequirementTracePlugin(config)
-    config.pluginmanager.register(plugin, "requirement_trace_plugin") 
\ No newline at end of file
+    config.pluginmanager.register(plugin, "requirement_trace_plugin")
+    config.pluginmanager.register(SharedApiServer(config), "shared_api_server")
+    config.pluginmanager.register(LatencyBudgetPlugin(), "latency_budget_plugin")
+    config.pluginmanager.register(IncrementalSelectionPlugin(config), "incremental_selection_plugin") 
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""
+LunitCare QA 성능 측정 도구 모음
+
+벤치마크 테스트는 원시 결과(JSON)만 기록하고, 차트/리포트 렌더링은
+`python -m perf.report` 로 필요할 때 별도로 수행합니다.
+"""
+
+from perf.results import RESULTS_DIR, load_history, load_results, percentile, save_results, summarize
+
+__all__ = [
+    "RESULTS_DIR",
+    "load_history",
+    "load_results",
+    "percentile",
+    "save_results",
+    "summarize",
+]
@@ -0,0 +1,254 @@
+"""
+해상도/포맷 스케일링 벤치마크용 합성 이미지 코퍼스
+
+해상도(224 ~ 4096), 비트 깊이(8/16), 채널(그레이스케일/RGB), 포맷(JPEG 품질별, PNG)의
+격자(grid)로 결정적인(deterministic) 합성 X-ray 유사 이미지를 생성합니다. 같은 해상도는
+같은 시드를 사용하므로 포맷/품질만 다른 셀끼리 픽셀 내용이 동일하며, 이미 생성된 파일은
+재사용합니다.
+
+각 셀을 서버에 업로드하여 Server-Timing 의 decode/preprocess/total 시간을 측정하고,
+지연 시간이 픽셀 수(MP)와 파일 크기(MB) 중 어느 쪽에 비례하는지 선형 회귀로 비교합니다.
+
+사용법:
+$ cd api_tests && python -m perf.corpus --generate-only
+$ python -m perf.corpus --repetitions 3
+$ SCALING_BENCHMARK=1 pytest test_performance.py -k scaling -s     # 축소 격자 (SCALING_FULL_GRID=1 이면 전체)
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from itertools import product
+
+from perf.results import save_results
+from perf.timing import timed_post
+
+# 픽셀 생성 방식이 바뀌면 이름을 올려 이전에 생성된 셀을 재사용하지 않음
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "lunitcare-qa-corpus-v2")
+MANIFEST_FILE = "manifest.json"
+
+RESOLUTIONS = (224, 512, 1024, 2048, 4096)
+# (PIL 모드 이름, 채널 수, 비트 깊이)
+PIXEL_FORMATS = (("L8", 1, 8), ("L16", 1, 16), ("RGB8", 3, 8))
+# (포맷, JPEG 품질) - 16비트는 PNG 로만 저장 가능
+ENCODINGS = (("JPEG", 50), ("JPEG", 75), ("JPEG", 95), ("PNG", None))
+
+# pytest 실행용 축소 격자 (4096 은 SCALING_FULL_GRID 에서만)
+QUICK_GRID = {
+    "resolutions": (224, 1024, 2048),
+    "pixel_formats": ("L8", "RGB8"),
+    "encodings": (("JPEG", 75), ("PNG", None)),
+}
+
+SCALING_METRICS = ("decode", "preprocess", "total", "response_time")
+
+
+def _synthetic_pixels(size, channels, bit_depth, seed):
+    """
+    흉부 X-ray 와 유사한 밝기 분포(방사형 감쇠 + 늑골 무늬 + 잡음)의 픽셀 배열
+
+    16비트(I;16) 이미지는 서버의 convert("RGB") 가 255 에서 잘라내므로, 전체 범위(0~65535)로 만들면
+    변환 후 거의 흰색이 되어 전처리/추론이 퇴화한 입력을 측정하게 됩니다. 16비트 셀도 0~255 범위
+    값으로 만들어 16비트 PNG 디코딩 비용은 그대로 두고 변환 후 이미지는 8비트 셀과 같게 합니다.
+    """
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    yy, xx = np.ogrid[0:size, 0:size]
+    yy = yy.astype(np.float32) / size
+    xx = xx.astype(np.float32) / size
+    image = 0.85 - 1.4 * ((xx - 0.5) ** 2 + (yy - 0.45) ** 2)
+    image = image + 0.08 * np.sin(yy * 28 * np.pi) * np.exp(-((xx - 0.5) ** 2) * 6)
+    image = image + rng.normal(0, 0.04, (size, size)).astype(np.float32)
+    if channels == 3:
+        tint = rng.normal(0, 0.01, (size, size, 3)).astype(np.float32)
+        image = image[:, :, None] + tint
+    image = np.clip(image, 0.0, 1.0)
+    if bit_depth == 16:
+        return (image * 255).astype(np.uint16)
+    return (image * 255).astype(np.uint8)
+
+
+def cell_name(resolution, pixel_format, encoding, quality):
+    suffix = f"q{quality}" if quality else ""
+    extension = "jpg" if encoding == "JPEG" else "png"
+    return f"{resolution}_{pixel_format}_{encoding.lower()}{suffix}.{extension}"
+
+
+def iter_grid(resolutions=RESOLUTIONS, pixel_formats=None, encodings=ENCODINGS):
+    """유효한 (해상도, 픽셀 포맷, 인코딩, 품질) 조합"""
+    formats = [f for f in PIXEL_FORMATS if pixel_formats is None or f[0] in pixel_formats]
+    for resolution, (name, channels, bit_depth), (encoding, quality) in product(resolutions, formats, encodings):
+        if bit_depth == 16 and encoding != "PNG":
+            continue
+        yield resolution, name, channels, bit_depth, encoding, quality
+
+
+def generate_corpus(output_dir=DEFAULT_CORPUS_DIR, resolutions=RESOLUTIONS, pixel_formats=None, encodings=ENCODINGS):
+    """
+    격자의 모든 셀 이미지를 생성 (이미 있으면 재사용)
+
+    Returns:
+        list: 셀 정보 dict 목록 (path, width, height, pixel_format, bit_depth, format, quality, bytes, megapixels)
+    """
+    from PIL import Image
+
+    os.makedirs(output_dir, exist_ok=True)
+    cells = []
+    pixels_cache = {}
+    for resolution, name, channels, bit_depth, encoding, quality in iter_grid(resolutions, pixel_formats, encodings):
+        path = os.path.join(output_dir, cell_name(resolution, name, encoding, quality))
+        if not os.path.exists(path):
+            key = (resolution, channels, bit_depth)
+            if key not in pixels_cache:
+                # 같은 해상도는 같은 시드 -> 포맷/품질만 다른 셀끼리 내용 동일
+                pixels_cache = {key: _synthetic_pixels(resolution, channels, bit_depth, seed=resolution)}
+            image = Image.fromarray(pixels_cache[key])
+            options = {"quality": quality} if encoding == "JPEG" else {"optimize": False}
+            tmp_path = f"{path}.tmp"
+            image.save(tmp_path, format=encoding, **options)
+            os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        cells.append({
+            "path": path,
+            "width": resolution,
+            "height": resolution,
+            "pixel_format": name,
+            "bit_depth": bit_depth,
+            "format": encoding,
+            "quality": quality,
+            "bytes": size,
+            "megapixels": resolution * resolution / 1e6,
+        })
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(cells, f, indent=2)
+    return cells
+
+
+def _median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _linear_fit(xs, ys):
+    """최소제곱 직선 (기울기, 절편, 결정계수 R²)"""
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if n < 2 or var_x == 0:
+        return 0.0, mean_y, 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+    intercept = mean_y - slope * mean_x
+    ss_tot = sum((y - mean_y) ** 2 for y in ys)
+    ss_res = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(xs, ys))
+    r_squared = 1 - ss_res / ss_tot if ss_tot else 0.0
+    return slope, intercept, r_squared
+
+
+def summarize_cells(samples):
+    """셀별 중앙값 지연 시간 (decode/preprocess/total: 서버, response_time: 클라이언트)"""
+    by_cell = {}
+    for sample in samples:
+        if sample.get("status_code") == 200:
+            by_cell.setdefault(sample["cell"], []).append(sample)
+    summary = []
+    for name, cell_samples in sorted(by_cell.items(), key=lambda item: (item[1][0]["megapixels"], item[1][0]["bytes"])):
+        first = cell_samples[0]
+        row = {key: first[key] for key in ("cell", "width", "pixel_format", "bit_depth", "format", "quality", "bytes", "megapixels")}
+        row["megabytes"] = first["bytes"] / 1e6
+        row["count"] = len(cell_samples)
+        for metric in SCALING_METRICS:
+            if metric == "response_time":
+                values = [s["response_time"] for s in cell_samples]
+            else:
+                values = [s["server"].get(metric, 0.0) for s in cell_samples]
+            row[metric] = _median(values)
+        summary.append(row)
+    return summary
+
+
+def scaling_fits(cell_summary):
+    """
+    지표별로 픽셀 수(MP)와 파일 크기(MB)에 대한 선형 회귀 비교
+
+    Returns:
+        dict: {지표: {"per_megapixel": {"slope", "intercept", "r2"}, "per_megabyte": {...}, "better_predictor"}}
+    """
+    fits = {}
+    if len(cell_summary) < 2:
+        return fits
+    megapixels = [row["megapixels"] for row in cell_summary]
+    megabytes = [row["megabytes"] for row in cell_summary]
+    for metric in SCALING_METRICS:
+        values = [row[metric] for row in cell_summary]
+        per_mp = dict(zip(("slope", "intercept", "r2"), _linear_fit(megapixels, values)))
+        per_mb = dict(zip(("slope", "intercept", "r2"), _linear_fit(megabytes, values)))
+        fits[metric] = {
+            "per_megapixel": per_mp,
+            "per_megabyte": per_mb,
+            "better_predictor": "pixels" if per_mp["r2"] >= per_mb["r2"] else "bytes",
+        }
+    return fits
+
+
+def scaling_benchmark(url, cells, repetitions=3):
+    """
+    코퍼스의 각 셀을 repetitions 회 업로드하여 측정 후 "resolution_scaling" 벤치마크로 저장
+
+    Returns:
+        tuple: (셀별 요약 목록, 회귀 결과)
+    """
+    samples = []
+    for cell in cells:
+        name = os.path.basename(cell["path"])
+        for repetition in range(repetitions):
+            sample = timed_post(url, cell["path"], request_id=f"scaling-{name}-{repetition}")
+            sample.update({key: value for key, value in cell.items() if key != "path"})
+            sample["cell"] = name
+            samples.append(sample)
+
+    cell_summary = summarize_cells(samples)
+    fits = scaling_fits(cell_summary)
+    save_results("resolution_scaling", samples, repetitions=repetitions, cells=cell_summary, fits=fits)
+    return cell_summary, fits
+
+
+def format_scaling(cell_summary, fits):
+    """셀별 측정 결과와 회귀 결과를 콘솔 출력용 문자열로 변환"""
+    lines = [f"{'cell':<28}{'MP':>8}{'MB':>9}{'decode':>10}{'preproc':>10}{'total':>10}{'client':>10}"]
+    for row in cell_summary:
+        lines.append(f"{row['cell']:<28}{row['megapixels']:>8.2f}{row['megabytes']:>9.3f}"
+                     f"{row['decode']:>10.2f}{row['preprocess']:>10.2f}{row['total']:>10.2f}{row['response_time']:>10.2f}")
+    for metric, fit in fits.items():
+        mp, mb = fit["per_megapixel"], fit["per_megabyte"]
+        lines.append(f"{metric:<14} {mp['slope']:8.2f} ms/MP (R²={mp['r2']:.2f})  "
+                     f"{mb['slope']:8.2f} ms/MB (R²={mb['r2']:.2f})  -> {fit['better_predictor']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="해상도/포맷 스케일링 코퍼스 생성 및 벤치마크")
+    parser.add_argument("--url", default=os.environ.get("API_BASE_URL", "http://localhost:5000"), help="API 서버 기본 URL")
+    parser.add_argument("--output", default=DEFAULT_CORPUS_DIR, help="코퍼스 디렉토리")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=list(RESOLUTIONS), help="정사각형 이미지 한 변 픽셀 수")
+    parser.add_argument("--repetitions", type=int, default=3, help="셀당 측정 횟수")
+    parser.add_argument("--generate-only", action="store_true", help="코퍼스만 생성하고 측정하지 않음")
+    args = parser.parse_args(argv)
+
+    cells = generate_corpus(args.output, args.resolutions)
+    print(f"코퍼스 {len(cells)}개 셀: {args.output}")
+    if args.generate_only:
+        return 0
+
+    cell_summary, fits = scaling_benchmark(f"{args.url}/analyze", cells, args.repetitions)
+    print(format_scaling(cell_summary, fits))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
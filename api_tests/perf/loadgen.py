@@ -0,0 +1,331 @@
+"""
+다중 프로세스 분산 부하 생성
+
+단일 Python 클라이언트 프로세스는 GIL 때문에 다중 워커 서버보다 먼저 포화되므로,
+N 개의 클라이언트 프로세스(선택적으로 CPU 코어 고정)가 공통 시작 시각에 맞춰
+목표 요청률을 나누어 전송합니다. 각 프로세스는 지연 시간을 로그 버킷 히스토그램과
+카운터로 기록하고, 부모 프로세스가 이를 손실 없이 합산하여 하나의 결과로 만듭니다.
+
+사용법:
+$ cd api_tests && python -m perf.loadgen --processes 4 --rate 40 --duration 30 --pin
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+
+from perf.results import SUMMARY_PERCENTILES, save_results
+
+# 프로세스 기동(spawn) 후 동시 시작까지의 여유 시간(초)
+DEFAULT_START_DELAY_S = 3.0
+# 프로세스당 제출했지만 끝나지 않은 최대 요청 수 (concurrency 의 배수)
+MAX_OUTSTANDING_FACTOR = 2
+
+
+class LatencyHistogram:
+    """
+    병합 가능한 로그 버킷 지연 시간 히스토그램
+
+    값 v(ms)는 floor(log(v) / log(1 + precision)) 버킷에 집계되므로 백분위수의 상대 오차는
+    precision 이하이며, 같은 precision 의 히스토그램은 버킷 카운트를 더하는 것으로 손실 없이 병합됩니다.
+    """
+
+    MIN_VALUE = 0.001
+
+    def __init__(self, precision=0.01):
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, value):
+        return math.floor(math.log(max(value, self.MIN_VALUE)) / self._log_base)
+
+    def record(self, value):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError(f"precision 이 다른 히스토그램은 병합할 수 없습니다: {self.precision} != {other.precision}")
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, pct):
+        """버킷 상한 기준 백분위수 (실제 min/max 범위로 보정)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                upper = math.exp((index + 1) * self._log_base)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """perf.results.summarize() 와 같은 형식의 통계"""
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+        }
+        for pct in SUMMARY_PERCENTILES:
+            summary[f"p{pct}"] = self.percentile(pct)
+        return summary
+
+    def to_dict(self):
+        return {
+            "precision": self.precision,
+            "counts": {str(index): n for index, n in sorted(self.counts.items())},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data["precision"])
+        histogram.counts = Counter({int(index): n for index, n in data["counts"].items()})
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if data["min"] is not None else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+
+def _load_payloads(images):
+    payloads = []
+    for path in images:
+        with open(path, "rb") as f:
+            payloads.append((os.path.basename(path), f.read()))
+    return payloads
+
+
+def run_worker(worker_id, processes, url, images, start_at, rate, duration_s, concurrency, cpu=None):
+    """
+    단일 클라이언트 프로세스의 부하 생성 (ProcessPoolExecutor 에서 실행)
+
+    worker_id 별로 요청 시각을 interval / processes 만큼 엇갈리게 배치하여 전체 요청이
+    고르게 분포되도록 합니다.
+
+    latency 는 요청을 실제로 보낸 시각이 아니라 예정 시각(base + due)부터 측정하므로, 서버가 느려져
+    요청이 밀린 시간까지 포함됩니다(coordinated omission 방지). 서버 응답만의 시간은 service 에,
+    예정 시각보다 늦게 제출한 지연(schedule lag)은 별도로 기록합니다. 제출했지만 끝나지 않은 요청은
+    concurrency * MAX_OUTSTANDING_FACTOR 개로 제한하며, 가득 차면 다음 제출을 기다립니다.
+
+    Returns:
+        dict: {"worker", "cpu", "latency", "service", "schedule_lag", "counters", "elapsed_s"}
+    """
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+
+    payloads = _load_payloads(images)
+    latency = LatencyHistogram()
+    service = LatencyHistogram()
+    schedule_lag = LatencyHistogram()
+    counters = Counter()
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(index, scheduled):
+        try:
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            filename, content = payloads[index % len(payloads)]
+            sent = time.perf_counter()
+            try:
+                response = local.session.post(url, files={"file": (filename, content)}, timeout=60)
+                status = str(response.status_code)
+            except requests.RequestException:
+                status = "error"
+            finished = time.perf_counter()
+            with lock:
+                counters[f"status_{status}"] += 1
+                if status == "200":
+                    latency.record((finished - scheduled) * 1000)
+                    service.record((finished - sent) * 1000)
+        finally:
+            outstanding.release()
+
+    interval = 1.0 / rate
+    offset = interval * worker_id / processes
+    time.sleep(max(0.0, start_at - time.time()))
+    base = time.perf_counter()
+    outstanding = threading.BoundedSemaphore(concurrency * MAX_OUTSTANDING_FACTOR)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        index = 0
+        while True:
+            due = offset + index * interval
+            if due >= duration_s:
+                break
+            delay = base + due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            outstanding.acquire()
+            schedule_lag.record(max(time.perf_counter() - (base + due), 0.0) * 1000)
+            executor.submit(send, index, base + due)
+            counters["sent"] += 1
+            index += 1
+
+    return {
+        "worker": worker_id,
+        "cpu": cpu,
+        "latency": latency.to_dict(),
+        "service": service.to_dict(),
+        "schedule_lag": schedule_lag.to_dict(),
+        "counters": dict(counters),
+        "elapsed_s": time.perf_counter() - base,
+    }
+
+
+def merge_worker_results(worker_results):
+    """
+    워커별 결과를 하나로 병합 (히스토그램 버킷/카운터 합산)
+
+    Returns:
+        dict: {"latency", "service", "schedule_lag", "counters", "workers", "elapsed_s"}
+    """
+    merged = {"latency": None, "service": None, "schedule_lag": None}
+    counters = Counter()
+    for result in worker_results:
+        for name, histogram in merged.items():
+            worker_histogram = LatencyHistogram.from_dict(result[name])
+            merged[name] = worker_histogram if histogram is None else histogram.merge(worker_histogram)
+        counters.update(result["counters"])
+    return {
+        "latency": merged["latency"] or LatencyHistogram(),
+        "service": merged["service"] or LatencyHistogram(),
+        "schedule_lag": merged["schedule_lag"] or LatencyHistogram(),
+        "counters": dict(counters),
+        "workers": worker_results,
+        "elapsed_s": max((r["elapsed_s"] for r in worker_results), default=0.0),
+    }
+
+
+def run_distributed(url, images, processes=2, rate=10.0, duration_s=10.0, concurrency=8, pin=False,
+                    start_delay_s=DEFAULT_START_DELAY_S):
+    """
+    N 개의 클라이언트 프로세스로 목표 요청률(rate, 전체 합계)의 부하를 생성하고 결과를 병합
+
+    Args:
+        pin (bool): 워커 i 를 CPU 코어 (i % 코어 수)에 고정 (Linux 전용)
+    """
+    cpus = sorted(os.sched_getaffinity(0)) if pin and hasattr(os, "sched_getaffinity") else None
+    start_at = time.time() + start_delay_s
+    per_worker_rate = rate / processes
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = [
+            executor.submit(run_worker, worker_id, processes, url, images, start_at, per_worker_rate,
+                            duration_s, concurrency, cpus[worker_id % len(cpus)] if cpus else None)
+            for worker_id in range(processes)
+        ]
+        worker_results = [future.result() for future in futures]
+
+    merged = merge_worker_results(worker_results)
+    merged["target_rate"] = rate
+    # 제출 대기로 측정 시간을 넘길 수 있으므로 실제 경과 시간 기준
+    elapsed_s = max(merged["elapsed_s"], duration_s)
+    merged["achieved_rate"] = merged["counters"].get("sent", 0) / elapsed_s if elapsed_s else 0.0
+    return merged
+
+
+def distributed_benchmark(url, images, processes=2, rate=10.0, duration_s=10.0, concurrency=8, pin=False):
+    """분산 부하 측정 후 표준 벤치마크 형식("distributed_load")으로 저장"""
+    merged = run_distributed(url, images, processes, rate, duration_s, concurrency, pin)
+    counters = merged["counters"]
+    save_results(
+        "distributed_load",
+        [],
+        summary=merged["latency"].summary(),
+        requests_count=counters.get("sent", 0),
+        failures={key[len("status_"):]: n for key, n in counters.items()
+                  if key.startswith("status_") and key != "status_200"},
+        processes=processes,
+        target_rate=rate,
+        achieved_rate=merged["achieved_rate"],
+        duration_s=duration_s,
+        concurrency=concurrency,
+        pin=pin,
+        counters=merged["counters"],
+        latency_histogram=merged["latency"].to_dict(),
+        service_time=merged["service"].summary(),
+        schedule_lag=merged["schedule_lag"].summary(),
+        workers=merged["workers"],
+    )
+    return merged
+
+
+def format_merged(merged):
+    """병합 결과를 콘솔 출력용 문자열로 변환"""
+    latency = merged["latency"].summary()
+    lag = merged["schedule_lag"].summary()
+    lines = [
+        f"목표 요청률: {merged.get('target_rate', 0):.1f}/s, 달성 요청률: {merged.get('achieved_rate', 0):.1f}/s",
+        f"카운터: {merged['counters']}",
+    ]
+    if latency["count"]:
+        lines.append("응답 시간: " + ", ".join(f"p{p}={latency[f'p{p}']:.2f}ms" for p in SUMMARY_PERCENTILES)
+                     + f", max={latency['max']:.2f}ms")
+    service = merged["service"].summary()
+    if service["count"]:
+        lines.append("서버 응답 시간 (대기 제외): " + ", ".join(f"p{p}={service[f'p{p}']:.2f}ms" for p in (50, 99)))
+    if lag["count"]:
+        lines.append(f"스케줄 지연 (클라이언트 포화/대기 지표): p99={lag['p99']:.2f}ms, max={lag['max']:.2f}ms")
+    for worker in merged["workers"]:
+        lines.append(f"  워커 {worker['worker']} (CPU {worker['cpu']}): {worker['counters']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다중 프로세스 분산 부하 생성")
+    parser.add_argument("--url", default=os.environ.get("API_BASE_URL", "http://localhost:5000"), help="API 서버 기본 URL")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2, help="클라이언트 프로세스 수")
+    parser.add_argument("--rate", type=float, default=10.0, help="전체 목표 요청률 (초당)")
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간(초)")
+    parser.add_argument("--concurrency", type=int, default=8, help="프로세스당 최대 동시 요청 수")
+    parser.add_argument("--pin", action="store_true", help="워커 프로세스를 CPU 코어에 고정")
+    parser.add_argument("--image", action="append", help="업로드할 이미지 (여러 번 지정 가능)")
+    args = parser.parse_args(argv)
+
+    test_data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+    images = args.image or [
+        os.path.join(test_data_dir, f) for f in sorted(os.listdir(test_data_dir))
+        if f.endswith((".jpg", ".png", ".jpeg"))
+    ]
+
+    merged = distributed_benchmark(f"{args.url}/analyze", images, args.processes, args.rate,
+                                   args.duration, args.concurrency, args.pin)
+    print(format_merged(merged))
+    failed = sum(n for key, n in merged["counters"].items() if key.startswith("status_") and key != "status_200")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""
+성능 테스트 결과 HTML 리포트 생성기
+
+벤치마크 테스트가 남긴 원시 결과(performance_results/*.json)와 실행 이력을 읽어
+모든 차트를 하나의 독립 실행형 HTML 파일(이미지 base64 내장)로 렌더링합니다.
+matplotlib 은 리포트 생성 시점에만 import 되므로 pytest 수집 비용에 영향을 주지 않습니다.
+
+사용법:
+$ cd api_tests && python -m perf.report
+$ python -m perf.report --results-dir performance_results --output report.html
+"""
+
+import argparse
+import base64
+import html
+import io
+import os
+import sys
+import warnings
+from collections import defaultdict
+
+from perf.results import RESULTS_DIR, SUMMARY_PERCENTILES, load_history, load_results, percentile
+
+REPORT_FILE = "report.html"
+
+# 벤치마크별 전용 차트 렌더러 {벤치마크 이름: (제목, 함수)}
+BENCHMARK_CHARTS = {}
+
+
+def benchmark_chart(benchmark, title):
+    """벤치마크 결과 전용 차트 렌더러 등록 데코레이터"""
+    def decorator(func):
+        BENCHMARK_CHARTS[benchmark] = (title, func)
+        return func
+    return decorator
+
+
+def _setup_matplotlib():
+    """matplotlib 지연 로딩 및 폰트 설정"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    warnings.filterwarnings("ignore", r"Glyph \d+ .* missing from font.*")
+    warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
+
+    # 한글 폰트 설정
+    if os.name == "nt":
+        font_path = r"C:\Windows\Fonts\Arial\arial.ttf"
+        if os.path.exists(font_path):
+            font_prop = matplotlib.font_manager.FontProperties(fname=font_path)
+            matplotlib.rcParams["font.family"] = font_prop.get_name()
+        else:
+            matplotlib.rcParams["font.family"] = "sans-serif"
+            matplotlib.rcParams["font.sans-serif"] = ["Arial", "Helvetica", "DejaVu Sans"]
+    else:
+        matplotlib.rcParams["font.family"] = "sans-serif"
+        matplotlib.rcParams["font.sans-serif"] = ["NanumGothic", "NanumBarunGothic", "Malgun Gothic", "Arial", "Helvetica", "DejaVu Sans"]
+
+    return plt
+
+
+def _figure_to_base64(plt, fig):
+    """matplotlib Figure 를 PNG base64 문자열로 변환"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _successful(record):
+    return [s for s in record.get("samples", []) if s.get("status_code") == 200]
+
+
+@benchmark_chart("concurrent_load", "동시 요청 응답 시간")
+def plot_concurrent_load(plt, record):
+    response_times = [s["response_time"] for s in _successful(record)]
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bar(range(len(response_times)), response_times)
+    ax.set_xlabel("Request Number")
+    ax.set_ylabel("Response Time (ms)")
+    ax.set_title(f"Concurrent Requests ({record['meta'].get('concurrency', len(response_times))}) Response Times")
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+@benchmark_chart("extended_load", "동시성 수준별 응답 시간")
+def plot_extended_load(plt, record):
+    by_level = defaultdict(list)
+    for sample in _successful(record):
+        by_level[sample["concurrency"]].append(sample["response_time"])
+    levels = sorted(by_level)
+    fig, ax = plt.subplots(figsize=(12, 7))
+    ax.plot(levels, [sum(by_level[c]) / len(by_level[c]) for c in levels], "o-", label="Average Response Time")
+    ax.plot(levels, [max(by_level[c]) for c in levels], "s-", label="Maximum Response Time")
+    ax.set_xlabel("Number of Concurrent Requests")
+    ax.set_ylabel("Response Time (ms)")
+    ax.set_title("API Response Time by Concurrency Level")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+@benchmark_chart("response_time_vs_filesize", "파일 크기와 응답 시간")
+def plot_filesize(plt, record):
+    import numpy as np
+
+    samples = _successful(record)
+    file_sizes = [s["file_size"] for s in samples]
+    response_times = [s["response_time"] for s in samples]
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.scatter(file_sizes, response_times)
+    if len(set(file_sizes)) > 1:
+        # 추세선 및 상관계수
+        trend = np.poly1d(np.polyfit(file_sizes, response_times, 1))
+        xs = sorted(file_sizes)
+        ax.plot(xs, trend(xs), "r--", alpha=0.8)
+        correlation = np.corrcoef(file_sizes, response_times)[0, 1]
+        ax.annotate(f"Correlation: {correlation:.2f}", xy=(0.05, 0.95), xycoords="axes fraction")
+    ax.set_xlabel("File Size (KB)")
+    ax.set_ylabel("Response Time (ms)")
+    ax.set_title("Relationship between File Size and API Response Time")
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+@benchmark_chart("latency_breakdown", "응답 시간 구성 요소 (백분위수별)")
+def plot_latency_breakdown(plt, record):
+    from perf.timing import COMPONENTS
+
+    table = record["meta"].get("breakdown", {})
+    if not table:
+        return None
+    columns = list(table)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bottoms = [0.0] * len(columns)
+    for name in COMPONENTS:
+        values = [table[c][name] for c in columns]
+        ax.bar(columns, values, bottom=bottoms, label=name)
+        bottoms = [b + v for b, v in zip(bottoms, values)]
+    ax.set_xlabel("Percentile")
+    ax.set_ylabel("Time (ms)")
+    ax.set_title("Latency Breakdown (client + Server-Timing)")
+    ax.legend(fontsize="small", loc="upper left")
+    ax.grid(True, axis="y", alpha=0.3)
+    return fig
+
+
+@benchmark_chart("soak", "내구성 테스트 리소스 추세 및 지연 시간 드리프트")
+def plot_soak(plt, record):
+    meta = record["meta"]
+    resources = meta.get("resources", [])
+    windows = meta.get("windows", [])
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    for ax, (metric, label) in zip(axes.flat, (("rss_mb", "RSS (MB)"), ("threads", "Threads"), ("open_fds", "Open FDs"))):
+        ax.plot([s["t"] for s in resources], [s[metric] for s in resources], ".-")
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel(label)
+        trend = meta.get("trends", {}).get(metric)
+        if trend:
+            ax.set_title(f"{label}: {trend['slope_per_hour']:+.2f}/h" + (" (LEAK)" if trend["leak"] else ""))
+        ax.grid(True, alpha=0.3)
+    ax = axes.flat[3]
+    ax.plot([w["start_s"] for w in windows], [w["p50"] for w in windows], "o-", label="p50")
+    ax.plot([w["start_s"] for w in windows], [w["p95"] for w in windows], "s-", label="p95")
+    ax.set_xlabel("Window Start (s)")
+    ax.set_ylabel("Response Time (ms)")
+    ax.set_title(f"Latency Drift: {meta.get('latency_drift', 1.0):.2f}x")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+@benchmark_chart("distributed_load", "다중 프로세스 분산 부하")
+def plot_distributed_load(plt, record):
+    from perf.loadgen import LatencyHistogram
+
+    meta = record["meta"]
+    histogram = LatencyHistogram.from_dict(meta["latency_histogram"])
+    if not histogram.count:
+        return None
+    pcts = [p / 2 for p in range(0, 201)]
+    fig, (ax_curve, ax_workers) = plt.subplots(1, 2, figsize=(14, 6))
+    ax_curve.plot(pcts, [histogram.percentile(p) for p in pcts])
+    ax_curve.set_xlabel("Percentile")
+    ax_curve.set_ylabel("Response Time (ms)")
+    ax_curve.set_title(f"{meta['processes']} processes, target {meta['target_rate']:.1f}/s, "
+                       f"achieved {meta['achieved_rate']:.1f}/s")
+    ax_curve.grid(True, alpha=0.3)
+
+    workers = meta.get("workers", [])
+    ax_workers.bar([str(w["worker"]) for w in workers],
+                   [w["counters"].get("status_200", 0) for w in workers])
+    ax_workers.set_xlabel("Worker")
+    ax_workers.set_ylabel("Successful Requests")
+    ax_workers.set_title("Requests per Client Process")
+    ax_workers.grid(True, axis="y", alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+@benchmark_chart("resolution_scaling", "해상도/포맷별 처리 비용 (픽셀 수 vs 파일 크기)")
+def plot_resolution_scaling(plt, record):
+    cells = record["meta"].get("cells", [])
+    fits = record["meta"].get("fits", {})
+    if not cells:
+        return None
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    groups = defaultdict(list)
+    for row in cells:
+        label = row["format"] + (f" q{row['quality']}" if row.get("quality") else "") + f" {row['pixel_format']}"
+        groups[label].append(row)
+    for ax, (x_key, x_label, fit_key) in zip(axes, (("megapixels", "Megapixels", "per_megapixel"),
+                                                    ("megabytes", "File Size (MB)", "per_megabyte"))):
+        for label, rows in sorted(groups.items()):
+            ax.plot([r[x_key] for r in rows], [r["total"] for r in rows], "o", label=label)
+        fit = fits.get("total", {}).get(fit_key)
+        if fit:
+            xs = sorted(r[x_key] for r in cells)
+            ax.plot(xs, [fit["slope"] * x + fit["intercept"] for x in xs], "k--", alpha=0.6)
+            ax.set_title(f"Server total: {fit['slope']:.2f} ms per {x_label.split()[0].lower()} unit, R²={fit['r2']:.2f}")
+        ax.set_xlabel(x_label)
+        ax.set_ylabel("Server Total (ms)")
+        ax.grid(True, alpha=0.3)
+    axes[0].legend(fontsize="small")
+    fig.tight_layout()
+    return fig
+
+
+def plot_percentile_curves(plt, results):
+    """벤치마크별 응답 시간 백분위수 곡선"""
+    pcts = [p / 2 for p in range(0, 201)]
+    fig, ax = plt.subplots(figsize=(10, 6))
+    plotted = False
+    for name, record in results.items():
+        response_times = [s["response_time"] for s in _successful(record) if "response_time" in s]
+        if len(response_times) < 2:
+            continue
+        ax.plot(pcts, [percentile(response_times, p) for p in pcts], label=name)
+        plotted = True
+    if not plotted:
+        plt.close(fig)
+        return None
+    ax.set_xlabel("Percentile")
+    ax.set_ylabel("Response Time (ms)")
+    ax.set_title("Response Time Percentile Curves")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def plot_history_trends(plt, history):
+    """실행 이력에 따른 벤치마크별 p50/p95 추세"""
+    by_benchmark = defaultdict(list)
+    for entry in history:
+        stats = entry.get("summary", {}).get("response_time", {})
+        if stats.get("count"):
+            by_benchmark[entry["benchmark"]].append(stats)
+    if not by_benchmark:
+        return None
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for name, runs in sorted(by_benchmark.items()):
+        runs_idx = range(1, len(runs) + 1)
+        line, = ax.plot(runs_idx, [r["p50"] for r in runs], "o-", label=f"{name} p50")
+        ax.plot(runs_idx, [r["p95"] for r in runs], "x--", color=line.get_color(), alpha=0.6, label=f"{name} p95")
+    ax.set_xlabel("Run")
+    ax.set_ylabel("Response Time (ms)")
+    ax.set_title("Response Time Trend Across Runs")
+    ax.legend(fontsize="small")
+    ax.grid(True, alpha=0.3)
+    return fig
+
+
+def _summary_table(results):
+    headers = ["Benchmark", "Timestamp", "Requests", "Successful", "Failed", "Mean (ms)"] + \
+              [f"p{p} (ms)" for p in SUMMARY_PERCENTILES] + ["Max (ms)"]
+    rows = []
+    for name, record in results.items():
+        summary = record.get("summary", {})
+        stats = summary.get("response_time", {})
+        failures = ", ".join(f"{status}: {n}" for status, n in summary.get("failures", {}).items())
+        cells = [name, record.get("timestamp", ""), summary.get("requests", ""), summary.get("successful", ""),
+                 f"{summary['failed']} ({failures})" if summary.get("failed") else summary.get("failed", "")]
+        if stats.get("count"):
+            cells += [f"{stats['mean']:.2f}"] + [f"{stats[f'p{p}']:.2f}" for p in SUMMARY_PERCENTILES] + [f"{stats['max']:.2f}"]
+        else:
+            cells += ["-"] * (len(SUMMARY_PERCENTILES) + 2)
+        rows.append("<tr>" + "".join(f"<td>{html.escape(str(c))}</td>" for c in cells) + "</tr>")
+    head = "<tr>" + "".join(f"<th>{h}</th>" for h in headers) + "</tr>"
+    return f"<table>{head}{''.join(rows)}</table>"
+
+
+def render_report(results_dir=RESULTS_DIR, output=None):
+    """
+    결과 디렉토리의 원시 결과로 HTML 리포트를 생성합니다.
+
+    Returns:
+        str: 생성된 리포트 경로
+    """
+    output = output or os.path.join(results_dir, REPORT_FILE)
+    results = load_results(results_dir)
+    history = load_history(results_dir)
+    plt = _setup_matplotlib()
+
+    sections = []
+    for name, record in results.items():
+        if name not in BENCHMARK_CHARTS or not _successful(record):
+            continue
+        title, func = BENCHMARK_CHARTS[name]
+        fig = func(plt, record)
+        if fig is not None:
+            sections.append((title, _figure_to_base64(plt, fig)))
+
+    for title, fig in (("응답 시간 백분위수", plot_percentile_curves(plt, results)),
+                       ("실행 이력 추세", plot_history_trends(plt, history))):
+        if fig is not None:
+            sections.append((title, _figure_to_base64(plt, fig)))
+
+    body = "".join(
+        f"<section><h2>{html.escape(title)}</h2><img src=\"data:image/png;base64,{image}\"></section>"
+        for title, image in sections
+    )
+    document = f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<title>LunitCare QA 성능 테스트 리포트</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #2C3E50; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>LunitCare QA 성능 테스트 리포트</h1>
+<h2>요약</h2>
+{_summary_table(results)}
+{body}
+</body>
+</html>
+"""
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(document)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="성능 테스트 결과 HTML 리포트 생성")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="벤치마크 원시 결과 디렉토리")
+    parser.add_argument("--output", help=f"리포트 파일 경로 (기본값: <results-dir>/{REPORT_FILE})")
+    args = parser.parse_args(argv)
+
+    if not load_results(args.results_dir):
+        print(f"경고: 벤치마크 결과가 없습니다: {args.results_dir}")
+        return 1
+
+    output = render_report(args.results_dir, args.output)
+    print(f"성능 리포트 생성 완료: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
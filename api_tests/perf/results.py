@@ -0,0 +1,137 @@
+"""
+벤치마크 원시 결과 저장/조회
+
+모든 벤치마크는 동일한 구조의 JSON 파일을 남깁니다:
+
+    {
+      "benchmark": "concurrent_load",
+      "timestamp": "2025-06-01T12:00:00",
+      "meta": {...},                # 측정 조건 (동시성, 이미지 수 등)
+      "samples": [{...}, ...],      # 요청 단위 원시 측정값
+      "summary": {...}              # 응답 시간 통계
+    }
+
+같은 요약 정보는 history.jsonl 에 한 줄씩 누적되어 실행 간 추세 분석에 사용됩니다.
+"""
+
+import json
+import math
+import os
+import statistics
+from collections import Counter
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "performance_results")
+HISTORY_FILE = "history.jsonl"
+
+# 요약 통계에 포함할 백분위수
+SUMMARY_PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, pct):
+    """선형 보간 방식의 백분위수 계산 (numpy.percentile 기본 방식과 동일)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values):
+    """응답 시간 목록의 요약 통계"""
+    if not values:
+        return {"count": 0}
+    summary = {
+        "count": len(values),
+        "mean": statistics.mean(values),
+        "min": min(values),
+        "max": max(values),
+    }
+    for pct in SUMMARY_PERCENTILES:
+        summary[f"p{pct}"] = percentile(values, pct)
+    return summary
+
+
+def save_results(benchmark, samples, results_dir=RESULTS_DIR, summary=None, requests_count=None, failures=None,
+                 **meta):
+    """
+    벤치마크 원시 결과를 저장하고 실행 이력에 요약을 추가합니다.
+
+    Args:
+        benchmark (str): 벤치마크 이름 (파일명으로 사용)
+        samples (list): 요청 단위 측정값 (dict) 목록
+        results_dir (str): 결과 디렉토리
+        summary (dict): 요청 단위 샘플 대신 히스토그램 등으로 집계한 응답 시간 통계
+            (summarize() 와 같은 형식, 지정 시 samples 대신 사용)
+        requests_count (int): summary 를 지정한 경우 보낸 전체 요청 수 (없으면 성공 수)
+        failures (dict): summary 를 지정한 경우 실패한 요청의 {상태: 건수} ("error" 는 연결 오류 등)
+        **meta: 측정 조건
+
+    Returns:
+        str: 저장된 결과 파일 경로
+    """
+    os.makedirs(results_dir, exist_ok=True)
+
+    if summary is None:
+        response_times = [s["response_time"] for s in samples if s.get("status_code") == 200]
+        requests_count = len(samples)
+        failures = Counter(str(s.get("status_code") or "error") for s in samples if s.get("status_code") != 200)
+        summary = summarize(response_times)
+    elif requests_count is None:
+        requests_count = summary.get("count", 0)
+    failures = dict(sorted((failures or {}).items()))
+    record = {
+        "benchmark": benchmark,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "meta": meta,
+        "samples": samples,
+        "summary": {
+            "requests": requests_count,
+            "successful": summary.get("count", 0),
+            "failed": sum(failures.values()),
+            "failures": failures,
+            "response_time": summary,
+        },
+    }
+
+    path = os.path.join(results_dir, f"{benchmark}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+
+    history_entry = {key: record[key] for key in ("benchmark", "timestamp", "meta", "summary")}
+    with open(os.path.join(results_dir, HISTORY_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(history_entry, ensure_ascii=False) + "\n")
+
+    return path
+
+
+def load_results(results_dir=RESULTS_DIR):
+    """결과 디렉토리의 모든 벤치마크 결과를 {이름: 결과} 형태로 반환"""
+    results = {}
+    if not os.path.isdir(results_dir):
+        return results
+    for name in sorted(os.listdir(results_dir)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(results_dir, name), encoding="utf-8") as f:
+            record = json.load(f)
+        results[record.get("benchmark", name[:-5])] = record
+    return results
+
+
+def load_history(results_dir=RESULTS_DIR):
+    """실행 이력(history.jsonl) 목록 반환 (오래된 순)"""
+    path = os.path.join(results_dir, HISTORY_FILE)
+    if not os.path.exists(path):
+        return []
+    history = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                history.append(json.loads(line))
+    return history
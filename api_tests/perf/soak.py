@@ -0,0 +1,307 @@
+"""
+장시간(soak) 내구성 테스트
+
+일정한 요청률로 서버에 부하를 주면서 서버 프로세스의 RSS, 스레드 수, 열린 파일 디스크립터 수를
+/proc 에서 주기적으로 샘플링합니다. 측정이 끝나면 리소스별 선형 추세(시간당 증가량)로 누수를
+판정하고, 시간 구간(window)별 응답 시간 백분위수로 지연 시간 드리프트를 계산합니다.
+
+사용법:
+$ cd api_tests && python -m perf.soak --duration 3600 --rate 2
+$ SOAK_DURATION_S=3600 pytest test_performance.py -k soak -s
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from perf.results import percentile, save_results
+from perf.timing import timed_post
+
+# 누수 판정 기본 임계값 (워밍업 이후 선형 추세의 시간당 증가량)
+DEFAULT_THRESHOLDS = {
+    "rss_mb": 50.0,
+    "threads": 5.0,
+    "open_fds": 10.0,
+}
+# 누수로 판정하기 위한 최소 절대 증가량 (짧은 측정에서 일시적 변동이 과대 외삽되는 것을 방지)
+DEFAULT_MIN_GROWTH = {
+    "rss_mb": 10.0,
+    "threads": 2,
+    "open_fds": 4,
+}
+# 마지막 구간 p95 / 첫 구간 p95 허용 비율
+DEFAULT_MAX_LATENCY_DRIFT = 1.5
+
+
+def read_process_stats(pid):
+    """
+    /proc 에서 프로세스 리소스 사용량 조회
+
+    Returns:
+        dict | None: {"rss_mb", "threads", "open_fds"} (조회 불가 시 None)
+    """
+    stats = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    stats["rss_mb"] = int(line.split()[1]) / 1024
+                elif line.startswith("Threads:"):
+                    stats["threads"] = int(line.split()[1])
+        stats["open_fds"] = len(os.listdir(f"/proc/{pid}/fd"))
+    except (OSError, ValueError, IndexError):
+        return None
+    return stats
+
+
+def discover_server_pid(base_url):
+    """
+    서버 PID 확인 (SOAK_SERVER_PID 환경 변수 > /health 응답의 pid)
+
+    같은 호스트의 /proc 에서 확인할 수 없는 PID(예: 컨테이너 내부 서버)는 None 을 반환합니다.
+    """
+    pid = os.environ.get("SOAK_SERVER_PID")
+    if not pid:
+        try:
+            pid = requests.get(f"{base_url}/health", timeout=5).json().get("pid")
+        except (requests.RequestException, ValueError):
+            pid = None
+    if pid and read_process_stats(pid) is not None:
+        return int(pid)
+    return None
+
+
+def linear_slope(xs, ys):
+    """최소제곱 선형 회귀 기울기"""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+
+def analyze_resources(resource_samples, warmup_s=0, thresholds=None):
+    """
+    리소스 샘플의 추세 분석 및 누수 판정
+
+    워밍업 이후 구간의 선형 추세가 시간당 임계값을 넘고, 추세로 계산한 전체 증가량이
+    최소 증가량 이상일 때 누수로 판정합니다.
+
+    Returns:
+        dict: {지표: {"start", "end", "slope_per_hour", "threshold_per_hour", "growth", "leak"}}
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    steady = [s for s in resource_samples if s["t"] >= warmup_s]
+    trends = {}
+    if len(steady) < 2:
+        return trends
+    hours = [s["t"] / 3600 for s in steady]
+    for metric, threshold in thresholds.items():
+        values = [s[metric] for s in steady]
+        slope = linear_slope(hours, values)
+        growth = slope * (hours[-1] - hours[0])
+        trends[metric] = {
+            "start": values[0],
+            "end": values[-1],
+            "slope_per_hour": slope,
+            "threshold_per_hour": threshold,
+            "growth": growth,
+            "leak": slope > threshold and growth >= DEFAULT_MIN_GROWTH.get(metric, 0),
+        }
+    return trends
+
+
+def latency_windows(request_samples, window_s):
+    """시간 구간별 응답 시간 통계"""
+    windows = {}
+    for sample in request_samples:
+        if sample.get("status_code") != 200:
+            continue
+        windows.setdefault(int(sample["t"] // window_s), []).append(sample["response_time"])
+    return [
+        {
+            "start_s": index * window_s,
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+        }
+        for index, values in sorted(windows.items())
+    ]
+
+
+def latency_drift(windows):
+    """마지막 구간 p95 / 첫 구간 p95 (구간이 2개 미만이면 1.0)"""
+    if len(windows) < 2 or windows[0]["p95"] <= 0:
+        return 1.0
+    return windows[-1]["p95"] / windows[0]["p95"]
+
+
+def run_soak(url, images, duration_s, rate=1.0, pid=None, sample_interval_s=5.0, concurrency=4,
+             max_outstanding=None):
+    """
+    고정 요청률로 duration_s 동안 부하를 주며 요청/리소스 샘플을 수집
+
+    응답 시간은 요청을 실제로 보낸 시각이 아니라 예정 시각(start + index / rate)부터 측정합니다.
+    서버가 요청률을 따라가지 못해 요청이 밀리면 밀린 시간까지 응답 시간에 포함되므로, 포화 구간이
+    측정에서 빠지지 않습니다(coordinated omission 방지). 서버 응답만의 시간은 service_time 입니다.
+
+    Args:
+        url (str): /analyze 엔드포인트 URL
+        images (list): 순환 사용할 업로드 파일 경로 목록
+        duration_s (float): 측정 시간(초)
+        rate (float): 초당 요청 수
+        pid (int | None): 리소스를 샘플링할 서버 PID (None 이면 리소스 샘플링 생략)
+        sample_interval_s (float): 리소스 샘플링 주기(초)
+        concurrency (int): 동시에 진행 가능한 최대 요청 수
+        max_outstanding (int | None): 제출했지만 끝나지 않은 최대 요청 수 (기본 concurrency * 2,
+            가득 차면 다음 요청 제출을 기다리며 밀린 시간은 응답 시간에 포함됨)
+
+    Returns:
+        tuple: (요청 샘플 목록, 리소스 샘플 목록)
+    """
+    request_samples = []
+    resource_samples = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    start = time.monotonic()
+
+    def sample_resources():
+        while True:
+            stats = read_process_stats(pid)
+            if stats is not None:
+                resource_samples.append(dict(stats, t=time.monotonic() - start))
+            if stop.wait(sample_interval_s):
+                break
+
+    def send(index, scheduled):
+        try:
+            sample = timed_post(url, images[index % len(images)], request_id=f"soak-{index}")
+            finished = time.monotonic()
+            sample["t"] = scheduled - start
+            sample["schedule_delay"] = 0.0
+            if sample["status_code"]:
+                sample["service_time"] = sample["response_time"]
+                sample["response_time"] = (finished - scheduled) * 1000
+                sample["schedule_delay"] = sample["response_time"] - sample["service_time"]
+            with lock:
+                request_samples.append(sample)
+        finally:
+            outstanding.release()
+
+    sampler = None
+    if pid is not None:
+        sampler = threading.Thread(target=sample_resources, daemon=True)
+        sampler.start()
+
+    interval = 1.0 / rate
+    outstanding = threading.BoundedSemaphore(max_outstanding or concurrency * 2)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        index = 0
+        while True:
+            next_at = start + index * interval
+            if next_at - start >= duration_s:
+                break
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            outstanding.acquire()
+            executor.submit(send, index, next_at)
+            index += 1
+
+    stop.set()
+    if sampler is not None:
+        sampler.join()
+    request_samples.sort(key=lambda s: s["t"])
+    return request_samples, resource_samples
+
+
+def soak_benchmark(url, images, duration_s, rate=1.0, pid=None, sample_interval_s=5.0,
+                   window_s=None, warmup_s=None, thresholds=None, max_latency_drift=DEFAULT_MAX_LATENCY_DRIFT):
+    """
+    soak 측정 + 분석 후 표준 벤치마크 형식("soak")으로 저장
+
+    Returns:
+        dict: 분석 결과 {"trends", "windows", "latency_drift", "leaks", "drift_exceeded"}
+    """
+    window_s = window_s or max(duration_s / 10, 1.0)
+    warmup_s = duration_s * 0.1 if warmup_s is None else warmup_s
+
+    request_samples, resource_samples = run_soak(url, images, duration_s, rate, pid, sample_interval_s)
+    trends = analyze_resources(resource_samples, warmup_s, thresholds)
+    windows = latency_windows(request_samples, window_s)
+    drift = latency_drift(windows)
+    analysis = {
+        "trends": trends,
+        "windows": windows,
+        "latency_drift": drift,
+        "leaks": [metric for metric, trend in trends.items() if trend["leak"]],
+        "drift_exceeded": drift > max_latency_drift,
+    }
+
+    save_results(
+        "soak",
+        request_samples,
+        duration_s=duration_s,
+        rate=rate,
+        pid=pid,
+        window_s=window_s,
+        warmup_s=warmup_s,
+        max_latency_drift=max_latency_drift,
+        resources=resource_samples,
+        **analysis,
+    )
+    return analysis
+
+
+def format_analysis(analysis):
+    """soak 분석 결과를 콘솔 출력용 문자열로 변환"""
+    lines = []
+    if analysis["trends"]:
+        for metric, trend in analysis["trends"].items():
+            flag = "누수 의심" if trend["leak"] else "정상"
+            lines.append(f"{metric:<9} {trend['start']:>9.1f} -> {trend['end']:>9.1f} "
+                         f"(추세 {trend['slope_per_hour']:+.2f}/h, 임계값 {trend['threshold_per_hour']}/h) {flag}")
+    else:
+        lines.append("리소스 샘플 없음 (서버 PID 를 /proc 에서 확인할 수 없음)")
+    for window in analysis["windows"]:
+        lines.append(f"[{window['start_s']:>8.0f}s] n={window['count']:<5} "
+                     f"p50={window['p50']:.2f}ms p95={window['p95']:.2f}ms")
+    lines.append(f"지연 시간 드리프트 (마지막/첫 구간 p95): {analysis['latency_drift']:.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="장시간 내구성(soak) 테스트")
+    parser.add_argument("--url", default=os.environ.get("API_BASE_URL", "http://localhost:5000"), help="API 서버 기본 URL")
+    parser.add_argument("--duration", type=float, default=3600, help="측정 시간(초)")
+    parser.add_argument("--rate", type=float, default=1.0, help="초당 요청 수")
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="리소스 샘플링 주기(초)")
+    parser.add_argument("--window", type=float, help="지연 시간 드리프트 구간(초, 기본값: 전체의 1/10)")
+    parser.add_argument("--pid", type=int, help="서버 PID (기본값: /health 응답에서 확인)")
+    parser.add_argument("--image", action="append", help="업로드할 이미지 (여러 번 지정 가능)")
+    args = parser.parse_args(argv)
+
+    test_data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_data")
+    images = args.image or [
+        os.path.join(test_data_dir, f) for f in sorted(os.listdir(test_data_dir))
+        if f.endswith((".jpg", ".png", ".jpeg"))
+    ]
+    pid = args.pid or discover_server_pid(args.url)
+
+    analysis = soak_benchmark(f"{args.url}/analyze", images, args.duration, args.rate, pid,
+                              args.sample_interval, args.window)
+    print(format_analysis(analysis))
+    return 1 if analysis["leaks"] or analysis["drift_exceeded"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+클라이언트/서버 지연 시간 분해
+
+서버는 응답마다 `Server-Timing` 헤더(recv/decode/preprocess/forward/serialize/total)와
+클라이언트가 보낸 `X-Request-ID` 를 돌려줍니다. 여기서는 http.client 로 요청 단계를
+직접 수행해 연결/업로드/대기/다운로드 시간을 측정하고, 같은 요청 ID 의 서버 단계 시간과
+결합하여 응답 시간을 구성 요소별로 분해합니다.
+
+    connect     TCP 연결 수립
+    upload      요청 헤더 + 본문 전송
+    queue_wait  업로드 완료 ~ 응답 헤더 수신 중 서버 처리 외 시간 (네트워크 + WSGI 대기열)
+    recv        서버의 multipart 본문 파싱
+    decode      이미지 디코딩
+    preprocess  모델 입력 전처리
+    forward     모델 추론
+    serialize   JSON 직렬화
+    server_other 서버 total 중 위 단계에 포함되지 않은 시간 (라우팅, 로깅 등)
+    download    응답 본문 수신
+"""
+
+import http.client
+import json
+import os
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from perf.results import percentile
+
+REQUEST_ID_HEADER = "X-Request-ID"
+SERVER_STAGES = ("recv", "decode", "preprocess", "forward", "serialize")
+COMPONENTS = ("connect", "upload", "queue_wait") + SERVER_STAGES + ("server_other", "download")
+
+
+def parse_server_timing(header):
+    """
+    Server-Timing 헤더 파싱
+
+    예: "decode;dur=3.1, forward;dur=120.5, total;dur=130.0" -> {"decode": 3.1, ...}
+    """
+    timings = {}
+    if not header:
+        return timings
+    for metric in header.split(","):
+        parts = [p.strip() for p in metric.split(";")]
+        name = parts[0]
+        if not name:
+            continue
+        duration = 0.0
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip() == "dur":
+                try:
+                    duration = float(value.strip().strip('"'))
+                except ValueError:
+                    pass
+        timings[name] = duration
+    return timings
+
+
+def _encode_multipart(field, filename, content, content_type="application/octet-stream"):
+    boundary = uuid.uuid4().hex
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return head + content + tail, f"multipart/form-data; boundary={boundary}"
+
+
+def timed_post(url, file_path, request_id=None, timeout=60):
+    """
+    이미지를 업로드하고 클라이언트 측 단계별 시간과 서버 Server-Timing 을 함께 측정
+
+    Returns:
+        dict: 원시 측정값 (make_api_call 결과와 동일한 필드 + client/server 단계 시간)
+    """
+    request_id = request_id or uuid.uuid4().hex
+    with open(file_path, "rb") as f:
+        content = f.read()
+    body, content_type = _encode_multipart("file", os.path.basename(file_path), content)
+
+    parts = urlsplit(url)
+    connection_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = connection_cls(parts.hostname, parts.port, timeout=timeout)
+    sample = {
+        "request_id": request_id,
+        "file_size": len(content) / 1024,
+    }
+    try:
+        start = time.perf_counter()
+        conn.connect()
+        connected = time.perf_counter()
+
+        conn.putrequest("POST", parts.path or "/")
+        conn.putheader("Content-Type", content_type)
+        conn.putheader("Content-Length", str(len(body)))
+        conn.putheader(REQUEST_ID_HEADER, request_id)
+        conn.endheaders()
+        conn.send(body)
+        uploaded = time.perf_counter()
+
+        response = conn.getresponse()
+        first_byte = time.perf_counter()
+        payload = response.read()
+        done = time.perf_counter()
+    except Exception as e:
+        sample.update({"status_code": 0, "response_time": 0, "processing_time_ms": 0, "error": str(e)})
+        return sample
+    finally:
+        conn.close()
+
+    server = parse_server_timing(response.getheader("Server-Timing"))
+    sample.update({
+        "status_code": response.status,
+        "response_time": (done - start) * 1000,
+        "echoed_request_id": response.getheader(REQUEST_ID_HEADER),
+        "client": {
+            "connect": (connected - start) * 1000,
+            "upload": (uploaded - connected) * 1000,
+            "wait": (first_byte - uploaded) * 1000,
+            "download": (done - first_byte) * 1000,
+        },
+        "server": server,
+        "processing_time_ms": 0,
+    })
+    if response.status == 200:
+        try:
+            sample["processing_time_ms"] = json.loads(payload).get("processing_time_ms", 0)
+        except ValueError:
+            pass
+    return sample
+
+
+def decompose(sample):
+    """
+    단일 요청의 응답 시간을 구성 요소로 분해 (보정이 없으면 구성 요소 합 == response_time)
+
+    queue_wait(서버 total 이 응답 헤더 수신 대기 시간보다 크게 측정된 경우, 시계 해상도 차이)와
+    server_other(단계 합이 서버 total 보다 큰 경우)는 음수 대신 0으로 보정하므로, 보정된 요청은
+    구성 요소 합이 response_time 보다 클 수 있습니다.
+    """
+    client = sample["client"]
+    server = sample.get("server", {})
+    server_total = server.get("total", 0.0)
+    stages = {name: server.get(name, 0.0) for name in SERVER_STAGES}
+    parts = {
+        "connect": client["connect"],
+        "upload": client["upload"],
+        "queue_wait": max(client["wait"] - server_total, 0.0),
+    }
+    parts.update(stages)
+    parts["server_other"] = max(server_total - sum(stages.values()), 0.0)
+    parts["download"] = client["download"]
+    return parts
+
+
+def breakdown(samples, percentiles=(50, 90, 99)):
+    """
+    성공한 요청들의 구성 요소별 백분위수 표
+
+    Returns:
+        dict: {"p50": {"connect": ..., ..., "response_time": ...}, ...}
+    """
+    decomposed = [(s["response_time"], decompose(s)) for s in samples
+                  if s.get("status_code") == 200 and "client" in s]
+    if not decomposed:
+        return {}
+    table = {}
+    for pct in percentiles:
+        row = {name: percentile([parts[name] for _, parts in decomposed], pct) for name in COMPONENTS}
+        row["response_time"] = percentile([total for total, _ in decomposed], pct)
+        table[f"p{pct}"] = row
+    return table
+
+
+def format_breakdown(table):
+    """breakdown() 결과를 콘솔 출력용 문자열로 변환"""
+    if not table:
+        return "측정된 요청이 없습니다"
+    columns = list(table)
+    lines = [f"{'component':<14}" + "".join(f"{c:>12}" for c in columns)]
+    for name in COMPONENTS + ("response_time",):
+        lines.append(f"{name:<14}" + "".join(f"{table[c][name]:>10.2f}ms" for c in columns))
+    return "\n".join(lines)
@@ -4,7 +4,9 @@ import pytest
 import os
 from unittest.mock import patch
 
-API_URL = "http://localhost:5000/analyze"
+# 임상 정확도 검증은 실제 모델 서버 필요 (inprocess 모드에서도 HTTP 사용)
+pytestmark = pytest.mark.real_model
+
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")
 
 # Clinical reference ranges based on medical literature
@@ -43,7 +45,7 @@ def get_ground_truth(image_filename):
             "severity": "none"
         }
 
-def test_clinical_finding_accuracy():
+def test_clinical_finding_accuracy(analyze):
     """
     Test that findings match clinical ground truth in terms of presence,
     location, and characterization
@@ -52,7 +54,7 @@ def test_clinical_finding_accuracy():
     print(f"image_file: {image_file}")
     ground_truth = get_ground_truth(image_file)
     
-    response = requests.post(API_URL, files={"file": open(image_file, "rb")})
+    response = analyze(image_file)
     assert response.status_code == 200
     result = response.json()
     print(f"result: {result}")
@@ -72,13 +74,13 @@ def test_clinical_finding_accuracy():
             assert any(ground_truth["location"] in finding["location"].lower() 
                        for finding in result["findings"]), "Finding location is incorrect"
 
-def test_meets_diagnostic_accuracy_requirements():
+def test_meets_diagnostic_accuracy_requirements(metadata_url):
     """
     Test that the model meets minimum sensitivity/specificity requirements
     for clinical deployment based on established medical standards
     """
     # Get metadata to check reported sensitivity/specificity
-    response = requests.get("http://localhost:5000/analyze/metadata")
+    response = requests.get(metadata_url)
     assert response.status_code == 200
     metadata = response.json()
     
@@ -89,14 +91,13 @@ def test_meets_diagnostic_accuracy_requirements():
     assert metadata["specificity"] >= CLINICAL_THRESHOLDS["nodule_detection"]["min_specificity"], \
         f"Model specificity {metadata['specificity']} below required clinical threshold"
 
-def test_confidence_calibration():
+def test_confidence_calibration(analyze):
     """
     Test that reported confidence levels are properly calibrated against
     clinically determined ground truth
     """
     """의료 AI 신뢰도 보정 적절성 테스트"""
-    response = requests.post(API_URL, 
-                           files={"image": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")})
+    response = analyze(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", field="image")
     assert response.status_code == 200
     result = response.json()
     
@@ -110,13 +111,12 @@ def test_confidence_calibration():
         assert result["confidence_level"] < CLINICAL_THRESHOLDS["confidence_levels"]["high"], \
             "Confidence too high for borderline case - could lead to clinical overconfidence"
 
-def test_roi_identification():
+def test_roi_identification(analyze):
     """
     Test that regions of interest (ROIs) are correctly identified in
     the medical images and match clinical expectations
     """
-    response = requests.post(API_URL, 
-                           files={"image": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")})
+    response = analyze(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", field="image")
     assert response.status_code == 200
     result = response.json()
     
@@ -135,13 +135,12 @@ def test_roi_identification():
                 assert 0 <= x < 1024 and 0 <= y < 1024, "ROI coordinates outside image bounds"
                 assert w > 0 and h > 0, "ROI dimensions cannot be negative or zero"
 
-def test_clinical_urgency_flagging():
+def test_clinical_urgency_flagging(analyze):
     """
     Test that critical findings are appropriately flagged for urgent review
     based on clinical significance
     """
-    response = requests.post(API_URL, 
-                           files={"image": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")})
+    response = analyze(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", field="image")
     assert response.status_code == 200
     result = response.json()
     
@@ -4,13 +4,13 @@ import jsonschema
 import pytest
 import statistics
 import os
-from datetime import datetime
 
-API_URL = "http://localhost:5000/analyze"
-METADATA_URL = "http://localhost:5000/analyze/metadata"
 
 # Load test data directory
 # TEST_DATA_DIR = "api_tests/test_data"  # 상대 경로 방식 (제거)
+# 모델 정확도/응답 시간 검증은 실제 모델 서버 필요 (inprocess 모드에서도 HTTP 사용)
+pytestmark = pytest.mark.real_model
+
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")  # 동적 절대 경로 방식
 
 def load_schema():
@@ -18,9 +18,9 @@ def load_schema():
     with open(schema_path) as f:
         return json.load(f)
 
-def test_model_metadata_compliance():
+def test_model_metadata_compliance(metadata_url):
     """Verify that the model metadata meets regulatory requirements"""
-    response = requests.get(METADATA_URL)
+    response = requests.get(metadata_url)
     assert response.status_code == 200
     
     metadata = response.json()
@@ -40,11 +40,10 @@ def test_model_metadata_compliance():
     assert "last_updated" in metadata, "Model must include last updated date"
     assert "model_id" in metadata, "Model must have unique identifier"
 
-def test_abnormal_detection_accuracy():
+def test_abnormal_detection_accuracy(analyze):
     """Test the model's ability to correctly identify abnormal images"""
     """의료 AI의 이상 감지 정확도 테스트"""
-    response = requests.post(API_URL, 
-                           files={"file": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")})
+    response = analyze(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg")
     assert response.status_code == 200
     
     data = response.json()
@@ -60,10 +59,9 @@ def test_abnormal_detection_accuracy():
     # Check confidence level for clinical usage
     assert data["result"]["confidence"] >= 0.8, "Confidence too low for clinical use"
 
-def test_normal_detection_accuracy():
+def test_normal_detection_accuracy(analyze):
     """Test the model's ability to correctly identify normal images"""
-    response = requests.post(API_URL, 
-                           files={"file": open(f"{TEST_DATA_DIR}/normal_chest_xray.jpg", "rb")})
+    response = analyze(f"{TEST_DATA_DIR}/normal_chest_xray.jpg")
     assert response.status_code == 200
     
     data = response.json()
@@ -76,13 +74,11 @@ def test_normal_detection_accuracy():
     assert data["abnormality_score"] < 0.3, "Incorrectly flagged normal image as abnormal"
 
 @pytest.mark.parametrize("rotation_angle", [0, 90, 180, 270])
-def test_rotation_invariance(rotation_angle):
+def test_rotation_invariance(rotation_angle, analyze):
     """Test model's resilience to image rotation (important for medical AI)"""
     # In a real implementation, this would rotate the image programmatically
     # Here we're just simulating the concept
-    response = requests.post(API_URL, 
-                           files={"file": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")},
-                           data={"rotation": rotation_angle})
+    response = analyze(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", data={"rotation": rotation_angle})
     
     assert response.status_code == 200
     data = response.json()
@@ -91,28 +87,23 @@ def test_rotation_invariance(rotation_angle):
     if rotation_angle in [0, 180]:  # Assuming these orientations preserve abnormality visibility
         assert data["abnormality_score"] > 0.5, f"Failed to detect abnormality at {rotation_angle}° rotation"
 
-def test_response_time_performance():
-    """Test that AI analysis meets clinical performance requirements"""
-    start_time = datetime.now()
-    
-    response = requests.post(API_URL, 
+@pytest.mark.latency_budget(5000, percentile=95)
+def test_response_time_performance(api_url):
+    """Test that AI analysis meets clinical performance requirements (p95 within 5000ms)"""
+    response = requests.post(api_url, 
                            files={"file": open(f"{TEST_DATA_DIR}/normal_chest_xray.jpg", "rb")})
     
-    end_time = datetime.now()
-    duration_ms = (end_time - start_time).total_seconds() * 1000
-    
     assert response.status_code == 200
-    assert duration_ms < 5000, f"Analysis took too long: {duration_ms}ms (max allowed: 5000ms)"
 
-def test_consistency_across_multiple_runs():
+@pytest.mark.fresh_analysis
+def test_consistency_across_multiple_runs(analyze):
     """Test consistency of AI predictions across multiple analyses of same image"""
     abnormality_scores = []
     confidence_levels = []
     
     # Run multiple analyses (5 times)
     for _ in range(5):
-        response = requests.post(API_URL, 
-                               files={"file": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")})
+        response = analyze(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg")
         assert response.status_code == 200
         data = response.json()
         abnormality_scores.append(data["abnormality_score"])
@@ -126,10 +117,11 @@ def test_consistency_across_multiple_runs():
     assert abnormality_std_dev < 0.01, f"Model predictions inconsistent: std dev = {abnormality_std_dev}"
     assert confidence_std_dev < 0.01, f"Confidence levels inconsistent: std dev = {confidence_std_dev}"
 
-def test_large_image_handling():
-    """Test model's ability to handle large resolution medical images"""
-    response = requests.post(API_URL, 
-                           files={"file": open(f"{TEST_DATA_DIR}/large_image.jpg", "rb")})
+@pytest.mark.fresh_analysis
+@pytest.mark.latency_budget(10000, percentile=95, repetitions=3)
+def test_large_image_handling(analyze):
+    """Test model's ability to handle large resolution medical images (p95 within 10000ms)"""
+    response = analyze(f"{TEST_DATA_DIR}/large_image.jpg")
     
     assert response.status_code == 200
     data = response.json()
@@ -137,13 +129,10 @@ def test_large_image_handling():
     # Verify processing succeeded
     assert "abnormality_score" in data, "Failed to process large image"
     assert "processing_time_ms" in data, "Processing time not reported for large image"
-    
-    # Check processing time is reasonable for large images
-    assert data["processing_time_ms"] < 10000, "Processing time too long for large image"
 
-def test_hl7_fhir_output_compliance():
+def test_hl7_fhir_output_compliance(api_url):
     """Test if API results can be exported in healthcare interoperability format"""
-    response = requests.post(f"{API_URL}/fhir", 
+    response = requests.post(f"{api_url}/fhir", 
                            files={"file": open(f"{TEST_DATA_DIR}/abnormal_chest_xray.jpg", "rb")})
     
     # While this might fail on the mock server, we're testing the concept
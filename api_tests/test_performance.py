@@ -1,46 +1,23 @@
-import warnings
-warnings.filterwarnings("ignore", "Glyph \d+ .* missing from font.*")
 import requests
-import json
 import time
 import os
 import pytest
 import statistics
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import matplotlib.pyplot as plt
-import numpy as np
 from tqdm import tqdm
-import matplotlib as mpl
 
-# 한글 폰트 설정
-# Windows의 경우
-if os.name == 'nt':
-    # 맑은 고딕 폰트 사용
-    # font_path = r'C:\Windows\Fonts\malgun.ttf'
-    font_path = r'C:\Windows\Fonts\Arial\arial.ttf'
-    if os.path.exists(font_path):
-        font_prop = mpl.font_manager.FontProperties(fname=font_path)
-        mpl.rcParams['font.family'] = font_prop.get_name()
-    else:
-        # 맑은 고딕 폰트가 없는 경우 기본 폰트 사용
-        mpl.rcParams['font.family'] = 'sans-serif'
-        mpl.rcParams['font.sans-serif'] = ['Arial', 'Helvetica', 'DejaVu Sans']
-else:
-    # Linux/Mac의 경우
-    mpl.rcParams['font.family'] = 'sans-serif'
-    mpl.rcParams['font.sans-serif'] = ['NanumGothic', 'NanumBarunGothic', 'Malgun Gothic', 'Arial', 'Helvetica']
+from perf.corpus import QUICK_GRID, format_scaling, generate_corpus, scaling_benchmark
+from perf.loadgen import distributed_benchmark, format_merged
+from perf.results import save_results
+from perf.soak import discover_server_pid, format_analysis, soak_benchmark
+from perf.timing import breakdown, format_breakdown, timed_post
 
-# 경고 필터 설정 (선택사항)
-import warnings
-warnings.filterwarnings("ignore", "Glyph \d+ .* missing from font.*")
-warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
+# 차트는 `python -m perf.report` 로 별도 생성합니다 (테스트는 원시 결과만 기록)
 
-API_URL = "http://localhost:5000/analyze"
-TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")
-RESULTS_DIR = os.path.join(os.path.dirname(__file__), "performance_results")
+# 성능 측정은 실제 모델 서버 필요 (inprocess 모드에서도 HTTP 사용)
+pytestmark = pytest.mark.real_model
 
-# 결과 디렉토리가 없으면 생성
-os.makedirs(RESULTS_DIR, exist_ok=True)
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")
 
 def get_test_images():
     """테스트 데이터 디렉토리에서 이미지 파일 목록 가져오기"""
@@ -50,12 +27,12 @@ def get_test_images():
         if f.endswith(('.jpg', '.png', '.jpeg'))
     ]
 
-def make_api_call(file_path):
+def make_api_call(api_url, file_path):
     """API 호출 및 응답 시간 측정"""
     try:
         start_time = time.time()
         with open(file_path, "rb") as f:
-            response = requests.post(API_URL, files={"file": f})
+            response = requests.post(api_url, files={"file": f})
         end_time = time.time()
         
         if response.status_code == 200:
@@ -84,14 +61,14 @@ def make_api_call(file_path):
             "error": str(e)
         }
 
-def test_baseline_performance():
+def test_baseline_performance(api_url):
     """기본 성능 테스트 - 단일 이미지 처리 시간 측정"""
     images = get_test_images()
     if not images:
         pytest.skip("테스트 이미지가 없습니다")
     
     sample_image = images[0]
-    result = make_api_call(sample_image)
+    result = make_api_call(api_url, sample_image)
     
     # 응답이 성공인지 확인
     assert result["status_code"] == 200, f"API 호출 실패: {result.get('error', '')}"
@@ -105,7 +82,7 @@ def test_baseline_performance():
     print(f"응답 시간: {result['response_time']:.2f} ms")
     print(f"서버 처리 시간: {result['processing_time_ms']:.2f} ms")
 
-def test_concurrent_load():
+def test_concurrent_load(api_url):
     """동시 부하 테스트 - 다수의 동시 요청 처리"""
     images = get_test_images()
     if len(images) < 3:
@@ -119,7 +96,7 @@ def test_concurrent_load():
     results = []
     with ThreadPoolExecutor(max_workers=concurrent_requests) as executor:
         # 각 이미지에 대해 API 호출 함수 실행
-        futures = [executor.submit(make_api_call, img) for img in images[:concurrent_requests]]
+        futures = [executor.submit(make_api_call, api_url, img) for img in images[:concurrent_requests]]
         # 결과 수집
         for future in tqdm(as_completed(futures), total=len(futures), desc="Processing concurrent requests"):
             results.append(future.result())
@@ -142,18 +119,86 @@ def test_concurrent_load():
     print(f"평균 응답 시간: {avg_response_time:.2f} ms")
     print(f"최대 응답 시간: {max_response_time:.2f} ms")
     print(f"서버 평균 처리 시간: {avg_processing_time:.2f} ms")
+
+    # 원시 결과 저장 (시각화는 perf.report 에서 수행)
+    save_results("concurrent_load", results, concurrency=concurrent_requests)
+
+def test_latency_breakdown(api_url):
+    """지연 시간 분해 - 클라이언트 단계 시간과 서버 Server-Timing 을 요청 ID 로 결합"""
+    images = get_test_images()
+    if not images:
+        pytest.skip("테스트 이미지가 없습니다")
+    
+    repetitions = 20
+    results = []
+    for i in tqdm(range(repetitions), desc="Measuring latency breakdown"):
+        sample = timed_post(api_url, images[i % len(images)], request_id=f"latency-breakdown-{i}")
+        results.append(sample)
+    
+    successful = [r for r in results if r["status_code"] == 200]
+    assert len(successful) == repetitions, f"일부 요청 실패: {len(successful)}/{repetitions} 성공"
+    
+    # 서버가 요청 ID 를 그대로 돌려주고 단계별 시간을 제공해야 결합 가능
+    for sample in successful:
+        assert sample["echoed_request_id"] == sample["request_id"], "요청 ID 가 응답에 반환되지 않았습니다"
+        assert "total" in sample["server"], "Server-Timing 헤더가 없습니다"
+    
+    table = breakdown(successful)
+    save_results("latency_breakdown", results, repetitions=repetitions, breakdown=table)
+    
+    print(f"\n지연 시간 분해 (요청 수: {repetitions}):")
+    print(format_breakdown(table))
+
+def test_distributed_load(api_url):
+    """분산 부하 테스트 - 다중 클라이언트 프로세스의 히스토그램/카운터 병합"""
+    images = get_test_images()
+    if not images:
+        pytest.skip("테스트 이미지가 없습니다")
+    
+    processes = int(os.environ.get("LOADGEN_PROCESSES", "2"))
+    rate = float(os.environ.get("LOADGEN_RATE", "4"))
+    duration_s = float(os.environ.get("LOADGEN_DURATION_S", "3"))
+    
+    merged = distributed_benchmark(api_url, images, processes=processes, rate=rate, duration_s=duration_s)
+    
+    print(f"\n분산 부하 테스트 결과 (프로세스 수: {processes}):")
+    print(format_merged(merged))
     
-    # 응답 시간에 대한 시각화 저장
-    plt.figure(figsize=(10, 6))
-    plt.bar(range(len(response_times)), response_times)
-    plt.xlabel('Request Number')
-    plt.ylabel('Response Time (ms)')
-    plt.title(f'Concurrent Requests ({concurrent_requests}) Response Times')
-    plt.grid(True, alpha=0.3)
-    plt.savefig(os.path.join(RESULTS_DIR, 'concurrent_response_times.png'))
+    counters = merged["counters"]
+    assert len(merged["workers"]) == processes
+    assert counters.get("sent", 0) > 0, "전송된 요청이 없습니다"
+    assert counters.get("status_200", 0) == counters["sent"], f"일부 요청 실패: {counters}"
+    # 병합된 히스토그램은 모든 워커의 성공 요청 수를 그대로 포함해야 함
+    assert merged["latency"].count == counters["status_200"]
+
+@pytest.mark.skipif(not os.environ.get("SOAK_DURATION_S"),
+                    reason="장시간 내구성 테스트는 SOAK_DURATION_S 설정 시에만 실행")
+def test_soak_endurance(api_url):
+    """내구성 테스트 - 일정 부하에서 서버 메모리/스레드/FD 증가 및 지연 시간 드리프트 확인"""
+    images = get_test_images()
+    if not images:
+        pytest.skip("테스트 이미지가 없습니다")
+    
+    duration_s = float(os.environ["SOAK_DURATION_S"])
+    rate = float(os.environ.get("SOAK_RATE", "1"))
+    pid = discover_server_pid(api_url.rsplit("/analyze", 1)[0])
+    if pid is None:
+        print("경고: 서버 PID 를 /proc 에서 확인할 수 없어 리소스 샘플링 없이 진행합니다")
+    
+    analysis = soak_benchmark(
+        api_url, images, duration_s, rate=rate, pid=pid,
+        sample_interval_s=float(os.environ.get("SOAK_SAMPLE_INTERVAL_S", "5")),
+    )
+    
+    print(f"\n내구성 테스트 결과 ({duration_s:.0f}초, {rate}/s):")
+    print(format_analysis(analysis))
+    
+    assert not analysis["leaks"], f"리소스 누수 의심: {', '.join(analysis['leaks'])}"
+    assert not analysis["drift_exceeded"], \
+        f"지연 시간 드리프트 초과: {analysis['latency_drift']:.2f}"
 
 @pytest.mark.skip(reason="장시간 실행되는 부하 테스트는 필요할 때만 실행")
-def test_extended_load():
+def test_extended_load(api_url):
     """확장 부하 테스트 - 다양한 수준의 동시 요청 처리"""
     images = get_test_images()
     if len(images) < 5:
@@ -161,8 +206,7 @@ def test_extended_load():
     
     # 테스트할 동시 요청 수준 (1, 5, 10, 15, 20)
     concurrency_levels = [1, 5, 10, 15, 20]
-    avg_times = []
-    max_times = []
+    all_results = []
     
     for concurrency in concurrency_levels:
         # 사용 가능한 이미지 수에 맞게 조정
@@ -171,46 +215,49 @@ def test_extended_load():
             print(f"경고: 요청된 동시성 {concurrency}를 위한 충분한 이미지가 없습니다. {actual_concurrency}로 조정합니다.")
         
         results = []
-        start_time = time.time()
         
         with ThreadPoolExecutor(max_workers=actual_concurrency) as executor:
             # 현재 동시성 수준에 맞게 이미지 선택
             selected_images = images[:actual_concurrency]
             
             # 각 이미지에 대해 API 호출 함수 실행
-            futures = [executor.submit(make_api_call, img) for img in selected_images]
+            futures = [executor.submit(make_api_call, api_url, img) for img in selected_images]
             # 결과 수집
             for future in as_completed(futures):
-                results.append(future.result())
+                results.append(dict(future.result(), concurrency=actual_concurrency))
         
+        all_results.extend(results)
         response_times = [r["response_time"] for r in results if r["status_code"] == 200]
         
         if response_times:
             avg_time = statistics.mean(response_times)
             max_time = max(response_times)
-            avg_times.append(avg_time)
-            max_times.append(max_time)
-            
             print(f"동시성 수준 {actual_concurrency}: 평균 {avg_time:.2f}ms, 최대 {max_time:.2f}ms")
         else:
             print(f"동시성 수준 {actual_concurrency}: 모든 요청 실패")
-            avg_times.append(0)
-            max_times.append(0)
-    
-    # 결과를 그래프로 시각화
-    x = np.array(concurrency_levels[:len(avg_times)])
-    
-    plt.figure(figsize=(12, 7))
-    plt.plot(x, avg_times, 'o-', label='Average Response Time')
-    plt.plot(x, max_times, 's-', label='Maximum Response Time')
-    plt.xlabel('Number of Concurrent Requests')
-    plt.ylabel('Response Time (ms)')
-    plt.title('API Response Time by Concurrency Level')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.savefig(os.path.join(RESULTS_DIR, 'scalability_test.png'))
+    
+    # 원시 결과 저장 (시각화는 perf.report 에서 수행)
+    save_results("extended_load", all_results, concurrency_levels=concurrency_levels)
+
+@pytest.mark.skipif(not os.environ.get("SCALING_BENCHMARK"),
+                    reason="해상도/포맷 스케일링 벤치마크는 SCALING_BENCHMARK 설정 시에만 실행")
+def test_resolution_format_scaling(api_url):
+    """해상도/포맷 스케일링 - 합성 코퍼스 셀별 서버 디코딩/전처리/전체 처리 시간 측정"""
+    if os.environ.get("SCALING_FULL_GRID"):
+        cells = generate_corpus()
+    else:
+        cells = generate_corpus(**QUICK_GRID)
+    repetitions = int(os.environ.get("SCALING_REPETITIONS", "2"))
+    
+    cell_summary, fits = scaling_benchmark(api_url, cells, repetitions=repetitions)
+    
+    print(f"\n해상도/포맷 스케일링 결과 (셀 수: {len(cells)}, 반복: {repetitions}):")
+    print(format_scaling(cell_summary, fits))
+    
+    assert len(cell_summary) == len(cells), \
+        f"일부 셀 처리 실패: {len(cell_summary)}/{len(cells)} 성공"
 
-def test_response_time_vs_filesize():
+def test_response_time_vs_filesize(api_url):
     """파일 크기와 응답 시간 관계 분석"""
     images = get_test_images()
     if len(images) < 3:
@@ -218,7 +265,7 @@ def test_response_time_vs_filesize():
     
     results = []
     for image in tqdm(images, desc="Analyzing response time by file size"):
-        results.append(make_api_call(image))
+        results.append(make_api_call(api_url, image))
     
     # 성공한 요청만 필터링
     successful_results = [r for r in results if r["status_code"] == 200]
@@ -229,29 +276,9 @@ def test_response_time_vs_filesize():
     file_sizes = [r["file_size"] for r in successful_results]
     response_times = [r["response_time"] for r in successful_results]
     
-    # 산점도 그래프로 시각화
-    plt.figure(figsize=(10, 6))
-    plt.scatter(file_sizes, response_times)
-    
-    # 추세선 추가
-    z = np.polyfit(file_sizes, response_times, 1)
-    p = np.poly1d(z)
-    plt.plot(file_sizes, p(file_sizes), "r--", alpha=0.8)
-    
-    plt.xlabel('File Size (KB)')
-    plt.ylabel('Response Time (ms)')
-    plt.title('Relationship between File Size and API Response Time')
-    plt.grid(True, alpha=0.3)
-    
-    # 상관관계 계산
-    correlation = np.corrcoef(file_sizes, response_times)[0, 1]
-    plt.annotate(f'Correlation: {correlation:.2f}', 
-                xy=(0.05, 0.95), 
-                xycoords='axes fraction')
-    
-    plt.savefig(os.path.join(RESULTS_DIR, 'filesize_vs_responsetime.png'))
+    # 원시 결과 저장 (산점도/추세선/상관계수는 perf.report 에서 계산)
+    save_results("response_time_vs_filesize", results)
     
     print(f"\n파일 크기와 응답 시간 분석:")
     print(f"파일 크기 범위: {min(file_sizes):.2f} ~ {max(file_sizes):.2f} KB")
     print(f"응답 시간 범위: {min(response_times):.2f} ~ {max(response_times):.2f} ms")
-    print(f"상관계수: {correlation:.2f}") 
\ No newline at end of file
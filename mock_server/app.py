@@ -3,14 +3,22 @@ import warnings
 # Suppress FutureWarnings
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-from flask import Flask, request, jsonify
+import time
+
+# 프로세스 시작 시각 (준비 완료 신호의 기동 시간 계산용)
+PROCESS_START = time.time()
+
+from flask import Flask, request, jsonify, g
 from transformers import AutoFeatureExtractor, AutoModelForImageClassification
 from PIL import Image
 import torch
 import io
-import time
 import os
+import json
+import uuid
+from contextlib import contextmanager
 from health_check import add_health_endpoint
+from tiny_model import TINY_MODEL_NAME, build_tiny_model
 
 app = Flask(__name__)
 
@@ -20,8 +28,12 @@ add_health_endpoint(app)
 MODEL_NAME = os.environ.get("MODEL_NAME", "google/vit-base-patch16-224")
 
 print(f"모델 로딩 시작: {MODEL_NAME}")
-extractor = AutoFeatureExtractor.from_pretrained(MODEL_NAME)
-model = AutoModelForImageClassification.from_pretrained(MODEL_NAME)
+if MODEL_NAME == TINY_MODEL_NAME:
+    # 기능 테스트용 초소형 랜덤 가중치 모델 (다운로드 없음)
+    extractor, model = build_tiny_model()
+else:
+    extractor = AutoFeatureExtractor.from_pretrained(MODEL_NAME)
+    model = AutoModelForImageClassification.from_pretrained(MODEL_NAME)
 print("모델 로딩 완료")
 
 # 디바이스 설정 (GPU 사용 가능 시)
@@ -30,11 +42,64 @@ print(f"사용 중인 디바이스: {device}")
 model.to(device)
 model.eval()
 
+
+def warm_up():
+    """첫 요청에 지연 초기화 비용이 몰리지 않도록 더미 이미지로 1회 추론"""
+    dummy = Image.new("RGB", (224, 224))
+    inputs = extractor(images=dummy, return_tensors="pt").to(device)
+    with torch.no_grad():
+        model(**inputs)
+
+
+warm_up()
+print("모델 워밍업 완료")
+
+# 요청 추적 헤더
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+@app.before_request
+def start_request_timing():
+    """요청 ID 할당 및 단계별 처리 시간 측정 시작"""
+    g.request_start = time.perf_counter()
+    g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+    g.server_timings = []
+
+
+@contextmanager
+def server_timing(name):
+    """처리 단계 소요 시간을 Server-Timing 헤더용으로 기록"""
+    stage_start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.server_timings.append((name, (time.perf_counter() - stage_start) * 1000))
+
+
+@app.after_request
+def add_timing_headers(response):
+    """
+    요청 ID 반환 및 Server-Timing 헤더 추가
+    (클라이언트에서 네트워크/대기/모델 연산 시간을 분리하는 데 사용)
+    """
+    if "request_start" not in g:
+        return response
+    timings = list(g.server_timings)
+    timings.append(("total", (time.perf_counter() - g.request_start) * 1000))
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    response.headers["Server-Timing"] = ", ".join(f"{name};dur={duration:.3f}" for name, duration in timings)
+    return response
+
+
 @app.route("/analyze", methods=["POST"], strict_slashes=False)
 def analyze_image():
     start_time = time.time()
 
-    if "file" not in request.files:
+    # 업로드 본문 수신 및 multipart 파싱
+    with server_timing("recv"):
+        has_file = "file" in request.files
+
+    if not has_file:
         print("파일이 없습니다!")  # 🔥 디버그용 출력
         return jsonify({"status": "error", "message": "No file uploaded"}), 400
 
@@ -42,19 +107,21 @@ def analyze_image():
     print(f"업로드된 파일 이름: {file.filename}")  # 🔥 디버그용 출력
 
     try:
-        image = Image.open(io.BytesIO(file.read())).convert("RGB")
+        with server_timing("decode"):
+            image = Image.open(io.BytesIO(file.read())).convert("RGB")
     except Exception as e:
         print(f"이미지 열기 실패: {e}")  # 🔥 디버그용 출력
         return jsonify({"status": "error", "message": "Failed to process image"}), 400
 
-    inputs = extractor(images=image, return_tensors="pt").to(device)
+    with server_timing("preprocess"):
+        inputs = extractor(images=image, return_tensors="pt").to(device)
 
-    with torch.no_grad():
+    with server_timing("forward"), torch.no_grad():
         outputs = model(**inputs)
         probs = torch.nn.functional.softmax(outputs.logits, dim=1)
         pred_class_idx = probs.argmax(dim=1).item()
         confidence = probs[0, pred_class_idx].item()
-        print(f"confidence: {confidence}")
+    print(f"confidence: {confidence}")
     predicted_label = model.config.id2label[pred_class_idx]
 
     # 결과 생성
@@ -72,7 +139,10 @@ def analyze_image():
         }
     }
 
-    return jsonify(response), 200
+    with server_timing("serialize"):
+        body = jsonify(response)
+
+    return body, 200
 
 @app.route("/analyze/error", methods=["POST"], strict_slashes=False)
 def simulate_error():
@@ -116,10 +186,34 @@ def index():
         "endpoints": ["/analyze", "/health", "/analyze/error", "/analyze/metadata"]
     }), 200
 
+
+def signal_ready(ready_file, port):
+    """
+    준비 완료 신호: 모델 로딩/워밍업과 포트 바인딩이 끝난 뒤 ready 파일을 원자적으로 생성
+
+    파일 내용: {"pid", "port", "startup_s"} (PORT=0 이면 OS 가 할당한 실제 포트)
+    """
+    tmp_path = f"{ready_file}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"pid": os.getpid(), "port": port, "startup_s": round(time.time() - PROCESS_START, 3)}, f)
+    os.replace(tmp_path, ready_file)
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     host = os.environ.get("HOST", "0.0.0.0")
     debug = os.environ.get("DEBUG", "False").lower() == "true"
-    
-    print(f"서버 시작: {host}:{port} (디버그: {debug})")
-    app.run(host=host, port=port, debug=debug)
\ No newline at end of file
+    ready_file = os.environ.get("READY_FILE")
+
+    if debug:
+        print(f"서버 시작: {host}:{port} (디버그: {debug})")
+        app.run(host=host, port=port, debug=debug)
+    else:
+        from werkzeug.serving import make_server
+
+        # 바인딩을 먼저 수행하여 실제 포트를 확인한 뒤 준비 완료 신호 전송
+        server = make_server(host, port, app, threaded=True)
+        print(f"서버 시작: {host}:{server.port} (기동 {time.time() - PROCESS_START:.1f}초)")
+        if ready_file:
+            signal_ready(ready_file, server.port)
+        server.serve_forever()
\ No newline at end of file
@@ -25,7 +25,9 @@ def add_health_endpoint(app):
             "status": "ok",
             "timestamp": time.time(),
             "service": "lunitcare-mock-api",
-            "version": os.environ.get("SERVICE_VERSION", "development")
+            "version": os.environ.get("SERVICE_VERSION", "development"),
+            # 같은 호스트에서 /proc 기반 리소스 모니터링(soak 테스트)에 사용
+            "pid": os.getpid()
         }), 200
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""
+테스트용 초소형 랜덤 가중치 ViT 모델
+
+응답 형식/상태 코드만 확인하는 기능 테스트에서 google/vit-base-patch16-224 대신 사용합니다.
+로컬 설정으로 즉시 생성하므로 네트워크 접근이나 모델 다운로드가 필요 없고 수 밀리초 안에
+로딩됩니다. 시드가 고정되어 있어 같은 입력에는 항상 같은 결과를 반환합니다.
+
+사용법:
+$ MODEL_NAME=tiny-random-vit python app.py
+"""
+
+import torch
+from transformers import ViTConfig, ViTForImageClassification, ViTImageProcessor
+
+# MODEL_NAME 으로 이 값을 지정하면 초소형 모델을 사용
+TINY_MODEL_NAME = "tiny-random-vit"
+
+# 대장암 조직 분류(CRC) 클래스
+CRC_LABELS = ["ADI", "BACK", "DEB", "LYM", "MUC", "MUS", "NORM", "STR", "TUM"]
+
+
+def build_tiny_model(seed=0):
+    """
+    초소형 ViT 분류 모델과 전처리기 생성
+
+    Returns:
+        tuple: (ViTImageProcessor, ViTForImageClassification)
+    """
+    torch.manual_seed(seed)
+    config = ViTConfig(
+        image_size=32,
+        patch_size=8,
+        num_channels=3,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        num_labels=len(CRC_LABELS),
+        id2label=dict(enumerate(CRC_LABELS)),
+        label2id={label: index for index, label in enumerate(CRC_LABELS)},
+    )
+    model = ViTForImageClassification(config)
+    extractor = ViTImageProcessor(size={"height": config.image_size, "width": config.image_size})
+    return extractor, model
@@ -4,21 +4,46 @@ LunitCare QA - ISO 13485 요구사항 추적 리포트 생성기 - CI 또는 수
 
 이 스크립트는:
 1. pytest 및 playwright 테스트 결과에서 요구사항 추적 데이터 수집 (pytest 실행 결과에서 요구사항 ID별 Pass/Fail 정리)
-2. markdown 형식의 추적 매트릭스 생성
+2. markdown 형식의 추적 매트릭스 생성 (선택적으로 HTML/CSV/JSON 리포트도 함께 생성, trace_report.py)
 3. traceability_matrix.md 파일 자동 업데이트
 
+입력 파일(요구사항 정의, 테스트 결과, 이 스크립트)의 해시가 이전 실행과 같으면 아무것도 하지 않으며,
+요구사항 파싱 결과는 scripts/temp 에 캐시합니다. 날짜를 제외한 내용이 기존 매트릭스와 같으면
+파일(및 .bak 백업)을 다시 쓰지 않습니다.
+
 사용법:
 $ python scripts/generate_trace_report.py
+$ python scripts/generate_trace_report.py --run-tests   # pytest 와 E2E 를 동시에 실행
+$ python scripts/generate_trace_report.py --force   # 캐시 무시
+$ python scripts/generate_trace_report.py --format html --format csv   # docs/traceability_matrix.html/.csv 추가 생성
+$ python scripts/generate_trace_report.py --pytest-results "reports/trace/*/req_test_results.json" --e2e-results reports/e2e
+  # 병렬 CI 작업(샤드)별 결과 파일을 병합하여 하나의 매트릭스 생성
+
+테스트 결과가 바뀐 실행마다 요구사항별 결과를 scripts/temp/trace_history.sqlite 에 누적합니다
+(조회: scripts/trace_history.py).
 """
 
+import argparse
+import glob
+import hashlib
+import io
 import json
 import os
 import re
 import sys
 from pathlib import Path
-from datetime import datetime
+from itertools import zip_longest
+import signal
 import subprocess
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import trace_history
+import trace_report
+from playwright_stream import iter_spec_results
+from trace_report import FAIL_EMOJI, PARTIAL_EMOJI, PASS_EMOJI, SKIP_EMOJI
 
 # 프로젝트 루트 디렉토리 계산
 PROJECT_ROOT = Path(__file__).parent.parent.absolute()
@@ -33,12 +58,66 @@ TRACEABILITY_MATRIX_FILE = DOCS_DIR / "traceability_matrix.md"
 # 테스트 결과 파일
 PYTEST_RESULTS_FILE = TEMP_DIR / "req_test_results.json"
 E2E_RESULTS_FILE = TEMP_DIR / "e2e_results.json"
+# 입력 지문 및 요구사항 파싱 결과 캐시
+CACHE_FILE = TEMP_DIR / "trace_report_cache.json"
+CACHE_VERSION = 2
+# 매트릭스 내용 비교 시 제외하는 줄 (생성 날짜)
+UPDATE_DATE_PREFIX = "*마지막 업데이트:"
+# 샤드 결과 병합 시 상태 우선순위 (클수록 우선: 실패 > 통과 > 건너뜀/미실행)
+STATUS_PRECEDENCE = {"failed": 3, "error": 3, "passed": 2, "skipped": 1, "notrun": 0}
+# --run-tests 스위트별 기본 제한 시간(초)
+SUITE_TIMEOUT_S = 1800
 
-# 결과 이모지
-PASS_EMOJI = "✅ Pass"
-FAIL_EMOJI = "❌ Fail"
-SKIP_EMOJI = "⚠️ 미테스트"
-PARTIAL_EMOJI = "⚠️ 부분통과"
+# 리포트 출력 형식 (md: 추적 매트릭스, 그 외는 같은 이름의 다른 확장자 파일)
+REPORT_FORMATS = tuple(trace_report.WRITERS)
+
+def file_digest(path):
+    """파일 내용의 SHA-256 해시 (파일이 없으면 None)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def inputs_digest(paths):
+    """입력 파일 목록 전체의 지문"""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode("utf-8"))
+    for path in paths:
+        digest.update(f"{path}={file_digest(path)}".encode("utf-8"))
+    return digest.hexdigest()
+
+def load_cache():
+    """캐시 파일 로딩 (없거나 버전이 다르면 빈 캐시)"""
+    if not CACHE_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == CACHE_VERSION else {}
+
+def save_cache(cache):
+    cache["version"] = CACHE_VERSION
+    tmp_file = CACHE_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_file, CACHE_FILE)
+
+def parse_requirements_cached(cache):
+    """
+    요구사항 파싱 (요구사항 파일 해시가 캐시와 같으면 캐시된 파싱 결과 사용)
+
+    Returns:
+        dict: 요구사항 정보 딕셔너리 (호출마다 새 객체)
+    """
+    digest = file_digest(REQUIREMENTS_FILE)
+    cached = cache.get("requirements")
+    if digest is not None and cached and cached.get("digest") == digest:
+        return json.loads(json.dumps(cached["data"]))
+
+    requirements = parse_requirements()
+    cache["requirements"] = {"digest": digest, "data": requirements}
+    return json.loads(json.dumps(requirements))
 
 def parse_requirements():
     """
@@ -90,53 +169,144 @@ def parse_requirements():
     
     return requirements
 
-def parse_pytest_results():
+def parse_pytest_results(path=PYTEST_RESULTS_FILE):
     """
     pytest 결과 파일에서 요구사항 ID와 테스트 결과 파싱
     
     Returns:
         dict: 요구사항 ID별 테스트 결과
     """
-    if not PYTEST_RESULTS_FILE.exists():
-        print(f"경고: pytest 결과 파일이 없습니다: {PYTEST_RESULTS_FILE}")
+    if not path.exists():
+        print(f"경고: pytest 결과 파일이 없습니다: {path}")
         return {}
     
-    with open(PYTEST_RESULTS_FILE, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def parse_e2e_results():
+def resolve_result_files(specs, default):
+    """
+    결과 파일 지정(파일, 디렉토리, glob 패턴) 목록을 파일 경로 목록으로 변환
+    
+    디렉토리는 그 안의 *.json 파일 전체를 의미하며, 지정이 없으면 기본 파일을 사용합니다.
+    
+    Returns:
+        list: 중복을 제거한 결과 파일 경로 (Path)
+    """
+    if not specs:
+        return [default]
+    
+    paths = []
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            matches = sorted(path.glob("*.json"))
+        elif any(char in spec for char in "*?["):
+            matches = sorted(Path(match) for match in glob.glob(spec, recursive=True))
+        else:
+            matches = [path]
+        if not matches:
+            print(f"경고: 결과 파일을 찾을 수 없습니다: {spec}")
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+def _status_rank(status):
+    return STATUS_PRECEDENCE.get(str(status).lower(), 0)
+
+def merge_shard_results(shards):
+    """
+    샤드(병렬 CI 작업)별 요구사항 결과를 하나로 병합
+    
+    요구사항 상태는 실패 > 통과 > 미실행 순으로 우선하며, 테스트 목록은 순서를 유지한 채
+    합치고, 같은 테스트가 여러 샤드에 있으면 더 나쁜 결과의 상세 정보를 사용합니다.
+    
+    Args:
+        shards (iterable): parse_pytest_results()/parse_e2e_results() 결과 목록
+        
+    Returns:
+        dict: 같은 형식의 병합된 결과
+    """
+    merged = {}
+    for shard in shards:
+        for req_id, result in shard.items():
+            target = merged.setdefault(req_id, {"tests": [], "status": result.get("status", "NotRun"), "results": {}})
+            
+            known = set(target["tests"])
+            target["tests"].extend(test for test in result.get("tests", []) if test not in known)
+            
+            if _status_rank(result.get("status")) > _status_rank(target["status"]):
+                target["status"] = result["status"]
+            
+            for test, detail in result.get("results", {}).items():
+                current = target["results"].get(test)
+                if current is None or _status_rank(detail.get("outcome")) > _status_rank(current.get("outcome")):
+                    target["results"][test] = detail
+    return merged
+
+def display_test_name(test_id):
+    """
+    pytest 노드 ID 를 매트릭스 표시용 이름으로 축약 (디렉토리 경로 제거)
+
+    예: api_tests/test_requirements_example.py::test_valid_image_upload
+        -> test_requirements_example.py::test_valid_image_upload
+    """
+    path, separator, name = test_id.partition("::")
+    if not separator:
+        return test_id
+    return f"{os.path.basename(path)}::{name}"
+
+def format_pytest_test(test_id, detail):
+    """
+    pytest 테스트 표시 문자열 (지연 시간 예산이 있으면 측정값 포함)
+
+    예: test_requirements_example.py::test_api_response_time (mean 412ms / 2000ms)
+    """
+    name = display_test_name(test_id)
+    latency = (detail or {}).get("latency")
+    if latency:
+        name += f" ({latency['statistic']} {latency['measured_ms']:.0f}ms / {latency['threshold_ms']}ms)"
+    return name
+
+def parse_e2e_results(path=E2E_RESULTS_FILE):
     """
     Playwright E2E 테스트 결과에서 요구사항 ID 추출
     (테스트 제목 형식: [REQ-001,REQ-002] 테스트 제목)
     
+    중첩된 suites/specs/tests/results 구조를 스트리밍으로 읽으므로 리포트 크기와 무관하게
+    메모리 사용량이 일정하며, 재시도가 있는 테스트는 최종 시도 결과를 사용합니다.
+    
     Returns:
         dict: 요구사항 ID별 테스트 결과
     """
-    if not E2E_RESULTS_FILE.exists():
-        print(f"경고: E2E 테스트 결과 파일이 없습니다: {E2E_RESULTS_FILE}")
+    if not path.exists():
+        print(f"경고: E2E 테스트 결과 파일이 없습니다: {path}")
         return {}
     
-    with open(E2E_RESULTS_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
     e2e_results = {}
-    pattern = r"\[(REQ-\d+(?:,REQ-\d+)*)\]"
+    pattern = r"\[(REQ-\d+(?:,\s*REQ-\d+)*)\]"
     
-    for test in data.get("tests", []):
-        title = test.get("title", "")
-        status = test.get("status", "")
+    for spec in iter_spec_results(path):
+        title = spec["title"]
+        status = spec["status"]
         
-        # 요구사항 ID 추출
-        match = re.search(pattern, title)
+        # 요구사항 ID 추출 (spec 제목 우선, 없으면 가장 가까운 describe 블록 제목)
+        match = None
+        for candidate in reversed(spec["titles"]):
+            match = re.search(pattern, candidate)
+            if match:
+                break
         if match:
-            req_ids = match.group(1).split(",")
-            test_name = title.replace(match.group(0), "").strip()
+            req_ids = [req_id.strip() for req_id in match.group(1).split(",")]
+            test_name = title.replace(match.group(0), "").strip() or title
             
             for req_id in req_ids:
                 if req_id not in e2e_results:
                     e2e_results[req_id] = {"tests": [], "status": "NotRun"}
                 
                 e2e_results[req_id]["tests"].append(test_name)
+                e2e_results[req_id].setdefault("results", {})[test_name] = {
+                    "outcome": status,
+                    "retries": spec["retries"],
+                }
                 
                 # 상태 업데이트
                 if status == "passed":
@@ -162,7 +332,10 @@ def merge_test_results(requirements, pytest_results, e2e_results):
     # pytest 결과 병합
     for req_id, result in pytest_results.items():
         if req_id in requirements:
-            requirements[req_id]["tests"].extend(result.get("tests", []))
+            details = result.get("results", {})
+            requirements[req_id]["tests"].extend(
+                format_pytest_test(test, details.get(test)) for test in result.get("tests", [])
+            )
             
             if result.get("status") == "Passed":
                 requirements[req_id]["test_results"].append(PASS_EMOJI)
@@ -194,6 +367,18 @@ def merge_test_results(requirements, pytest_results, e2e_results):
     
     return requirements
 
+def record_history(requirements, pytest_results, e2e_results):
+    """
+    실행 결과를 SQLite 이력(scripts/temp/trace_history.sqlite)에 기록
+    """
+    statuses = {req_id: trace_report.requirement_status(req["test_results"]) for req_id, req in requirements.items()}
+    conn = trace_history.connect()
+    try:
+        run_id = trace_history.record_run(conn, statuses, pytest_results, e2e_results)
+    finally:
+        conn.close()
+    print(f"요구사항 결과 이력 기록: 실행 #{run_id} ({trace_history.HISTORY_DB})")
+
 def generate_traceability_matrix(requirements):
     """
     요구사항 및 테스트 결과를 기반으로 추적 매트릭스 생성
@@ -204,157 +389,229 @@ def generate_traceability_matrix(requirements):
     Returns:
         str: 마크다운 형식의 추적 매트릭스
     """
-    today = datetime.now().strftime("%Y-%m-%d")
-    
-    # 매트릭스 헤더
-    matrix = [
-        "# LunitCare QA 요구사항 추적 매트릭스",
-        "",
-        "본 문서는 요구사항과 테스트 케이스 간의 추적성을 보여주는 매트릭스입니다.",
-        "(이 파일은 `generate_trace_report.py` 스크립트에 의해 자동으로 갱신됩니다)",
-        "",
-        f"*마지막 업데이트: {today}*",
-        "",
-        "## 추적 매트릭스",
-        "",
-        "| 요구사항 ID | 설명 | 테스트 케이스 | 결과 | 비고 |",
-        "|-------------|------|--------------|------|------|"
-    ]
-    
-    # 요구사항 목록
-    for req_id, req in sorted(requirements.items()):
-        # 테스트 케이스 목록
-        tests = "<br>".join(req["tests"]) if req["tests"] else "없음"
-        
-        # 테스트 결과
-        results = "<br>".join(req["test_results"])
-        
-        # 비고
-        notes = ""
-        if FAIL_EMOJI in req["test_results"]:
-            notes = "개선 필요"
-        elif PARTIAL_EMOJI in req["test_results"]:
-            notes = "일부 테스트 실패"
-        elif SKIP_EMOJI in req["test_results"]:
-            notes = "테스트 구현 필요"
-        
-        # 행 추가
-        matrix.append(f"| {req_id} | {req['description']} | {tests} | {results} | {notes} |")
-    
-    # 통계 정보 추가
-    total_reqs = len(requirements)
-    tested_reqs = sum(1 for req in requirements.values() if req["tests"])
-    passed_reqs = sum(1 for req in requirements.values() if PASS_EMOJI in req["test_results"] and FAIL_EMOJI not in req["test_results"])
-    failed_reqs = sum(1 for req in requirements.values() if FAIL_EMOJI in req["test_results"])
-    partial_reqs = sum(1 for req in requirements.values() if PARTIAL_EMOJI in req["test_results"])
-    untested_reqs = sum(1 for req in requirements.values() if not req["tests"])
-    
-    matrix.extend([
-        "",
-        "## 테스트 커버리지 요약",
-        "",
-        f"- **총 요구사항 수**: {total_reqs}",
-        f"- **테스트 케이스로 커버된 요구사항**: {tested_reqs} ({tested_reqs/total_reqs:.1%})",
-        f"- **테스트 통과 요구사항**: {passed_reqs} ({passed_reqs/total_reqs:.1%})",
-        f"- **테스트 실패 요구사항**: {failed_reqs} ({failed_reqs/total_reqs:.1%})",
-        f"- **부분 통과 요구사항**: {partial_reqs} ({partial_reqs/total_reqs:.1%})",
-        f"- **미테스트 요구사항**: {untested_reqs} ({untested_reqs/total_reqs:.1%})",
-        "",
-        "## 개선 필요 항목",
-        ""
-    ])
-    
-    # 개선 필요 항목 목록
-    improvement_needed = []
-    
-    for req_id, req in sorted(requirements.items()):
-        if FAIL_EMOJI in req["test_results"]:
-            improvement_needed.append(f"1. **{req_id}** ({req['description']}) - 테스트 실패")
-        elif PARTIAL_EMOJI in req["test_results"]:
-            improvement_needed.append(f"1. **{req_id}** ({req['description']}) - 일부 테스트 실패")
-        elif SKIP_EMOJI in req["test_results"] and not req["tests"]:
-            improvement_needed.append(f"1. **{req_id}** ({req['description']}) - 테스트 구현 필요")
-    
-    if improvement_needed:
-        matrix.extend(improvement_needed)
-    else:
-        matrix.append("모든 요구사항이 테스트를 통과했습니다.")
-    
-    return "\n".join(matrix)
-
-def run_e2e_tests():
-    """
-    E2E 테스트 실행 및 결과 저장
-    """
-    print("E2E 테스트 실행 중...")
-    
-    # 결과 디렉토리 생성
-    TEMP_DIR.mkdir(exist_ok=True, parents=True)
+    buffer = io.StringIO()
+    trace_report.render(requirements, [trace_report.MarkdownWriter(buffer)])
+    return buffer.getvalue()
+
+def report_path(fmt):
+    """출력 형식별 리포트 파일 경로"""
+    return TRACEABILITY_MATRIX_FILE.with_suffix(f".{fmt}")
+
+def same_matrix(path, other_path):
+    """두 추적 매트릭스 파일이 생성 날짜 줄을 제외하고 같은지 줄 단위로 비교"""
+    with open(path, "r", encoding="utf-8") as a, open(other_path, "r", encoding="utf-8") as b:
+        lines_a = (line for line in a if not line.startswith(UPDATE_DATE_PREFIX))
+        lines_b = (line for line in b if not line.startswith(UPDATE_DATE_PREFIX))
+        return all(x == y for x, y in zip_longest(lines_a, lines_b))
+
+def write_reports(requirements, formats):
+    """
+    요구사항을 한 번 순회하며 요청한 모든 형식의 리포트를 임시 파일에 기록한 뒤 교체
     
-    # E2E 테스트 실행 (결과를 JSON으로 저장)
+    추적 매트릭스(md)는 날짜를 제외한 내용이 기존 파일과 같으면 교체하지 않으며,
+    교체할 때는 기존 파일을 .md.bak 으로 백업합니다.
+    """
+    outputs = {fmt: report_path(fmt) for fmt in formats}
+    tmp_paths = {fmt: path.with_name(f".{path.name}.tmp") for fmt, path in outputs.items()}
+    files = {fmt: open(tmp_paths[fmt], "w", encoding="utf-8", newline="") for fmt in formats}
     try:
-        e2e_cmd = ["npx", "playwright", "test", "--reporter=json", f"--output={E2E_RESULTS_FILE}"]
-        subprocess.run(e2e_cmd, cwd=PROJECT_ROOT / "e2e_tests", check=False)
-        print(f"E2E 테스트 결과 저장됨: {E2E_RESULTS_FILE}")
-    except Exception as e:
-        print(f"E2E 테스트 실행 중 오류 발생: {e}")
+        trace_report.render(requirements, [trace_report.WRITERS[fmt](files[fmt]) for fmt in formats])
+    except BaseException:
+        for f in files.values():
+            f.close()
+        for tmp_path in tmp_paths.values():
+            os.remove(tmp_path)
+        raise
+    for f in files.values():
+        f.close()
+    
+    for fmt, path in outputs.items():
+        if fmt == "md" and path.exists():
+            # 날짜를 제외한 내용이 같으면 파일을 다시 쓰지 않음
+            if same_matrix(path, tmp_paths[fmt]):
+                os.remove(tmp_paths[fmt])
+                print(f"추적 매트릭스 내용 변경 없음: {path}")
+                continue
+            # 파일 백업
+            backup_file = path.with_suffix(".md.bak")
+            shutil.copy2(path, backup_file)
+            print(f"기존 파일 백업: {backup_file}")
+        os.replace(tmp_paths[fmt], path)
+        print(f"추적 매트릭스 생성 완료: {path}")
 
-def run_pytest_tests():
+def e2e_suite(timeout):
     """
-    pytest 테스트 실행
+    E2E 테스트 스위트 정의 (JSON 리포터 결과는 PLAYWRIGHT_JSON_OUTPUT_NAME 파일로 저장)
     """
-    print("pytest 테스트 실행 중...")
-    
-    # 결과 디렉토리 생성
-    TEMP_DIR.mkdir(exist_ok=True, parents=True)
+    env = dict(os.environ, PLAYWRIGHT_JSON_OUTPUT_NAME=str(E2E_RESULTS_FILE))
+    return {
+        "name": "e2e",
+        "cmd": ["npx", "playwright", "test", "--reporter=json"],
+        "cwd": PROJECT_ROOT / "e2e_tests",
+        "env": env,
+        "timeout": timeout,
+    }
+
+def pytest_suite(timeout):
+    """
+    pytest 테스트 스위트 정의 (conftest.py의 플러그인이 결과를 자동으로 저장)
+    """
+    return {
+        "name": "pytest",
+        "cmd": [sys.executable, "-m", "pytest", "api_tests"],
+        "cwd": PROJECT_ROOT,
+        "env": None,
+        "timeout": timeout,
+    }
+
+def _stop_process(process):
+    """프로세스와 그 자식 프로세스(npx -> node 등)를 함께 종료"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+def _run_suite(suite, output_lock):
+    """
+    스위트 하나를 실행하며 출력 각 줄에 [이름] 접두사를 붙여 전달
     
-    # pytest 실행 (conftest.py의 플러그인이 결과를 자동으로 저장)
+    Returns:
+        dict: {"name", "returncode", "wall_s", "timed_out"}
+    """
+    name = suite["name"]
+    started = time.perf_counter()
     try:
-        pytest_cmd = ["pytest", "api_tests"]
-        subprocess.run(pytest_cmd, cwd=PROJECT_ROOT, check=False)
-        print("pytest 테스트 실행 완료")
-    except Exception as e:
-        print(f"pytest 테스트 실행 중 오류 발생: {e}")
+        process = subprocess.Popen(
+            suite["cmd"],
+            cwd=suite["cwd"],
+            env=suite["env"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=os.name == "posix",
+        )
+    except OSError as e:
+        with output_lock:
+            print(f"[{name}] 실행 중 오류 발생: {e}", flush=True)
+        return {"name": name, "returncode": None, "wall_s": 0.0, "timed_out": False}
+    
+    # 출력이 멈춘 상태에서도 제한 시간이 지나면 종료되도록 타이머로 강제 종료
+    timed_out = threading.Event()
+    
+    def on_timeout():
+        timed_out.set()
+        _stop_process(process)
+    
+    timer = threading.Timer(suite["timeout"], on_timeout)
+    timer.daemon = True
+    timer.start()
+    try:
+        for raw in process.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            with output_lock:
+                print(f"[{name}] {line}", flush=True)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+    
+    wall_s = time.perf_counter() - started
+    return {"name": name, "returncode": returncode, "wall_s": wall_s, "timed_out": timed_out.is_set()}
+
+def run_test_suites(suites):
+    """
+    테스트 스위트를 동시에 실행하고 모두 끝날 때까지 대기
+    
+    전체 소요 시간은 가장 느린 스위트의 시간과 같습니다.
+    
+    Returns:
+        list: 스위트별 결과 (_run_suite 반환값)
+    """
+    TEMP_DIR.mkdir(exist_ok=True, parents=True)
+    output_lock = threading.Lock()
+    started = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=len(suites)) as executor:
+        futures = [executor.submit(_run_suite, suite, output_lock) for suite in suites]
+        results = [future.result() for future in futures]
+    
+    print(f"테스트 실행 완료 ({time.perf_counter() - started:.1f}초)")
+    for suite, result in zip(suites, results):
+        if result["timed_out"]:
+            status = f"시간 초과 ({suite['timeout']:g}초)"
+        elif result["returncode"] is None:
+            status = "실행 실패"
+        else:
+            status = f"종료 코드 {result['returncode']}"
+        print(f"  {result['name']:<8} {result['wall_s']:>8.1f}초  {status}")
+    return results
 
-def main():
+def main(argv=None):
     """
     메인 함수 - 테스트 실행 및 추적 매트릭스 생성
     """
+    parser = argparse.ArgumentParser(description="ISO 13485 요구사항 추적 매트릭스 생성")
+    parser.add_argument("--run-tests", action="store_true", help="pytest 및 E2E 테스트를 실행한 뒤 생성")
+    parser.add_argument("--force", action="store_true", help="입력 지문 캐시를 무시하고 다시 생성")
+    parser.add_argument("--pytest-results", action="append", metavar="PATH",
+                        help="pytest 결과 파일/디렉토리/glob (샤드별로 여러 번 지정 가능, 기본: scripts/temp/req_test_results.json)")
+    parser.add_argument("--e2e-results", action="append", metavar="PATH",
+                        help="Playwright JSON 결과 파일/디렉토리/glob (여러 번 지정 가능, 기본: scripts/temp/e2e_results.json)")
+    parser.add_argument("--format", action="append", choices=REPORT_FORMATS, dest="formats",
+                        help="추가 출력 형식 (여러 번 지정 가능, 추적 매트릭스 md 는 항상 생성)")
+    parser.add_argument("--no-history", action="store_true", help="SQLite 결과 이력에 기록하지 않음")
+    parser.add_argument("--pytest-timeout", type=float, default=SUITE_TIMEOUT_S, help="pytest 스위트 제한 시간(초)")
+    parser.add_argument("--e2e-timeout", type=float, default=SUITE_TIMEOUT_S, help="E2E 스위트 제한 시간(초)")
+    args = parser.parse_args(argv)
+    formats = ["md"] + [fmt for fmt in dict.fromkeys(args.formats or []) if fmt != "md"]
+
     # 디렉토리 생성
     TEMP_DIR.mkdir(exist_ok=True, parents=True)
     
-    # 명령줄 인수 처리
-    run_tests = "--run-tests" in sys.argv
-    
-    if run_tests:
-        # 테스트 실행
-        run_pytest_tests()
-        run_e2e_tests()
+    if args.run_tests:
+        # pytest 와 E2E 테스트를 동시에 실행
+        run_test_suites([pytest_suite(args.pytest_timeout), e2e_suite(args.e2e_timeout)])
+    
+    # 입력이 이전 실행과 같고 매트릭스 파일도 그대로면 생략
+    cache = {} if args.force else load_cache()
+    script_dir = Path(__file__).parent
+    pytest_files = resolve_result_files(args.pytest_results, PYTEST_RESULTS_FILE)
+    e2e_files = resolve_result_files(args.e2e_results, E2E_RESULTS_FILE)
+    digest = inputs_digest([REQUIREMENTS_FILE, *pytest_files, *e2e_files,
+                            Path(__file__), script_dir / "playwright_stream.py", script_dir / "trace_history.py",
+                            script_dir / "trace_report.py"])
+    report_digests = cache.get("report_digests", {})
+    if cache.get("inputs_digest") == digest and all(
+        fmt in report_digests and report_digests[fmt] == file_digest(report_path(fmt)) for fmt in formats
+    ):
+        print(f"입력 변경 없음 - 추적 매트릭스 유지: {TRACEABILITY_MATRIX_FILE}")
+        return
     
     # 요구사항 파싱
-    requirements = parse_requirements()
+    requirements = parse_requirements_cached(cache)
     
-    # 테스트 결과 파싱
-    pytest_results = parse_pytest_results()
-    e2e_results = parse_e2e_results()
+    # 테스트 결과 파싱 (여러 샤드 결과는 하나로 병합)
+    pytest_results = merge_shard_results(parse_pytest_results(path) for path in pytest_files)
+    e2e_results = merge_shard_results(parse_e2e_results(path) for path in e2e_files)
     
     # 결과 병합
     merged_requirements = merge_test_results(requirements, pytest_results, e2e_results)
     
-    # 추적 매트릭스 생성
-    matrix = generate_traceability_matrix(merged_requirements)
-    
-    # 파일 백업
-    if TRACEABILITY_MATRIX_FILE.exists():
-        backup_file = TRACEABILITY_MATRIX_FILE.with_suffix(".md.bak")
-        shutil.copy2(TRACEABILITY_MATRIX_FILE, backup_file)
-        print(f"기존 파일 백업: {backup_file}")
+    # 실행 이력 기록 (테스트 결과가 있을 때만)
+    if not args.no_history and (pytest_results or e2e_results):
+        record_history(merged_requirements, pytest_results, e2e_results)
     
-    # 결과 저장
-    with open(TRACEABILITY_MATRIX_FILE, "w", encoding="utf-8") as f:
-        f.write(matrix)
+    # 추적 매트릭스 및 추가 형식 리포트 생성
+    write_reports(merged_requirements, formats)
     
-    print(f"추적 매트릭스 생성 완료: {TRACEABILITY_MATRIX_FILE}")
+    cache["inputs_digest"] = digest
+    cache["report_digests"] = {fmt: file_digest(report_path(fmt)) for fmt in formats}
+    save_cache(cache)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+LunitCare QA - Playwright JSON 리포트 스트리밍 파서
+
+Playwright JSON 리포트는 suites > (suites ...) > specs > tests > results 로 중첩되며, 첨부 파일
+(스크린샷/트레이스)과 stdout 이 포함되면 수백 MB 에 이를 수 있습니다. 이 모듈은 리포트 전체를
+메모리에 올리지 않고 청크 단위로 읽으면서 필요한 값(제목, 상태)만 만들고, 나머지 값(첨부 파일,
+로그, 설정 등)은 내용을 만들지 않고 건너뜁니다. 메모리 사용량은 리포트 크기와 무관하게
+청크 크기와 중첩 깊이에 비례합니다.
+
+재시도(retries)가 있는 테스트는 마지막 시도 결과(또는 Playwright 가 계산한 테스트 상태:
+expected/unexpected/flaky/skipped)를 최종 상태로 사용합니다. 이전의 평면 형식
+({"tests": [{"title", "status"}]})도 지원합니다.
+
+사용법:
+$ python scripts/playwright_stream.py e2e_tests/results.json
+"""
+
+import re
+import sys
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\r\n"
+# 문자열 내부에서 의미 있는 문자 (닫는 따옴표, 이스케이프)
+_STRING_SPECIAL = re.compile(r'["\\]')
+# 값 건너뛰기 시 의미 있는 문자 (문자열 시작, 중첩 시작/끝)
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_LITERAL_END = re.compile(r'[,}\]\s]')
+_SURROGATE = re.compile("[\ud800-\udfff]")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Playwright 테스트 상태 -> 최종 상태
+_TEST_STATUS = {"expected": "passed", "flaky": "passed", "unexpected": "failed", "skipped": "skipped"}
+# 개별 시도(result) 상태 -> 최종 상태 (passed/skipped 외에는 실패)
+_RESULT_STATUS = {"passed": "passed", "skipped": "skipped"}
+
+
+class JsonStreamReader:
+    """
+    청크 단위로 읽는 pull 방식 JSON 리더
+
+    iter_object()/iter_array() 로 구조를 따라 내려가며, 각 위치에서 read_value() 로 값을 만들거나
+    skip_value() 로 값을 만들지 않고 건너뜁니다.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self):
+        """버퍼를 모두 소비했으면 다음 청크를 읽음 (EOF 면 False)"""
+        if self.pos < len(self.buffer):
+            return True
+        self.buffer = self.fp.read(self.chunk_size)
+        self.pos = 0
+        return bool(self.buffer)
+
+    def _peek(self):
+        """공백을 건너뛴 다음 문자 (소비하지 않음)"""
+        while True:
+            if not self._fill():
+                raise ValueError("JSON 이 예상보다 일찍 끝났습니다")
+            char = self.buffer[self.pos]
+            if char not in _WHITESPACE:
+                return char
+            self.pos += 1
+
+    def _expect(self, expected):
+        char = self._peek()
+        if char != expected:
+            raise ValueError(f"JSON 구문 오류: '{expected}' 가 필요하지만 '{char}' 발견")
+        self.pos += 1
+
+    def _read_string(self, keep=True):
+        """여는 따옴표 다음부터 닫는 따옴표까지 읽기 (keep=False 면 내용을 만들지 않음)"""
+        parts = [] if keep else None
+        while True:
+            if not self._fill():
+                raise ValueError("문자열이 닫히지 않았습니다")
+            match = _STRING_SPECIAL.search(self.buffer, self.pos)
+            end = match.start() if match else len(self.buffer)
+            if keep:
+                parts.append(self.buffer[self.pos:end])
+            self.pos = end
+            if not match:
+                continue
+            self.pos += 1
+            if match.group() == '"':
+                if not keep:
+                    return None
+                text = "".join(parts)
+                if _SURROGATE.search(text):
+                    # \ud83d\ude00 처럼 서로게이트 쌍으로 이스케이프된 문자 결합
+                    text = text.encode("utf-16", "surrogatepass").decode("utf-16")
+                return text
+            # 이스케이프 시퀀스
+            if not self._fill():
+                raise ValueError("문자열이 닫히지 않았습니다")
+            escape = self.buffer[self.pos]
+            self.pos += 1
+            if escape == "u":
+                digits = ""
+                while len(digits) < 4:
+                    if not self._fill():
+                        raise ValueError("잘못된 유니코드 이스케이프")
+                    chunk = self.buffer[self.pos:self.pos + 4 - len(digits)]
+                    digits += chunk
+                    self.pos += len(chunk)
+                if keep:
+                    parts.append(chr(int(digits, 16)))
+            elif keep:
+                parts.append(_ESCAPES.get(escape, escape))
+
+    def _read_literal(self):
+        """숫자/true/false/null"""
+        parts = []
+        while self._fill():
+            match = _LITERAL_END.search(self.buffer, self.pos)
+            end = match.start() if match else len(self.buffer)
+            parts.append(self.buffer[self.pos:end])
+            self.pos = end
+            if match:
+                break
+        text = "".join(parts)
+        if text == "true":
+            return True
+        if text == "false":
+            return False
+        if text == "null":
+            return None
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+
+    def iter_object(self):
+        """객체의 키를 순서대로 반환 (호출자는 각 키마다 값을 읽거나 건너뛰어야 함)"""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            self._expect('"')
+            key = self._read_string()
+            self._expect(":")
+            yield key
+            char = self._peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"JSON 구문 오류: 객체에 예상치 못한 '{char}'")
+
+    def iter_array(self):
+        """배열의 각 원소 위치에서 멈춤 (호출자는 원소를 읽거나 건너뛰어야 함)"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self._peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"JSON 구문 오류: 배열에 예상치 못한 '{char}'")
+
+    def read_value(self):
+        """현재 위치의 값을 Python 객체로 생성"""
+        char = self._peek()
+        if char == "{":
+            return {key: self.read_value() for key in self.iter_object()}
+        if char == "[":
+            return [self.read_value() for _ in self.iter_array()]
+        if char == '"':
+            self.pos += 1
+            return self._read_string()
+        return self._read_literal()
+
+    def skip_value(self):
+        """현재 위치의 값을 객체로 만들지 않고 건너뜀"""
+        char = self._peek()
+        if char == '"':
+            self.pos += 1
+            self._read_string(keep=False)
+            return
+        if char not in "{[":
+            self._read_literal()
+            return
+        depth = 0
+        while True:
+            if not self._fill():
+                raise ValueError("JSON 이 예상보다 일찍 끝났습니다")
+            match = _STRUCTURAL.search(self.buffer, self.pos)
+            if not match:
+                self.pos = len(self.buffer)
+                continue
+            self.pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._read_string(keep=False)
+            elif token in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def _final_status(test):
+    """Playwright 테스트(프로젝트별 실행)의 최종 상태"""
+    if test.get("status") in _TEST_STATUS:
+        return _TEST_STATUS[test["status"]]
+    results = test.get("results") or []
+    if not results:
+        return "skipped"
+    last = max(results, key=lambda result: result.get("retry", 0))
+    return _RESULT_STATUS.get(last.get("status"), "failed")
+
+
+def _read_result(reader):
+    """시도(result) 하나에서 상태/재시도 번호만 읽음 (첨부 파일, 로그, 오류 본문은 건너뜀)"""
+    result = {}
+    for key in reader.iter_object():
+        if key in ("status", "retry"):
+            result[key] = reader.read_value()
+        else:
+            reader.skip_value()
+    return result
+
+
+def _read_test(reader):
+    test = {}
+    for key in reader.iter_object():
+        if key in ("status", "projectName"):
+            test[key] = reader.read_value()
+        elif key == "results":
+            test["results"] = [_read_result(reader) for _ in reader.iter_array()]
+        else:
+            reader.skip_value()
+    return test
+
+
+def _read_spec(reader, titles):
+    """spec 하나를 읽어 (제목 경로, 최종 상태, 재시도 횟수) 반환"""
+    title = ""
+    tests = []
+    for key in reader.iter_object():
+        if key == "title":
+            title = reader.read_value()
+        elif key == "tests":
+            tests = [_read_test(reader) for _ in reader.iter_array()]
+        else:
+            reader.skip_value()
+
+    statuses = [_final_status(test) for test in tests]
+    if "failed" in statuses:
+        status = "failed"
+    elif "passed" in statuses:
+        status = "passed"
+    else:
+        status = "skipped"
+    retries = sum(max(len(test.get("results") or []) - 1, 0) for test in tests)
+    return {"titles": titles + [title], "title": title, "status": status, "retries": retries}
+
+
+def _walk_suite(reader, titles):
+    """suite 를 따라 내려가며 spec 결과 반환 (중첩 suite 는 describe 블록)"""
+    suite_titles = list(titles)
+    for key in reader.iter_object():
+        if key == "title":
+            suite_titles = titles + [reader.read_value()]
+        elif key == "specs":
+            for _ in reader.iter_array():
+                yield _read_spec(reader, suite_titles)
+        elif key == "suites":
+            for _ in reader.iter_array():
+                yield from _walk_suite(reader, suite_titles)
+        else:
+            reader.skip_value()
+
+
+def iter_spec_results(path, chunk_size=CHUNK_SIZE):
+    """
+    Playwright JSON 리포트의 spec 별 최종 결과를 순서대로 반환
+
+    Yields:
+        dict: {"titles": [suite 제목..., spec 제목], "title", "status": passed|failed|skipped, "retries"}
+    """
+    with open(path, "r", encoding="utf-8") as fp:
+        reader = JsonStreamReader(fp, chunk_size)
+        for key in reader.iter_object():
+            if key == "suites":
+                for _ in reader.iter_array():
+                    yield from _walk_suite(reader, [])
+            elif key == "tests":
+                # 이전 평면 형식: {"tests": [{"title", "status"}]}
+                for _ in reader.iter_array():
+                    test = reader.read_value()
+                    title = test.get("title", "")
+                    yield {"titles": [title], "title": title, "status": test.get("status", ""), "retries": 0}
+            else:
+                reader.skip_value()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("사용법: python scripts/playwright_stream.py <playwright-report.json>")
+        return 2
+    for spec in iter_spec_results(argv[0]):
+        retries = f" (재시도 {spec['retries']}회)" if spec["retries"] else ""
+        print(f"{spec['status']:<8} {' > '.join(t for t in spec['titles'] if t)}{retries}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
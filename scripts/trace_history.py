@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+LunitCare QA - 요구사항 추적 결과 이력 (SQLite)
+
+generate_trace_report.py 가 실행될 때마다 요구사항별 결과(상태, 테스트 목록, 소요 시간)를 커밋/시각과
+함께 로컬 SQLite 데이터베이스에 누적합니다. 추적 매트릭스는 마지막 실행 결과만 보여주므로,
+"REQ-005 는 언제부터 실패했는가" 같은 질문은 이 이력으로 답합니다.
+
+요구사항 결과는 (requirement_id, run_id) 인덱스로, 실행별 결과는 (run_id, requirement_id) 기본 키로
+조회하므로 수천 회의 실행이 쌓여도 조회 시간은 조회 대상 행 수에만 비례합니다.
+
+사용법:
+$ python scripts/trace_history.py trend REQ-005 --limit 20   # 요구사항 상태 추이
+$ python scripts/trace_history.py trend                      # 실행별 통과율 추이
+$ python scripts/trace_history.py flaky --window 30          # 최근 실행에서 결과가 뒤바뀐 요구사항
+$ python scripts/trace_history.py first-failure [REQ-005]    # 현재 실패 중인 요구사항의 최초 실패 실행
+"""
+
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+HISTORY_DB = PROJECT_ROOT / "scripts" / "temp" / "trace_history.sqlite"
+
+# 요구사항 상태
+STATUS_PASSED = "passed"
+STATUS_FAILED = "failed"
+STATUS_PARTIAL = "partial"
+STATUS_UNTESTED = "untested"
+FAILING_STATUSES = (STATUS_FAILED, STATUS_PARTIAL)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    commit_sha TEXT,
+    branch TEXT
+);
+
+CREATE TABLE IF NOT EXISTS requirement_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    requirement_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    test_count INTEGER NOT NULL,
+    duration_s REAL,
+    PRIMARY KEY (run_id, requirement_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_requirement_results_requirement
+    ON requirement_results (requirement_id, run_id);
+
+CREATE TABLE IF NOT EXISTS test_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    requirement_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    outcome TEXT,
+    duration_s REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_test_results_run
+    ON test_results (run_id, requirement_id);
+"""
+
+
+def connect(db_path=HISTORY_DB):
+    """이력 데이터베이스 연결 (없으면 스키마 생성)"""
+    Path(db_path).parent.mkdir(exist_ok=True, parents=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _git(*args):
+    try:
+        completed = subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def current_commit():
+    """(커밋 SHA, 브랜치) - CI 에서는 GITHUB_SHA/GITHUB_REF_NAME 우선"""
+    commit = os.environ.get("GITHUB_SHA") or _git("rev-parse", "HEAD")
+    branch = os.environ.get("GITHUB_REF_NAME") or _git("rev-parse", "--abbrev-ref", "HEAD")
+    return commit, branch
+
+
+def _test_rows(requirement_id, source, result):
+    """pytest/E2E 결과 하나에서 테스트별 행 생성"""
+    details = result.get("results", {})
+    for test_id in result.get("tests", []):
+        detail = details.get(test_id, {})
+        yield (requirement_id, source, test_id, detail.get("outcome", result.get("status")), detail.get("duration"))
+
+
+def record_run(conn, statuses, pytest_results, e2e_results, commit=None, branch=None, run_at=None):
+    """
+    실행 한 번의 결과를 기록
+
+    Args:
+        conn: connect() 로 연 연결
+        statuses (dict): {요구사항 ID: 상태 (passed/failed/partial/untested)}
+        pytest_results (dict): parse_pytest_results() 결과
+        e2e_results (dict): parse_e2e_results() 결과
+
+    Returns:
+        int: 실행(run) ID
+    """
+    if commit is None and branch is None:
+        commit, branch = current_commit()
+    run_at = run_at or datetime.now().isoformat(timespec="seconds")
+
+    tests = []
+    for source, results in (("pytest", pytest_results), ("e2e", e2e_results)):
+        for requirement_id, result in results.items():
+            if requirement_id in statuses:
+                tests.extend(_test_rows(requirement_id, source, result))
+
+    test_counts = {}
+    durations = {}
+    for requirement_id, _, _, _, duration in tests:
+        test_counts[requirement_id] = test_counts.get(requirement_id, 0) + 1
+        if duration is not None:
+            durations[requirement_id] = durations.get(requirement_id, 0.0) + duration
+
+    with conn:
+        run_id = conn.execute(
+            "INSERT INTO runs (run_at, commit_sha, branch) VALUES (?, ?, ?)", (run_at, commit, branch)
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO requirement_results (run_id, requirement_id, status, test_count, duration_s) VALUES (?, ?, ?, ?, ?)",
+            ((run_id, requirement_id, status, test_counts.get(requirement_id, 0), durations.get(requirement_id))
+             for requirement_id, status in statuses.items()),
+        )
+        conn.executemany(
+            "INSERT INTO test_results (run_id, requirement_id, source, test_id, outcome, duration_s) VALUES (?, ?, ?, ?, ?, ?)",
+            ((run_id, *row) for row in tests),
+        )
+    return run_id
+
+
+def requirement_trend(conn, requirement_id, limit=20):
+    """요구사항의 최근 실행별 상태 (최신순)"""
+    return conn.execute(
+        """
+        SELECT r.id AS run_id, r.run_at, r.commit_sha, x.status, x.test_count, x.duration_s
+        FROM requirement_results x JOIN runs r ON r.id = x.run_id
+        WHERE x.requirement_id = ?
+        ORDER BY x.run_id DESC
+        LIMIT ?
+        """,
+        (requirement_id, limit),
+    ).fetchall()
+
+
+def run_trend(conn, limit=20):
+    """최근 실행별 요구사항 상태 집계 (최신순)"""
+    return conn.execute(
+        """
+        SELECT r.id AS run_id, r.run_at, r.commit_sha,
+               SUM(x.status = 'passed') AS passed,
+               SUM(x.status IN ('failed', 'partial')) AS failing,
+               SUM(x.status = 'untested') AS untested,
+               COUNT(*) AS total
+        FROM (SELECT * FROM runs ORDER BY id DESC LIMIT ?) r
+        JOIN requirement_results x ON x.run_id = r.id
+        GROUP BY r.id
+        ORDER BY r.id DESC
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def flaky_requirements(conn, window=30, min_flips=2):
+    """
+    최근 window 회 실행에서 통과/실패가 min_flips 회 이상 뒤바뀐 요구사항 (뒤바뀐 횟수 많은 순)
+
+    미테스트 상태는 전환으로 세지 않습니다.
+    """
+    # 시작 실행 ID 를 먼저 구하고 PARTITION BY 에 +requirement_id 를 써서 요구사항 인덱스 전체 검색 대신
+    # 기본 키 범위 검색(최근 실행의 행만)을 사용하도록 함
+    start_run = conn.execute(
+        "SELECT MIN(id) FROM (SELECT id FROM runs ORDER BY id DESC LIMIT ?)", (window,)
+    ).fetchone()[0]
+    if start_run is None:
+        return []
+    return conn.execute(
+        """
+        WITH recent AS (
+            SELECT requirement_id, run_id, status IN ('failed', 'partial') AS failing
+            FROM requirement_results
+            WHERE run_id >= ? AND status != 'untested'
+        ),
+        transitions AS (
+            SELECT requirement_id, failing,
+                   failing != LAG(failing) OVER (PARTITION BY +requirement_id ORDER BY run_id) AS flipped
+            FROM recent
+        )
+        SELECT requirement_id,
+               SUM(COALESCE(flipped, 0)) AS flips,
+               SUM(failing = 0) AS passed,
+               SUM(failing = 1) AS failing,
+               COUNT(*) AS runs
+        FROM transitions
+        GROUP BY requirement_id
+        HAVING flips >= ?
+        ORDER BY flips DESC, requirement_id
+        """,
+        (start_run, min_flips),
+    ).fetchall()
+
+
+def first_failures(conn, requirement_id=None):
+    """
+    마지막 실행에서 실패(또는 부분통과) 중인 요구사항별로 현재 연속 실패가 시작된 실행
+
+    마지막 통과 이후 처음 실패한 실행을 반환하며, 통과한 적이 없으면 첫 실패 실행을 반환합니다.
+    """
+    return conn.execute(
+        """
+        WITH failing AS (
+            SELECT requirement_id FROM requirement_results
+            WHERE run_id = (SELECT MAX(id) FROM runs)
+              AND status IN ('failed', 'partial')
+              AND (? IS NULL OR requirement_id = ?)
+        ),
+        streaks AS (
+            SELECT f.requirement_id,
+                   (SELECT MAX(run_id) FROM requirement_results x
+                    WHERE x.requirement_id = f.requirement_id AND x.status = 'passed') AS last_passed_run
+            FROM failing f
+        ),
+        first_fail AS (
+            SELECT s.requirement_id, s.last_passed_run,
+                   (SELECT MIN(run_id) FROM requirement_results x
+                    WHERE x.requirement_id = s.requirement_id
+                      AND x.run_id > COALESCE(s.last_passed_run, 0)
+                      AND x.status IN ('failed', 'partial')) AS run_id
+            FROM streaks s
+        )
+        SELECT f.requirement_id, f.run_id, r.run_at, r.commit_sha, f.last_passed_run,
+               p.commit_sha AS last_passed_commit
+        FROM first_fail f
+        JOIN runs r ON r.id = f.run_id
+        LEFT JOIN runs p ON p.id = f.last_passed_run
+        ORDER BY f.run_id, f.requirement_id
+        """,
+        (requirement_id, requirement_id),
+    ).fetchall()
+
+
+def _short(commit):
+    return (commit or "-")[:10]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="요구사항 추적 결과 이력 조회")
+    parser.add_argument("--db", default=str(HISTORY_DB), help="이력 데이터베이스 경로")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    trend = commands.add_parser("trend", help="요구사항 상태 추이 (ID 생략 시 실행별 통과율)")
+    trend.add_argument("requirement", nargs="?", help="요구사항 ID (예: REQ-005)")
+    trend.add_argument("--limit", type=int, default=20, help="최근 실행 수")
+
+    flaky = commands.add_parser("flaky", help="최근 실행에서 결과가 뒤바뀐 요구사항")
+    flaky.add_argument("--window", type=int, default=30, help="최근 실행 수")
+    flaky.add_argument("--min-flips", type=int, default=2, help="최소 통과/실패 전환 횟수")
+
+    first = commands.add_parser("first-failure", help="현재 실패 중인 요구사항의 최초 실패 실행")
+    first.add_argument("requirement", nargs="?", help="요구사항 ID (생략 시 전체)")
+
+    args = parser.parse_args(argv)
+    if not Path(args.db).exists():
+        print(f"이력 데이터베이스가 없습니다: {args.db}")
+        return 1
+    conn = connect(args.db)
+
+    if args.command == "trend" and args.requirement:
+        rows = requirement_trend(conn, args.requirement, args.limit)
+        if not rows:
+            print(f"{args.requirement} 의 기록이 없습니다.")
+        for row in rows:
+            duration = f"{row['duration_s']:.2f}s" if row["duration_s"] is not None else "-"
+            print(f"#{row['run_id']:<6} {row['run_at']}  {_short(row['commit_sha']):<10}  "
+                  f"{row['status']:<9} 테스트 {row['test_count']}개  {duration}")
+    elif args.command == "trend":
+        for row in run_trend(conn, args.limit):
+            rate = row["passed"] / row["total"] if row["total"] else 0.0
+            print(f"#{row['run_id']:<6} {row['run_at']}  {_short(row['commit_sha']):<10}  통과 {row['passed']}/{row['total']} "
+                  f"({rate:.1%})  실패 {row['failing']}  미테스트 {row['untested']}")
+    elif args.command == "flaky":
+        rows = flaky_requirements(conn, args.window, args.min_flips)
+        if not rows:
+            print(f"최근 {args.window}회 실행에서 불안정한 요구사항이 없습니다.")
+        for row in rows:
+            print(f"{row['requirement_id']:<10} 전환 {row['flips']}회  통과 {row['passed']} / 실패 {row['failing']} "
+                  f"(실행 {row['runs']}회)")
+    else:
+        rows = first_failures(conn, args.requirement)
+        if not rows:
+            print("마지막 실행에서 실패 중인 요구사항이 없습니다.")
+        for row in rows:
+            since = (f"마지막 통과 #{row['last_passed_run']} ({_short(row['last_passed_commit'])})"
+                     if row["last_passed_run"] else "통과 기록 없음")
+            print(f"{row['requirement_id']:<10} 최초 실패 #{row['run_id']} {row['run_at']} "
+                  f"({_short(row['commit_sha'])})  {since}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+LunitCare QA - 요구사항 추적 리포트 엔진
+
+병합된 요구사항(generate_trace_report.merge_test_results 결과)을 한 번만 순회하면서 행을 작성하고
+커버리지 통계/개선 필요 항목을 함께 집계합니다. 각 행은 즉시 형식별 작성기(Markdown, HTML, CSV,
+JSON)로 전달되어 파일에 바로 쓰이므로, 요구사항 수가 수천 개여도 생성 시간은 선형이고 메모리에는
+개선 필요 항목만 남습니다.
+
+Markdown 출력은 기존 추적 매트릭스(docs/traceability_matrix.md)와 바이트 단위로 동일합니다.
+
+사용법 (generate_trace_report.py 에서 호출):
+    with open(path, "w", encoding="utf-8") as f:
+        render(requirements, [MarkdownWriter(f)])
+"""
+
+import csv
+import html
+import json
+from datetime import datetime
+
+from trace_history import STATUS_FAILED, STATUS_PARTIAL, STATUS_PASSED, STATUS_UNTESTED
+
+# 결과 이모지
+PASS_EMOJI = "✅ Pass"
+FAIL_EMOJI = "❌ Fail"
+SKIP_EMOJI = "⚠️ 미테스트"
+PARTIAL_EMOJI = "⚠️ 부분통과"
+
+
+def requirement_status(test_results):
+    """결과 이모지 목록의 대표 상태 (passed/failed/partial/untested)"""
+    if FAIL_EMOJI in test_results:
+        return STATUS_FAILED
+    if PARTIAL_EMOJI in test_results:
+        return STATUS_PARTIAL
+    if PASS_EMOJI in test_results:
+        return STATUS_PASSED
+    return STATUS_UNTESTED
+
+
+def build_row(req_id, req):
+    """
+    요구사항 하나의 리포트 행
+
+    Returns:
+        dict: {"id", "description", "tests", "results", "status", "notes", "improvement"}
+            improvement 는 개선 필요 항목 사유 (없으면 None)
+    """
+    test_results = req["test_results"]
+    if FAIL_EMOJI in test_results:
+        notes, improvement = "개선 필요", "테스트 실패"
+    elif PARTIAL_EMOJI in test_results:
+        notes, improvement = "일부 테스트 실패", "일부 테스트 실패"
+    elif SKIP_EMOJI in test_results:
+        notes = "테스트 구현 필요"
+        improvement = None if req["tests"] else "테스트 구현 필요"
+    else:
+        notes, improvement = "", None
+    return {
+        "id": req_id,
+        "description": req["description"],
+        "tests": req["tests"],
+        "results": test_results,
+        "status": requirement_status(test_results),
+        "notes": notes,
+        "improvement": improvement,
+    }
+
+
+def render(requirements, writers, today=None):
+    """
+    요구사항을 한 번 순회하며 모든 작성기에 행을 전달하고 통계를 집계
+
+    Args:
+        requirements (dict): 병합된 요구사항 및 테스트 결과
+        writers (list): begin()/row()/end() 를 구현한 작성기 목록
+        today (str): 리포트 날짜 (기본: 오늘)
+
+    Returns:
+        dict: 커버리지 통계 (total, tested, passed, failed, partial, untested)
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    summary = {"total": 0, "tested": 0, "passed": 0, "failed": 0, "partial": 0, "untested": 0}
+    improvements = []
+
+    for writer in writers:
+        writer.begin(today)
+
+    for req_id, req in sorted(requirements.items()):
+        row = build_row(req_id, req)
+        test_results = row["results"]
+        summary["total"] += 1
+        if req["tests"]:
+            summary["tested"] += 1
+        else:
+            summary["untested"] += 1
+        if FAIL_EMOJI in test_results:
+            summary["failed"] += 1
+        elif PASS_EMOJI in test_results:
+            summary["passed"] += 1
+        if PARTIAL_EMOJI in test_results:
+            summary["partial"] += 1
+        if row["improvement"]:
+            improvements.append(row)
+        for writer in writers:
+            writer.row(row)
+
+    for writer in writers:
+        writer.end(summary, improvements)
+    return summary
+
+
+def _ratio(count, total):
+    return count / total if total else 0.0
+
+
+# 통계 항목 (키, 표시 이름) - Markdown/HTML 요약 순서
+SUMMARY_LABELS = (
+    ("tested", "테스트 케이스로 커버된 요구사항"),
+    ("passed", "테스트 통과 요구사항"),
+    ("failed", "테스트 실패 요구사항"),
+    ("partial", "부분 통과 요구사항"),
+    ("untested", "미테스트 요구사항"),
+)
+
+MATRIX_TITLE = "LunitCare QA 요구사항 추적 매트릭스"
+MATRIX_INTRO = "본 문서는 요구사항과 테스트 케이스 간의 추적성을 보여주는 매트릭스입니다."
+MATRIX_NOTICE = "(이 파일은 `generate_trace_report.py` 스크립트에 의해 자동으로 갱신됩니다)"
+ALL_PASSED = "모든 요구사항이 테스트를 통과했습니다."
+
+
+class MarkdownWriter:
+    """추적 매트릭스 Markdown (마지막 줄 뒤에 줄바꿈 없음)"""
+
+    extension = "md"
+
+    def __init__(self, fp):
+        self.fp = fp
+        self._started = False
+
+    def _line(self, text):
+        if self._started:
+            self.fp.write("\n")
+        self._started = True
+        self.fp.write(text)
+
+    def begin(self, today):
+        for line in (
+            f"# {MATRIX_TITLE}",
+            "",
+            MATRIX_INTRO,
+            MATRIX_NOTICE,
+            "",
+            f"*마지막 업데이트: {today}*",
+            "",
+            "## 추적 매트릭스",
+            "",
+            "| 요구사항 ID | 설명 | 테스트 케이스 | 결과 | 비고 |",
+            "|-------------|------|--------------|------|------|",
+        ):
+            self._line(line)
+
+    def row(self, row):
+        tests = "<br>".join(row["tests"]) if row["tests"] else "없음"
+        results = "<br>".join(row["results"])
+        self._line(f"| {row['id']} | {row['description']} | {tests} | {results} | {row['notes']} |")
+
+    def end(self, summary, improvements):
+        total = summary["total"]
+        self._line("")
+        self._line("## 테스트 커버리지 요약")
+        self._line("")
+        self._line(f"- **총 요구사항 수**: {total}")
+        for key, label in SUMMARY_LABELS:
+            self._line(f"- **{label}**: {summary[key]} ({_ratio(summary[key], total):.1%})")
+        self._line("")
+        self._line("## 개선 필요 항목")
+        self._line("")
+        for row in improvements:
+            self._line(f"1. **{row['id']}** ({row['description']}) - {row['improvement']}")
+        if not improvements:
+            self._line(ALL_PASSED)
+
+
+# 헤더 클릭 시 해당 열로 정렬 (숫자/문자열, 다시 클릭하면 역순)
+_SORT_SCRIPT = """<script>
+document.querySelectorAll("table.sortable th").forEach(function (th, index) {
+  th.addEventListener("click", function () {
+    var tbody = th.closest("table").tBodies[0];
+    var ascending = th.dataset.order !== "asc";
+    th.dataset.order = ascending ? "asc" : "desc";
+    Array.from(tbody.rows)
+      .sort(function (a, b) {
+        var x = a.cells[index].textContent, y = b.cells[index].textContent;
+        return (ascending ? 1 : -1) * x.localeCompare(y, undefined, {numeric: true});
+      })
+      .forEach(function (tr) { tbody.appendChild(tr); });
+  });
+});
+</script>"""
+
+_STYLE = """<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { cursor: pointer; background: #f4f4f4; }
+tr.failed { background: #fdecea; } tr.partial, tr.untested { background: #fff8e1; }
+</style>"""
+
+
+class HtmlWriter:
+    """헤더 클릭으로 정렬 가능한 HTML 추적 매트릭스"""
+
+    extension = "html"
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def begin(self, today):
+        title = html.escape(MATRIX_TITLE)
+        self.fp.write(
+            f'<!DOCTYPE html>\n<html lang="ko">\n<head>\n<meta charset="utf-8">\n<title>{title}</title>\n{_STYLE}\n</head>\n'
+            f"<body>\n<h1>{title}</h1>\n<p>{html.escape(MATRIX_INTRO)}</p>\n"
+            f"<p><em>마지막 업데이트: {html.escape(today)}</em></p>\n<h2>추적 매트릭스</h2>\n"
+            '<table class="sortable">\n<thead><tr><th>요구사항 ID</th><th>설명</th><th>테스트 케이스</th>'
+            "<th>결과</th><th>비고</th></tr></thead>\n<tbody>\n"
+        )
+
+    def row(self, row):
+        tests = "<br>".join(html.escape(test) for test in row["tests"]) if row["tests"] else "없음"
+        results = "<br>".join(html.escape(result) for result in row["results"])
+        self.fp.write(
+            f'<tr class="{row["status"]}"><td>{html.escape(row["id"])}</td><td>{html.escape(row["description"])}</td>'
+            f"<td>{tests}</td><td>{results}</td><td>{html.escape(row['notes'])}</td></tr>\n"
+        )
+
+    def end(self, summary, improvements):
+        total = summary["total"]
+        self.fp.write("</tbody>\n</table>\n<h2>테스트 커버리지 요약</h2>\n<ul>\n")
+        self.fp.write(f"<li><strong>총 요구사항 수</strong>: {total}</li>\n")
+        for key, label in SUMMARY_LABELS:
+            self.fp.write(f"<li><strong>{label}</strong>: {summary[key]} ({_ratio(summary[key], total):.1%})</li>\n")
+        self.fp.write("</ul>\n<h2>개선 필요 항목</h2>\n")
+        if improvements:
+            self.fp.write("<ol>\n")
+            for row in improvements:
+                self.fp.write(f"<li><strong>{html.escape(row['id'])}</strong> ({html.escape(row['description'])}) "
+                              f"- {html.escape(row['improvement'])}</li>\n")
+            self.fp.write("</ol>\n")
+        else:
+            self.fp.write(f"<p>{ALL_PASSED}</p>\n")
+        self.fp.write(f"{_SORT_SCRIPT}\n</body>\n</html>\n")
+
+
+class CsvWriter:
+    """요구사항별 한 행의 CSV (여러 테스트/결과는 ' | ' 로 구분)"""
+
+    extension = "csv"
+    columns = ("requirement_id", "description", "status", "results", "notes", "tests")
+
+    def __init__(self, fp):
+        self.writer = csv.writer(fp, lineterminator="\n")
+
+    def begin(self, today):
+        self.writer.writerow(self.columns)
+
+    def row(self, row):
+        self.writer.writerow((row["id"], row["description"], row["status"], " | ".join(row["results"]),
+                              row["notes"], " | ".join(row["tests"])))
+
+    def end(self, summary, improvements):
+        pass
+
+
+class JsonWriter:
+    """{"generated", "requirements": [...], "summary", "improvements"} 형식 JSON (행 단위로 기록)"""
+
+    extension = "json"
+
+    def __init__(self, fp):
+        self.fp = fp
+        self._first = True
+
+    def begin(self, today):
+        self.fp.write(f'{{"generated": {json.dumps(today)}, "requirements": [')
+
+    def row(self, row):
+        record = {key: row[key] for key in ("id", "description", "status", "results", "notes", "tests")}
+        self.fp.write(("\n  " if self._first else ",\n  ") + json.dumps(record, ensure_ascii=False))
+        self._first = False
+
+    def end(self, summary, improvements):
+        items = [{"id": row["id"], "description": row["description"], "reason": row["improvement"]} for row in improvements]
+        self.fp.write(f'\n], "summary": {json.dumps(summary)}, '
+                      f'"improvements": {json.dumps(items, ensure_ascii=False)}}}\n')
+
+
+WRITERS = {writer.extension: writer for writer in (MarkdownWriter, HtmlWriter, CsvWriter, JsonWriter)}
@@ -0,0 +1,14 @@
+"""
+LunitCare QA - 모듈 단위 테스트 공통 설정
+
+API 서버 없이 실행되는 단위 테스트입니다 (저장소 루트의 ui_* 모듈, scripts/ 의 스크립트 모듈).
+"""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+for path in (ROOT_DIR, ROOT_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
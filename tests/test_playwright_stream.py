@@ -0,0 +1,135 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from playwright_stream import CHUNK_SIZE, JsonStreamReader, iter_spec_results
+
+REPORT_PATH = Path(__file__).resolve().parent / "fixtures" / "playwright_report.json"
+# 1 바이트 청크는 모든 문자열/이스케이프가 청크 경계에서 잘리는 경우를 포함
+CHUNK_SIZES = (1, 2, 3, 7, 64, CHUNK_SIZE)
+
+TRICKY_STRINGS = [
+    "",
+    "plain",
+    'quote " and backslash \\ and slash /',
+    "제어 문자 \b\f\n\r\t 끝",
+    "\u001b[31mANSI\u001b[39m",
+    "한글 분석 완료! é",
+    "서로게이트 쌍 \U0001F600 이모지",
+    "C:\\Users\\qa\\e2e_tests\\tests",
+    "braces { [ ] } inside",
+]
+
+
+def _expected_specs(report):
+    """json.load 결과를 직접 순회해 spec 별 (제목 경로, 상태, 재시도 횟수) 계산"""
+    test_status = {"expected": "passed", "flaky": "passed", "unexpected": "failed", "skipped": "skipped"}
+
+    def final_status(test):
+        if test.get("status") in test_status:
+            return test_status[test["status"]]
+        results = sorted(test.get("results") or [], key=lambda result: result.get("retry", 0))
+        if not results:
+            return "skipped"
+        return results[-1]["status"] if results[-1]["status"] in ("passed", "skipped") else "failed"
+
+    def walk(suite, titles):
+        titles = titles + [suite["title"]]
+        for spec in suite.get("specs", []):
+            statuses = {final_status(test) for test in spec["tests"]}
+            status = "failed" if "failed" in statuses else "passed" if "passed" in statuses else "skipped"
+            yield {
+                "titles": titles + [spec["title"]],
+                "title": spec["title"],
+                "status": status,
+                "retries": sum(max(len(test.get("results") or []) - 1, 0) for test in spec["tests"]),
+            }
+        for child in suite.get("suites", []):
+            yield from walk(child, titles)
+
+    return [spec for suite in report["suites"] for spec in walk(suite, [])]
+
+
+@pytest.fixture(scope="module")
+def report():
+    with open(REPORT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_iter_spec_results_matches_json_load(report, chunk_size):
+    assert list(iter_spec_results(REPORT_PATH, chunk_size)) == _expected_specs(report)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_read_value_matches_json_load(report, chunk_size):
+    with open(REPORT_PATH, encoding="utf-8") as f:
+        assert JsonStreamReader(f, chunk_size).read_value() == report
+
+
+def test_retried_spec_statuses():
+    """재시도 후 통과(flaky)는 passed, 재시도 후에도 실패는 failed, 상태가 없으면 마지막 재시도 결과"""
+    specs = {spec["title"]: spec for spec in iter_spec_results(REPORT_PATH, 5)}
+
+    flaky = specs["[REQ-002] 이미지 분석 후 완료 메시지가 표시된다"]
+    assert (flaky["status"], flaky["retries"]) == ("passed", 1)
+
+    failed = specs["[REQ-012] 유효하지 않은 파일 업로드 시 오류 메시지가 표시된다"]
+    assert (failed["status"], failed["retries"]) == ("failed", 1)
+
+    # results 순서와 무관하게 retry 번호가 가장 큰 시도를 사용
+    no_status = specs["[REQ-006] 재시도 결과만 있는 spec"]
+    assert (no_status["status"], no_status["retries"]) == ("passed", 2)
+
+    skipped = specs["[REQ-005] 결과 저장 (PDF) 버튼으로 보고서를 내려받는다 \U0001F600"]
+    assert skipped["status"] == "skipped"
+    assert skipped["titles"] == [
+        "test_req_traceability.spec.ts", "보고서 {다운로드} [PDF]",
+        "[REQ-005] 결과 저장 (PDF) 버튼으로 보고서를 내려받는다 \U0001F600",
+    ]
+
+
+@pytest.mark.parametrize("value", TRICKY_STRINGS)
+@pytest.mark.parametrize("ensure_ascii", (True, False))
+def test_string_escapes_split_across_chunks(value, ensure_ascii):
+    """이스케이프(\\n, \\", \\uXXXX, 서로게이트 쌍)가 청크 경계 어디에서 잘려도 같은 문자열"""
+    text = json.dumps({"key": value, "after": [value]}, ensure_ascii=ensure_ascii)
+    for chunk_size in range(1, len(text) + 1):
+        assert JsonStreamReader(io.StringIO(text), chunk_size).read_value() == json.loads(text), chunk_size
+
+
+@pytest.mark.parametrize("chunk_size", (1, 2, 3, 8))
+def test_skip_value_ignores_structure_inside_strings(chunk_size):
+    skipped = {"a": ["}", "]", "\"{", "\\"], "b": {"c": "[[[", "d": [1, 2.5, -3e2, True, None]}}
+    text = json.dumps({"skip": skipped, "keep": "값", "also": [{"x": "}"}], "last": False})
+    reader = JsonStreamReader(io.StringIO(text), chunk_size)
+    values = {}
+    for key in reader.iter_object():
+        if key == "skip":
+            reader.skip_value()
+        else:
+            values[key] = reader.read_value()
+    assert values == {"keep": "값", "also": [{"x": "}"}], "last": False}
+
+
+def test_flat_legacy_format(tmp_path):
+    path = tmp_path / "results.json"
+    path.write_text(json.dumps({
+        "tests": [
+            {"title": "[REQ-001] 업로드", "status": "passed", "duration": 10},
+            {"title": "[REQ-002] 분석", "status": "failed", "error": "Timeout \"30s\""},
+        ],
+    }), encoding="utf-8")
+    assert list(iter_spec_results(path, 3)) == [
+        {"titles": ["[REQ-001] 업로드"], "title": "[REQ-001] 업로드", "status": "passed", "retries": 0},
+        {"titles": ["[REQ-002] 분석"], "title": "[REQ-002] 분석", "status": "failed", "retries": 0},
+    ]
+
+
+@pytest.mark.parametrize("text", ['{"a": [1, 2', '{"a": "unterminated', '{"a" 1}'])
+def test_truncated_or_invalid_json_raises(text):
+    reader = JsonStreamReader(io.StringIO(text), 2)
+    with pytest.raises(ValueError):
+        reader.read_value()
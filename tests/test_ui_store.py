@@ -0,0 +1,197 @@
+import sqlite3
+import time
+
+import pytest
+
+import ui_store
+
+PAGE_SIZE = 7
+STATUSES = (None, ui_store.ANALYSIS_OK, ui_store.ANALYSIS_ERROR)
+
+
+def _outcome(i):
+    """ui_app.request_analysis 반환값 형식의 분석 결과 (점수/시각 중복, 점수/응답 시간 NULL 포함)"""
+    if i % 3 == 0:
+        outcome = {"ok": False, "error": f"API 오류: 500 ({i})"}
+    else:
+        result = {"flags": ["nodule"] if i % 2 else []}
+        if i % 11:
+            result["abnormality_score"] = (i % 4) * 10
+        outcome = {"ok": True, "result": {"model_type": "vit", "result": result}}
+    if i % 7:
+        outcome["elapsed_ms"] = float(100 + (i % 6) * 25)
+    return outcome
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "ui.sqlite"
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = ui_store.connect(db_path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def analyses(conn):
+    records = [ui_store.analysis_record(_outcome(i), filename=f"img{i}.png", patient_id=f"PT-{i % 9:04d}",
+                                        analyzed_at=f"2025-06-01T10:{i // 3:02d}:00.000")
+               for i in range(60)]
+    with conn:
+        conn.executemany(
+            f"INSERT INTO analyses ({ui_store._ANALYSIS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records
+        )
+    return conn
+
+
+def _expected(conn, sort, descending, status):
+    """필터된 전체 행을 Python 으로 정렬 (NULL 은 오름차순 맨 앞, 같은 값은 id 순)"""
+    where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+    rows = conn.execute(f"SELECT id, {sort} FROM analyses {where}", params).fetchall()
+    rows.sort(key=lambda row: (row[sort] is not None, row[sort] or 0, row["id"]), reverse=descending)
+    return [row["id"] for row in rows]
+
+
+def _ids(rows):
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("status", STATUSES)
+@pytest.mark.parametrize("descending", (True, False))
+@pytest.mark.parametrize("sort", ui_store.ANALYSIS_SORTS)
+def test_query_analyses_pages_forward_and_backward(analyses, sort, descending, status):
+    expected = _expected(analyses, sort, descending, status)
+    assert len(expected) > 2 * PAGE_SIZE
+
+    def query(**kwargs):
+        return ui_store.query_analyses(analyses, sort=sort, descending=descending, page_size=PAGE_SIZE,
+                                       status=status, **kwargs)
+
+    # 처음 -> 다음 ... 끝까지 (커서가 진행하지 않으면 페이지 수 상한에서 멈춤)
+    max_pages = len(expected) // PAGE_SIZE + 2
+    forward, page = [], query()
+    for _ in range(max_pages):
+        if not page:
+            break
+        forward += _ids(page)
+        page = query(after=ui_store.analysis_cursor(page[-1], sort))
+    assert forward == expected
+
+    # 마지막 -> 이전 ... 처음까지
+    page = query(last=True)
+    assert _ids(page) == expected[-PAGE_SIZE:]
+    backward = []
+    for _ in range(max_pages):
+        if not page:
+            break
+        backward = _ids(page) + backward
+        page = query(before=ui_store.analysis_cursor(page[0], sort))
+    assert backward == expected
+
+    # 모든 행을 경계로 한 다음/이전 페이지 (NULL 구간과 값 구간 사이를 넘나드는 커서 포함)
+    rows = {row["id"]: row for row in analyses.execute(f"SELECT id, {sort} FROM analyses")}
+    for index, analysis_id in enumerate(expected):
+        cursor = ui_store.analysis_cursor(rows[analysis_id], sort)
+        assert _ids(query(after=cursor)) == expected[index + 1:index + 1 + PAGE_SIZE]
+        assert _ids(query(before=cursor)) == expected[max(index - PAGE_SIZE, 0):index]
+
+
+def test_query_analyses_rows_and_filters(analyses):
+    rows = ui_store.query_analyses(analyses, sort="abnormality_score", status=ui_store.ANALYSIS_OK,
+                                   min_score=20, patient_id="PT-000", page_size=100)
+    assert rows
+    assert all(row["status"] == "ok" and row["abnormality_score"] >= 20 for row in rows)
+    assert all(row["patient_id"].startswith("PT-000") for row in rows)
+    assert all(isinstance(row["flags"], list) for row in rows)
+    assert ui_store.count_analyses(analyses, status=ui_store.ANALYSIS_OK, min_score=20,
+                                   patient_id="PT-000") == len(rows)
+    assert ui_store.count_analyses(analyses) == 60
+    assert ui_store.count_analyses(analyses, status=ui_store.ANALYSIS_ERROR) == 20
+
+    with pytest.raises(ValueError):
+        ui_store.query_analyses(analyses, sort="filename")
+
+
+def test_analysis_log_flush_writes_all_records(conn, db_path):
+    log = ui_store.AnalysisLog(db_path, batch_size=3)
+    for i in range(20):
+        log.append(ui_store.analysis_record(_outcome(i), filename=f"img{i}.png"))
+    log.flush()
+    assert ui_store.count_analyses(conn) == 20
+    assert log.dropped == 0
+
+
+def test_analysis_log_drops_when_queue_is_full(conn, db_path):
+    log = ui_store.AnalysisLog(db_path, queue_size=2)
+    log.append(ui_store.analysis_record(_outcome(1)))
+    log.flush()
+
+    # 기록 스레드가 쓰기 잠금을 기다리는 동안 대기열을 채움
+    blocker = sqlite3.connect(str(db_path), isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    log.append(ui_store.analysis_record(_outcome(2)))
+    deadline = time.monotonic() + 5
+    while log.queue.qsize() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for i in range(3, 6):
+        log.append(ui_store.analysis_record(_outcome(i)))
+    assert log.dropped == 1
+    blocker.rollback()
+    blocker.close()
+
+    log.flush()
+    assert ui_store.count_analyses(conn) == 4
+
+
+def test_analysis_log_counts_failed_writes_as_dropped(conn, db_path):
+    log = ui_store.AnalysisLog(db_path)
+    log.append(ui_store.analysis_record(_outcome(1)))
+    log.flush()
+
+    with conn:
+        conn.execute("DROP TABLE analyses")
+    log.append(ui_store.analysis_record(_outcome(2)))
+    log.append(ui_store.analysis_record(_outcome(3)))
+    log.flush()
+    assert log.dropped == 2
+
+    # 기록 스레드는 실패 후에도 계속 동작
+    ui_store.connect(db_path).close()
+    log.append(ui_store.analysis_record(_outcome(4)))
+    log.flush()
+    assert conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] == 1
+
+
+def test_register_patient_upsert(conn):
+    analysis = {"model_type": "vit", "result": {"abnormality_score": 72, "flags": ["nodule", "결절"]}}
+    ui_store.register_patient(conn, "PT-0001", "홍길동", "1990-01-01", analysis, registered_at="2025-06-01T10:00:00",
+                              analysis_id="A-1", analyzed_at="2025-06-01T09:59:00", thumbnail=b"png")
+    ui_store.register_patient(conn, "PT-0002", "김영희", registered_at="2025-06-01T11:00:00")
+
+    # 분석 결과 없이 다시 등록하면 이름/생년월일만 갱신하고 분석 결과와 최초 등록 시각은 유지
+    ui_store.register_patient(conn, "PT-0001", "홍길순", "1990-02-02", registered_at="2025-06-02T10:00:00")
+    assert ui_store.count_patients(conn) == 2
+    patient = next(ui_store.iter_analyzed_patients(conn))
+    assert patient == {
+        "patient_id": "PT-0001", "name": "홍길순", "birthdate": "1990-02-02", "registered_at": "2025-06-01T10:00:00",
+        "model_type": "vit", "abnormality_score": 72, "flags": ["nodule", "결절"],
+        "analysis_id": "A-1", "analyzed_at": "2025-06-01T09:59:00", "thumbnail": b"png",
+    }
+
+    # 새 분석 결과로 다시 등록하면 분석 결과 갱신 (썸네일은 새 값이 없으면 유지)
+    ui_store.register_patient(conn, "PT-0001", "홍길순", "1990-02-02",
+                              {"model_type": "vit", "result": {"abnormality_score": 15, "flags": []}},
+                              analysis_id="A-2")
+    patient = next(ui_store.iter_analyzed_patients(conn))
+    assert (patient["abnormality_score"], patient["flags"], patient["analysis_id"], patient["thumbnail"]) == (
+        15, [], "A-2", b"png")
+    assert ui_store.count_patients(conn) == 2
+
+    assert [p["patient_id"] for p in ui_store.list_patients(conn)] == ["PT-0002", "PT-0001"]
+    assert [p["patient_id"] for p in ui_store.list_patients(conn, query="홍")] == ["PT-0001"]
+    assert [p["patient_id"] for p in ui_store.list_patients(conn, query="PT-0002")] == ["PT-0002"]
+    assert ui_store.count_patients(conn, query="PT-") == 2
+    assert ui_store.list_patients(conn, page=1, page_size=1)[0]["patient_id"] == "PT-0001"
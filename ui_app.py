@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import json
 from PIL import Image
+import hashlib
 import io
 import base64
 import pandas as pd
@@ -9,13 +10,60 @@ import time
 import random
 import re
 import os
-from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import ui_reports
+import ui_store
+import ui_telemetry
 
 # API 설정
 API_URL = os.getenv("API_URL", "http://localhost:5000")
 API_KEY = os.getenv("API_KEY", "test_api_key")
 HEADERS = {"X-API-Key": API_KEY}
 
+# HTTP 클라이언트 설정 (연결/응답 대기 제한 시간(초), 연결 실패/일시 오류 재시도 횟수)
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "60"))
+API_RETRIES = int(os.getenv("API_RETRIES", "2"))
+# 백그라운드 분석 요청 동시 실행 수
+ANALYSIS_WORKERS = int(os.getenv("UI_ANALYSIS_WORKERS", "4"))
+ANALYZING_MESSAGE = "AI가 이미지를 분석 중입니다..."
+
+# 업로드 허용 형식
+UPLOAD_TYPES = ["jpg", "jpeg", "png", "dcm", "dicom"]
+# 일괄 분석 진행 중 결과 표 갱신 주기 (초)
+BATCH_REFRESH_S = float(os.getenv("UI_BATCH_REFRESH_S", "0.5"))
+# 일괄 분석 결과 표의 상태 표시
+BATCH_STATUS = {"queued": "⏳ 대기", "running": "🔄 분석 중", "done": "✅ 완료", "failed": "❌ 실패"}
+
+# 분석 히스토리 정렬 기준 / 상태 필터 (표시 이름 -> 저장소 값)
+HISTORY_SORTS = {"분석 시각": "analyzed_at", "비정상 점수": "abnormality_score", "응답 시간": "latency_ms"}
+HISTORY_STATUS = {"전체": None, "성공": ui_store.ANALYSIS_OK, "실패": ui_store.ANALYSIS_ERROR}
+
+# 지연 시간 패널 단계 이름 / 자동 새로고침 주기(초)와 한 번 켰을 때의 최대 새로고침 횟수
+TELEMETRY_STAGE_LABELS = {
+    "total": "전체 (제출 → 결과 표시)",
+    "queue": "작업 대기열",
+    "request": "HTTP 요청",
+    "server": "서버 처리 (processing_time_ms)",
+    "network": "네트워크/오버헤드",
+    "render": "결과 렌더링",
+}
+TELEMETRY_REFRESH_S = 2.0
+TELEMETRY_REFRESH_LIMIT = int(os.getenv("UI_TELEMETRY_REFRESH_LIMIT", "30"))
+
+# 보고서 썸네일 최대 크기(px) / 다운로드 버튼 표시 전 보고서 생성 대기 한도(초)
+REPORT_THUMBNAIL_SIZE = 256
+REPORT_WAIT_S = float(os.getenv("UI_REPORT_WAIT_S", "30"))
+
+# 미리보기 이미지 최대 크기(px) 및 캐시 항목 수
+PREVIEW_MAX_SIZE = int(os.getenv("UI_PREVIEW_MAX_SIZE", "512"))
+PREVIEW_CACHE_ENTRIES = 128
+
 # 세션 상태 초기화
 # for key in ['logs', 'ui_refresh_counter', 'show_patient_form', 'show_logs', 
 #             'log_container', 'patients', 'patient_id', 'patient_name', 'patient_birthdate']:
@@ -24,10 +72,12 @@ HEADERS = {"X-API-Key": API_KEY}
 
 
 for key in ['logs', 'ui_refresh_counter', 'show_patient_form', 'show_logs', 
-            'log_container', 'patients', 'patient_id', 'patient_name', 'patient_birthdate']:
+            'log_container', 'patient_id', 'patient_name', 'patient_birthdate', 'upload_hashes']:
     if key not in st.session_state:
-        if key in ['logs', 'patients']:
+        if key == 'logs':
             st.session_state[key] = []
+        elif key == 'upload_hashes':
+            st.session_state[key] = {}
         elif key == 'ui_refresh_counter':
             st.session_state[key] = 0
         elif 'show_' in key:
@@ -43,28 +93,323 @@ def add_log(message):
     if len(st.session_state.logs) > 100:
         st.session_state.logs = st.session_state.logs[-100:]
 
-# 분석 API 호출 함수
-def analyze_image(image_bytes, filename):
-    add_log("사용자가 AI 판독 요청함")
+@st.cache_resource
+def get_http_session():
+    """
+    재실행(rerun) 간 공유되는 keep-alive HTTP 세션
+    
+    연결 풀을 재사용하고, 연결 실패와 일시적인 서버 오류(502/503/504)는 지수 백오프로 재시도합니다.
+    응답 대기 시간 초과는 모델 서버에 같은 작업을 다시 쌓지 않도록 재시도하지 않습니다.
+    """
+    retry = Retry(
+        total=API_RETRIES,
+        connect=API_RETRIES,
+        read=0,
+        status=API_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=ANALYSIS_WORKERS, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_analysis_executor():
+    """분석 요청을 Streamlit 스크립트 스레드 밖에서 실행하는 작업 스레드 풀"""
+    return ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="lunitcare-analysis")
+
+# 분석 이력 기록기 (모든 세션이 공유하는 백그라운드 기록 스레드 하나)
+@st.cache_resource
+def get_analysis_log():
+    return ui_store.AnalysisLog()
+
+# PDF 보고서 작업 프로세스 풀 및 렌더링 캐시 (모든 세션이 공유)
+@st.cache_resource
+def get_report_renderer():
+    return ui_reports.ReportRenderer()
+
+# 사용자 체감 지연 시간 링 버퍼 (모든 세션이 공유)
+@st.cache_resource
+def get_latency_telemetry():
+    return ui_telemetry.LatencyTelemetry()
+
+def log_analysis_when_done(future, filename):
+    """분석이 끝나면 작업 스레드에서 결과를 분석 이력 대기열에 추가 (화면 진행과 무관하게 기록)"""
+    analysis_log = get_analysis_log()
+    patient_id = st.session_state.get("analysis_patient_id", "").strip()
+    future.add_done_callback(
+        lambda done: analysis_log.append(ui_store.analysis_record(done.result(), filename, patient_id))
+    )
+
+def request_analysis(session, image_bytes, filename):
+    """
+    분석 API 호출 (작업 스레드에서 실행되므로 st.* 를 사용하지 않음)
+    
+    Returns:
+        dict: {"ok", "result" 또는 "error", "status_code", "elapsed_ms",
+               "started"/"finished"(요청 시작/종료 perf_counter 값)}
+    """
+    started = time.perf_counter()
     try:
-        response = requests.post(
+        response = session.post(
             f"{API_URL}/analyze",
-            headers=HEADERS,
-            files={"file": (filename, image_bytes, "image/jpeg")}
+            files={"file": (filename, image_bytes, "image/jpeg")},
+            timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
         )
-        if response.status_code == 200:
-            result = response.json()
-            st.session_state.analysis_result = result
-            st.session_state.analyzed_image = image_bytes
-            st.session_state.analysis_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-            add_log(f"분석 완료: 비정상 점수 {result['result']['abnormality_score']}")
-            return True
-        else:
-            add_log(f"API 오류: {response.status_code}")
-            return False
+    except requests.Timeout:
+        finished = time.perf_counter()
+        return {"ok": False, "error": f"응답 시간 초과 ({API_READ_TIMEOUT:g}초)", "status_code": None,
+                "elapsed_ms": (finished - started) * 1000, "started": started, "finished": finished}
+    except requests.RequestException as e:
+        finished = time.perf_counter()
+        return {"ok": False, "error": str(e), "status_code": None, "elapsed_ms": (finished - started) * 1000,
+                "started": started, "finished": finished}
+    
+    finished = time.perf_counter()
+    elapsed_ms = (finished - started) * 1000
+    if response.status_code != 200:
+        return {"ok": False, "error": f"API 오류: {response.status_code}", "status_code": response.status_code,
+                "elapsed_ms": elapsed_ms, "started": started, "finished": finished}
+    try:
+        result = response.json()
+    except ValueError:
+        return {"ok": False, "error": "API 응답 형식 오류 (JSON 이 아님)", "status_code": 200,
+                "elapsed_ms": elapsed_ms, "started": started, "finished": finished}
+    return {"ok": True, "result": result, "status_code": 200, "elapsed_ms": elapsed_ms, "started": started,
+            "finished": finished}
+
+# 분석 API 호출 함수 (백그라운드 실행)
+def analyze_image(image_bytes, filename, image_hash=None):
+    """분석 요청을 작업 스레드에 제출 (결과는 wait_for_analysis() 에서 반영)"""
+    add_log("사용자가 AI 판독 요청함")
+    submitted = time.perf_counter()
+    future = get_analysis_executor().submit(request_analysis, get_http_session(), image_bytes, filename)
+    log_analysis_when_done(future, filename)
+    st.session_state.pending_analysis = {
+        "future": future,
+        "image": image_bytes,
+        "image_hash": image_hash or hashlib.sha256(image_bytes).hexdigest(),
+        "filename": filename,
+        "submitted": submitted,
+    }
+
+def wait_for_analysis():
+    """
+    진행 중인 분석이 끝날 때까지 진행 표시줄을 갱신하며 대기한 뒤 결과를 세션에 반영
+    
+    대기 중 사용자가 다른 위젯을 조작하면 재실행되지만 요청은 작업 스레드에서 계속 진행되며,
+    다음 실행에서 이어서 대기합니다.
+    
+    Returns:
+        bool: 분석 성공 여부
+    """
+    pending = st.session_state.pending_analysis
+    future = pending["future"]
+    progress = st.progress(0.0, text=ANALYZING_MESSAGE)
+    while not future.done():
+        elapsed = time.perf_counter() - pending["submitted"]
+        # 남은 시간을 알 수 없으므로 경과 시간에 따라 점근적으로 증가
+        progress.progress(min(elapsed / (elapsed + 2.0), 0.95), text=f"{ANALYZING_MESSAGE} ({elapsed:.1f}초)")
+        time.sleep(0.1)
+    progress.empty()
+    
+    # 결과 처리 중 예외가 나도 다음 실행에서 같은 Future 를 다시 기다리지 않도록 먼저 제거
+    del st.session_state.pending_analysis
+    outcome = future.result()
+    # 렌더링 시간까지 포함하도록 결과 카드를 그린 뒤 기록
+    st.session_state.latency_sample = (
+        ui_telemetry.make_sample(outcome, pending["filename"], pending["submitted"]), time.perf_counter()
+    )
+    if not outcome["ok"]:
+        add_log(f"분석 오류 발생: {outcome['error']}" if outcome["status_code"] is None else outcome["error"])
+        return False
+    
+    result = outcome["result"]
+    st.session_state.analysis_result = result
+    st.session_state.analyzed_image = pending["image"]
+    st.session_state.analyzed_image_hash = pending["image_hash"]
+    st.session_state.analysis_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    st.session_state.analysis_id = uuid.uuid4().hex[:12]
+    st.session_state.pop("report_patient", None)
+    add_log(f"분석 완료: 비정상 점수 {result['result']['abnormality_score']}")
+    # 결과 카드를 그리는 동안 보고서를 미리 생성 (실패해도 다운로드 시 다시 제출)
+    try:
+        get_report_renderer().submit(current_report())
     except Exception as e:
-        add_log(f"분석 오류 발생: {str(e)}")
+        add_log(f"보고서 미리 생성 오류: {e}")
+    return True
+
+def start_batch(files):
+    """
+    업로드한 파일 전체를 작업 스레드 풀에 제출
+    
+    동시 요청 수는 스레드 풀 크기(UI_ANALYSIS_WORKERS)로 제한되며, 나머지는 대기열에서 차례로 실행됩니다.
+    """
+    session = get_http_session()
+    executor = get_analysis_executor()
+    started = time.perf_counter()
+    jobs = []
+    for uploaded_file in files:
+        data = uploaded_file.getvalue()
+        job = {"name": uploaded_file.name}
+        submitted = time.perf_counter()
+        job["future"] = executor.submit(request_analysis, session, data, uploaded_file.name)
+        log_analysis_when_done(job["future"], uploaded_file.name)
+        record_batch_latency(job["future"], uploaded_file.name, submitted)
+        jobs.append(job)
+    st.session_state.batch = {"jobs": jobs, "started": started, "logged": False}
+    add_log(f"사용자가 일괄 판독 요청함: {len(jobs)}개 파일")
+
+def record_batch_latency(future, filename, submitted):
+    """일괄 분석 작업의 지연 시간을 완료 시점(작업 스레드)에 기록"""
+    telemetry = get_latency_telemetry()
+    future.add_done_callback(
+        lambda done: telemetry.record(ui_telemetry.make_sample(done.result(), filename, submitted, mode="batch"))
+    )
+
+def record_latency_sample():
+    """결과 표시가 끝난 시점에 wait_for_analysis() 가 남긴 지연 시간 샘플 기록"""
+    if "latency_sample" in st.session_state:
+        sample, rendered_from = st.session_state.pop("latency_sample")
+        get_latency_telemetry().record(sample, rendered_from)
+
+def batch_running():
+    batch = st.session_state.get("batch")
+    return batch is not None and not all(job["future"].done() for job in batch["jobs"])
+
+def batch_job_row(job):
+    """일괄 분석 작업 하나의 결과 표 행"""
+    future = job["future"]
+    row = {"파일": job["name"], "상태": BATCH_STATUS["queued"], "비정상 점수": None, "소견": "",
+           "응답 시간(ms)": None, "오류": ""}
+    if not future.done():
+        if future.running():
+            row["상태"] = BATCH_STATUS["running"]
+        return row
+    outcome = future.result()
+    row["응답 시간(ms)"] = round(outcome["elapsed_ms"], 1)
+    if outcome["ok"]:
+        result = outcome["result"]["result"]
+        row["상태"] = BATCH_STATUS["done"]
+        row["비정상 점수"] = result["abnormality_score"]
+        row["소견"] = ", ".join(medical_terms.get(flag, flag) for flag in result["flags"]) or "특이 소견 없음"
+    else:
+        row["상태"] = BATCH_STATUS["failed"]
+        row["오류"] = outcome["error"]
+    return row
+
+def show_batch_results():
+    """
+    일괄 분석 진행 상황을 결과 표로 표시하고, 모두 끝났으면 요약과 CSV 내보내기 표시
+    
+    진행 중에는 현재 상태만 그리고 반환하며(다른 탭을 막지 않음), 갱신은 스크립트 끝의 재실행이 맡습니다.
+    
+    Returns:
+        bool: 모든 작업이 끝났는지 여부
+    """
+    batch = st.session_state.batch
+    jobs = batch["jobs"]
+    done = sum(job["future"].done() for job in jobs)
+    results_df = pd.DataFrame([batch_job_row(job) for job in jobs])
+    st.progress(done / len(jobs), text=f"일괄 분석 진행: {done}/{len(jobs)}")
+    st.dataframe(results_df, use_container_width=True, hide_index=True)
+    if done < len(jobs):
         return False
+    
+    succeeded = int((results_df["상태"] == BATCH_STATUS["done"]).sum())
+    # 완료 시각은 작업 스레드가 요청을 마친 시점 (화면 갱신 주기와 무관한 처리량 계산용)
+    elapsed = max(job["future"].result()["finished"] for job in jobs) - batch["started"]
+    if not batch["logged"]:
+        add_log(f"일괄 분석 완료: {len(jobs)}개 중 {succeeded}개 성공 ({elapsed:.1f}초)")
+        batch["logged"] = True
+    throughput = f", {len(jobs) / elapsed:.1f}장/초" if elapsed > 0 else ""
+    st.caption(f"{len(jobs)}개 중 {succeeded}개 성공 · 소요 시간 {elapsed:.1f}초{throughput}")
+    st.download_button(
+        label="📥 전체 결과 CSV 내보내기",
+        data=results_df.to_csv(index=False).encode("utf-8-sig"),
+        file_name=f"AI_일괄분석결과_{time.strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv",
+    )
+    return True
+
+def upload_content_hash(uploaded_file):
+    """
+    업로드 파일 내용의 SHA-256 해시 (업로드마다 한 번만 계산하여 세션에 보관)
+    
+    Returns:
+        tuple: (해시, 이번 실행에서 처음 본 업로드인지 여부)
+    """
+    hashes = st.session_state.upload_hashes
+    if uploaded_file.file_id in hashes:
+        return hashes[uploaded_file.file_id], False
+    if len(hashes) >= PREVIEW_CACHE_ENTRIES:
+        hashes.pop(next(iter(hashes)))
+    hashes[uploaded_file.file_id] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return hashes[uploaded_file.file_id], True
+
+@st.cache_data(max_entries=PREVIEW_CACHE_ENTRIES, show_spinner=False)
+def make_preview(image_hash, _image_file, max_size=PREVIEW_MAX_SIZE):
+    """
+    내용 해시별 축소 미리보기 (JPEG bytes, 열 수 없는 형식이면 None)
+    
+    원본 파일은 캐시 키에서 제외하고(_image_file) 해시로만 조회하며 캐시에 없을 때만 읽으므로,
+    재실행 시 원본 크기와 무관하게 캐시된 미리보기를 재사용합니다. JPEG 는 축소 디코딩(draft)으로
+    전체 해상도 디코딩을 피합니다.
+    """
+    try:
+        _image_file.seek(0)
+        image = Image.open(_image_file)
+        image.draft("RGB", (max_size, max_size))
+        if image.mode in ("I;16", "I;16B", "I;16L", "I"):
+            # 16비트 그레이스케일은 8비트로 축소
+            image = image.convert("I").point(lambda value: value * (1 / 256)).convert("L")
+        elif image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.thumbnail((max_size, max_size))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+        return buffer.getvalue()
+    except Exception:
+        return None
+
+def show_preview(image_hash, image_file, caption):
+    """내용 해시로 캐시된 미리보기 표시 (image_file: 업로드 파일 등 파일 객체)"""
+    preview = make_preview(image_hash, image_file)
+    if preview is None:
+        st.info("미리보기를 표시할 수 없는 형식입니다.")
+    else:
+        st.image(preview, caption=caption, use_column_width=True)
+
+# 환자 레지스트리 연결 (세션당 하나, 재실행 간 재사용)
+def get_store():
+    if "store_conn" not in st.session_state:
+        st.session_state.store_conn = ui_store.connect()
+    return st.session_state.store_conn
+
+# 분석된 이미지의 보고서용 썸네일 (JPEG, 미리보기 캐시 재사용)
+def analyzed_thumbnail():
+    if "analyzed_image" not in st.session_state:
+        return None
+    return make_preview(st.session_state.analyzed_image_hash, io.BytesIO(st.session_state.analyzed_image),
+                        REPORT_THUMBNAIL_SIZE)
+
+# 현재 분석 결과의 보고서 입력 (환자 정보는 등록한 환자, 없으면 분석 시 입력한 환자 ID)
+def current_report():
+    result = st.session_state.analysis_result
+    patient = st.session_state.get("report_patient") or {"id": st.session_state.get("analysis_patient_id", "")}
+    return ui_reports.build_report(
+        st.session_state.analysis_id,
+        result,
+        st.session_state.get("analysis_timestamp", ""),
+        patient,
+        flags=[medical_terms.get(flag, flag) for flag in result["result"]["flags"]],
+        thumbnail=analyzed_thumbnail(),
+    )
 
 # 환자 등록 함수
 def register_patient(patient_id, patient_name, birthdate):
@@ -72,18 +417,273 @@ def register_patient(patient_id, patient_name, birthdate):
         add_log("환자 등록 실패: 필수 정보 누락")
         return False
     add_log(f"사용자가 환자 등록: ID={patient_id}, 이름={patient_name}")
-    patient_data = {
-        "id": patient_id,
-        "name": patient_name,
-        "birthdate": birthdate,
-        "timestamp": datetime.now().isoformat()
-    }
-    if 'analysis_result' in st.session_state:
-        patient_data["analysis_result"] = st.session_state.analysis_result
-    st.session_state.patients.append(patient_data)
+    ui_store.register_patient(get_store(), patient_id, patient_name, birthdate,
+                              st.session_state.get("analysis_result"),
+                              analysis_id=st.session_state.get("analysis_id"),
+                              analyzed_at=st.session_state.get("analysis_timestamp"),
+                              thumbnail=analyzed_thumbnail())
+    if "analysis_result" in st.session_state:
+        st.session_state.report_patient = {"id": patient_id, "name": patient_name, "birthdate": birthdate}
     st.session_state.show_patient_form = False
     return True
 
+# 결과 저장 버튼 (보고서 바이트가 없으면 비활성화, 같은 실행에서 활성 버튼으로 바꿀 수 있도록 키를 구분)
+def show_report_download(slot, report_pdf):
+    slot.download_button(
+        label="📄 결과 저장 (PDF)",
+        key="report_download" if report_pdf else "report_download_pending",
+        data=report_pdf or b"",
+        file_name=f"AI_분석결과_{time.strftime('%Y%m%d')}.pdf",
+        mime="application/pdf",
+        use_container_width=False,
+        disabled=report_pdf is None,
+        # on_click=lambda: st.session_state.update({"download_success": True})
+    )
+
+def finish_report_download(slot, note, report):
+    """
+    화면을 모두 그린 뒤 보고서 생성이 끝나기를 기다려 결과 저장 버튼을 활성화
+    
+    대기 중에도 안내 문구를 갱신하므로, 사용자가 다른 위젯을 조작하면 기다리지 않고 바로 재실행됩니다.
+    """
+    try:
+        future = get_report_renderer().submit(report)
+        started = time.perf_counter()
+        while not future.done():
+            elapsed = time.perf_counter() - started
+            if elapsed > REPORT_WAIT_S:
+                note.caption("보고서를 생성하는 중입니다. 잠시 후 화면을 새로고침하세요.")
+                return
+            note.caption(f"PDF 보고서 생성 중... ({elapsed:.1f}초)")
+            time.sleep(0.1)
+        report_pdf = future.result()
+    except Exception as e:
+        add_log(f"보고서 생성 오류: {e}")
+        note.error("보고서를 생성하지 못했습니다.")
+        return
+    note.empty()
+    show_report_download(slot, report_pdf)
+
+# 등록 환자 전체 보고서를 작업 프로세스 풀에서 병렬 생성하여 ZIP 으로 보관
+def export_all_reports(store):
+    reports = [
+        ui_reports.build_report(
+            patient["analysis_id"] or patient["patient_id"],
+            {"model_type": patient["model_type"],
+             "result": {"abnormality_score": patient["abnormality_score"], "flags": patient["flags"]}},
+            patient["analyzed_at"] or patient["registered_at"].replace("T", " "),
+            {"id": patient["patient_id"], "name": patient["name"], "birthdate": patient["birthdate"]},
+            flags=[medical_terms.get(flag, flag) for flag in patient["flags"]],
+            thumbnail=patient["thumbnail"],
+        )
+        for patient in ui_store.iter_analyzed_patients(store)
+    ]
+    if not reports:
+        st.warning("분석 결과가 있는 등록 환자가 없습니다.")
+        return
+
+    started = time.perf_counter()
+    progress = st.progress(0.0)
+    files = {}
+    try:
+        futures = get_report_renderer().render_many(reports)
+        for count, (report, future) in enumerate(zip(reports, futures), 1):
+            filename = re.sub(r"[^\w.-]", "_", report["patient_id"])
+            files[f"AI_분석결과_{filename}.pdf"] = future.result()
+            progress.progress(count / len(reports), text=f"보고서 생성 중: {count}/{len(reports)}")
+    except Exception as e:
+        add_log(f"전체 환자 보고서 생성 오류: {e}")
+        st.error("보고서를 생성하지 못했습니다. 다시 시도해주세요.")
+        return
+    finally:
+        progress.empty()
+    st.session_state.bulk_reports = {
+        "data": ui_reports.build_zip(files),
+        "count": len(files),
+        "file_name": f"AI_분석결과_전체_{time.strftime('%Y%m%d_%H%M%S')}.zip",
+    }
+    add_log(f"전체 환자 보고서 생성: {len(files)}건 ({time.perf_counter() - started:.1f}초)")
+
+# 등록된 환자 목록 (검색어와 현재 페이지의 행만 조회)
+def show_patient_registry():
+    store = get_store()
+    total = ui_store.count_patients(store)
+    if not total:
+        return
+    st.subheader("👥 등록된 환자 목록")
+    search_col, page_col = st.columns([2, 1])
+    query = search_col.text_input("환자 검색 (ID 또는 이름)", key="patient_search", placeholder="예: PT-00 / 홍",
+                                  on_change=lambda: st.session_state.update(patient_page=1))
+    matches = ui_store.count_patients(store, query) if query.strip() else total
+    pages = max(1, -(-matches // ui_store.PAGE_SIZE))
+    if st.session_state.get("patient_page", 1) > pages:
+        st.session_state.patient_page = pages
+    page = page_col.number_input(f"페이지 (총 {pages:,})", min_value=1, max_value=pages, step=1, key="patient_page")
+
+    rows = ui_store.list_patients(store, query, page - 1)
+    patients_df = pd.DataFrame(
+        [{
+            "환자 ID": row["patient_id"],
+            "이름": row["name"],
+            "생년월일": row["birthdate"],
+            "등록 시각": row["registered_at"],
+            "비정상 점수": row["abnormality_score"],
+            "소견": ", ".join(medical_terms.get(flag, flag) for flag in row["flags"]),
+        } for row in rows],
+        columns=["환자 ID", "이름", "생년월일", "등록 시각", "비정상 점수", "소견"],
+    )
+    st.dataframe(patients_df, use_container_width=True, hide_index=True)
+    st.caption(f"전체 {total:,}명 중 {matches:,}명")
+
+    if st.button("📦 전체 환자 보고서 일괄 생성"):
+        export_all_reports(store)
+    if "bulk_reports" in st.session_state:
+        bulk = st.session_state.bulk_reports
+        st.download_button(
+            label=f"📥 보고서 ZIP 내려받기 ({bulk['count']:,}건)",
+            data=bulk["data"],
+            file_name=bulk["file_name"],
+            mime="application/zip",
+        )
+
+# 사용자 체감 지연 시간 패널 (링 버퍼의 최근 측정값 기준)
+def show_latency_panel():
+    telemetry = get_latency_telemetry()
+    samples = telemetry.snapshot()
+    head_col, button_col, toggle_col = st.columns([3, 1, 1])
+    head_col.subheader("⏱️ 분석 지연 시간 (사용자 체감)")
+    # 버튼을 누르면 재실행되므로 별도 처리 없이 최신 측정값을 다시 읽음
+    button_col.button("🔄 지금 새로고침", key="telemetry_refresh_now")
+    # 자동 새로고침은 정해진 횟수 후 꺼짐 (켜 둔 채 잊어도 계속 재실행하지 않음)
+    if st.session_state.get("telemetry_refreshes", 0) >= TELEMETRY_REFRESH_LIMIT:
+        st.session_state.telemetry_autorefresh = False
+        st.session_state.telemetry_refreshes = 0
+    toggle_col.toggle(
+        "자동 새로고침", key="telemetry_autorefresh",
+        on_change=lambda: st.session_state.update(telemetry_refreshes=0),
+        help=(f"{TELEMETRY_REFRESH_S:g}초마다 앱 전체를 다시 실행하여 최신 측정값을 표시합니다. 재실행할 때마다 "
+              "모든 탭을 다시 그리고 분석 이력/환자 목록을 다시 조회하므로, 보고 있는 탭과 관계없이 그만큼 "
+              f"부하가 생깁니다. {TELEMETRY_REFRESH_LIMIT}회({TELEMETRY_REFRESH_S * TELEMETRY_REFRESH_LIMIT:g}초) "
+              "새로고침 후 자동으로 꺼집니다."),
+    )
+    if not samples:
+        st.info("아직 측정된 분석 요청이 없습니다.")
+        return
+
+    summary = telemetry.summary(samples)
+    total, server = summary["total"], summary.get("server")
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("전체 p50", f"{total['p50']:,.0f} ms")
+    metric_cols[1].metric("전체 p95", f"{total['p95']:,.0f} ms")
+    metric_cols[2].metric("서버 처리 p50", f"{server['p50']:,.0f} ms" if server else "-")
+    # 사용자가 기다린 시간 중 서버 밖에서 쓴 비율 (중앙값 기준)
+    outside = 1 - server["p50"] / total["p50"] if server and total["p50"] else None
+    metric_cols[3].metric("서버 밖 비율 (p50)", f"{outside:.0%}" if outside is not None else "-")
+
+    stage_df = pd.DataFrame(
+        [{"단계": label, "건수": summary[stage]["count"],
+          **{f"p{pct}": round(summary[stage][f"p{pct}"], 1) for pct in ui_telemetry.PERCENTILES},
+          "최대": round(summary[stage]["max"], 1)}
+         for stage, label in TELEMETRY_STAGE_LABELS.items() if stage in summary]
+    )
+    st.dataframe(stage_df, use_container_width=True, hide_index=True)
+
+    recent_df = pd.DataFrame(samples[-200:])[["total_ms", "request_ms", "server_ms"]]
+    st.line_chart(recent_df.rename(columns={"total_ms": "전체", "request_ms": "HTTP 요청", "server_ms": "서버 처리"}))
+
+    st.markdown(f"**최근 느린 요청** (전체 {ui_telemetry.SLOW_REQUEST_MS:,.0f} ms 이상)")
+    slow = telemetry.slow_requests(samples=samples)
+    if slow:
+        st.dataframe(pd.DataFrame(
+            [{"시각": sample["at"], "파일": sample["filename"], "모드": sample["mode"],
+              "결과": "성공" if sample["ok"] else "실패",
+              **{TELEMETRY_STAGE_LABELS[stage]: round(sample[f"{stage}_ms"], 1)
+                 if sample[f"{stage}_ms"] is not None else None for stage in TELEMETRY_STAGE_LABELS}}
+             for sample in slow]
+        ), use_container_width=True, hide_index=True)
+    else:
+        st.caption("없음")
+    st.caption(f"최근 {len(samples):,}건 기준 (누적 {telemetry.recorded:,}건, 최대 {telemetry.samples.maxlen:,}건 보관)")
+
+# 분석 히스토리 (필터/정렬/페이지 나누기는 저장소에서 처리하고 현재 페이지의 행만 조회)
+def show_analysis_history():
+    store = get_store()
+    total = ui_store.count_analyses(store)
+    if not total:
+        st.info("아직 분석 이력이 없습니다. 이미지 분석 탭에서 판독을 요청하면 여기에 기록됩니다.")
+        return
+
+    filter_cols = st.columns(4)
+    patient_id = filter_cols[0].text_input("환자 ID", key="history_patient", placeholder="예: PT-00")
+    period = filter_cols[1].date_input("분석 기간", value=(), key="history_period")
+    status = filter_cols[2].selectbox("상태", list(HISTORY_STATUS), key="history_status")
+    min_score = filter_cols[3].number_input("최소 비정상 점수", min_value=0, max_value=100, step=5,
+                                            key="history_min_score")
+    filters = {
+        "patient_id": patient_id.strip() or None,
+        # 날짜 하나만 선택한 동안에는 그날 하루
+        "since": period[0].isoformat() if period else None,
+        "until": (period[-1] + timedelta(days=1)).isoformat() if period else None,
+        "status": HISTORY_STATUS[status],
+        "min_score": min_score or None,
+    }
+    sort_cols = st.columns([2, 1])
+    sort = HISTORY_SORTS[sort_cols[0].selectbox("정렬 기준", list(HISTORY_SORTS), key="history_sort")]
+    descending = sort_cols[1].toggle("내림차순", value=True, key="history_descending")
+
+    matches = ui_store.count_analyses(store, **filters)
+    pages = max(1, -(-matches // ui_store.PAGE_SIZE))
+    # 페이지 위치는 현재 페이지 경계 행의 커서로 기억 (필터/정렬이 바뀌면 첫 페이지)
+    view = (tuple(filters.items()), sort, descending)
+    nav = st.session_state.get("history_nav")
+    if nav is None or nav["view"] != view:
+        nav = st.session_state.history_nav = {"view": view, "page": 1, "request": {}, "first": None, "last": None}
+
+    def move(request, page):
+        st.session_state.history_nav.update(request=request, page=page)
+
+    page = min(nav["page"], pages)
+    rows = ui_store.query_analyses(store, sort=sort, descending=descending, **nav["request"], **filters)
+    if not rows and nav["request"]:
+        # 기억한 위치 뒤의 행이 없어졌으면 첫 페이지부터 다시 조회
+        nav.update(request={}, page=1)
+        page = 1
+        rows = ui_store.query_analyses(store, sort=sort, descending=descending, **filters)
+    if rows:
+        nav["first"] = ui_store.analysis_cursor(rows[0], sort)
+        nav["last"] = ui_store.analysis_cursor(rows[-1], sort)
+
+    # 버튼 인자에 이번 페이지의 커서가 들어가도록 조회 후에 이동 버튼을 그림
+    nav_cols = st.columns([1, 1, 2, 1, 1])
+    nav_cols[0].button("⏮ 처음", key="history_first_page", disabled=page <= 1, on_click=move, args=({}, 1),
+                       use_container_width=True)
+    nav_cols[1].button("◀ 이전", key="history_prev_page", disabled=page <= 1, on_click=move,
+                       args=({"before": nav["first"]}, page - 1), use_container_width=True)
+    nav_cols[3].button("다음 ▶", key="history_next_page", disabled=page >= pages, on_click=move,
+                       args=({"after": nav["last"]}, page + 1), use_container_width=True)
+    # 마지막 페이지는 남은 행 수만큼 뒤에서 조회하여 페이지 경계를 앞에서부터 센 것과 맞춤
+    nav_cols[4].button("마지막 ⏭", key="history_last_page", disabled=page >= pages, on_click=move,
+                       args=({"last": True, "page_size": matches - (pages - 1) * ui_store.PAGE_SIZE}, pages),
+                       use_container_width=True)
+    nav_cols[2].markdown(f"<div style='text-align: center'>페이지 {page:,} / {pages:,}</div>", unsafe_allow_html=True)
+
+    history_df = pd.DataFrame(
+        [{
+            "분석 시각": row["analyzed_at"].replace("T", " "),
+            "환자 ID": row["patient_id"],
+            "파일": row["filename"],
+            "모델": row["model_type"],
+            "상태": "성공" if row["status"] == ui_store.ANALYSIS_OK else "실패",
+            "비정상 점수": row["abnormality_score"],
+            "소견": (", ".join(medical_terms.get(flag, flag) for flag in row["flags"]) or "특이 소견 없음"
+                     if row["status"] == ui_store.ANALYSIS_OK else row["error"]),
+            "응답 시간(ms)": round(row["latency_ms"], 1) if row["latency_ms"] is not None else None,
+        } for row in rows],
+        columns=["분석 시각", "환자 ID", "파일", "모델", "상태", "비정상 점수", "소견", "응답 시간(ms)"],
+    )
+    st.dataframe(history_df, use_container_width=True, hide_index=True)
+    st.caption(f"전체 {total:,}건 중 {matches:,}건")
+
 
 # 페이지 기본 설정
 st.set_page_config(
@@ -106,7 +706,9 @@ medical_terms = {
 # 메인 제목
 st.markdown("<h1 style='text-align: center; color: #2C3E50;'>LunitCare AI 의료 영상 분석</h1>", unsafe_allow_html=True)
 
-# 탭 구성
+# 탭 구성 (생성 중인 보고서와 진행 중인 일괄 분석은 모든 탭을 그린 뒤 기다림)
+pending_report = None
+batch_pending = False
 tabs = st.tabs(["📊 이미지 분석", "📋 결과 히스토리", "ℹ️ 시스템 정보"])
 
 with tabs[0]:  # 📊 이미지 분석 탭
@@ -114,29 +716,52 @@ with tabs[0]:  # 📊 이미지 분석 탭
 
     with upload_col:
         st.subheader("🖼️ 이미지 업로드")
-        uploaded_file = st.file_uploader("JPG, JPEG, PNG, DICOM 업로드", type=["jpg", "jpeg", "png", "dcm", "dicom"])
-        
+        batch_mode = st.toggle("일괄 분석 모드 (여러 파일)", key="batch_mode")
+        st.text_input("환자 ID (선택)", key="analysis_patient_id", placeholder="분석 이력에 함께 기록됩니다")
+
+        if batch_mode:
+            batch_files = st.file_uploader("JPG, JPEG, PNG, DICOM 업로드", type=UPLOAD_TYPES,
+                                           accept_multiple_files=True, key="batch_uploader")
+            if batch_files and st.button(f"일괄 판독 요청 ({len(batch_files)}개)", use_container_width=True,
+                                         type="primary", disabled=batch_running()):
+                start_batch(batch_files)
+            uploaded_file = None
+        else:
+            uploaded_file = st.file_uploader("JPG, JPEG, PNG, DICOM 업로드", type=UPLOAD_TYPES)
+
         if uploaded_file is not None:
-            add_log(f"사용자가 이미지 파일 업로드: {uploaded_file.name}")
-            image = Image.open(uploaded_file)
-            st.image(image, caption="업로드된 이미지", use_container_width=True)
-
-            if st.button("AI 판독 요청", use_container_width=True, type="primary"):
-                with st.spinner("AI가 이미지를 분석 중입니다..."):
-                    uploaded_file.seek(0)
-                    file_bytes = uploaded_file.getvalue()
-                    success = analyze_image(file_bytes, uploaded_file.name)
-                    if success:
-                        st.success("AI 분석 완료!")
-                    else:
-                        st.error("분석 실패. 다시 시도해주세요.")
+            image_hash, is_new_upload = upload_content_hash(uploaded_file)
+            if is_new_upload:
+                add_log(f"사용자가 이미지 파일 업로드: {uploaded_file.name}")
+            show_preview(image_hash, uploaded_file, "업로드된 이미지")
+
+            if st.button("AI 판독 요청", use_container_width=True, type="primary",
+                         disabled="pending_analysis" in st.session_state):
+                uploaded_file.seek(0)
+                file_bytes = uploaded_file.getvalue()
+                analyze_image(file_bytes, uploaded_file.name, image_hash)
+
+        if "pending_analysis" in st.session_state:
+            success = wait_for_analysis()
+            if success:
+                st.success("AI 분석 완료!")
+            else:
+                st.error("분석 실패. 다시 시도해주세요.")
 
     with result_col:
-        if 'analysis_result' in st.session_state:
+        if batch_mode and "batch" in st.session_state:
+            st.subheader("📑 일괄 분석 결과")
+            batch_pending = not show_batch_results()
+
+        if not batch_mode and 'analysis_result' in st.session_state:
             result = st.session_state.analysis_result
             abnormality_score = result["result"]["abnormality_score"]
 
             with st.container(border=True):
+                if "analyzed_image_hash" in st.session_state:
+                    show_preview(st.session_state.analyzed_image_hash, io.BytesIO(st.session_state.analyzed_image),
+                                 "분석된 이미지")
+
                 st.subheader("🔍 발견된 소견")
                 if len(result["result"]["flags"]) > 0:
                     for flag in result["result"]["flags"]:
@@ -153,6 +778,8 @@ with tabs[0]:  # 📊 이미지 분석 탭
                 else:
                     st.error("🔴 면역치료 부적합")
 
+            # 렌더링 시간은 결과 카드까지만 측정 (아래 환자 등록/보고서 영역 제외)
+            record_latency_sample()
 
             st.divider()
 
@@ -175,10 +802,7 @@ with tabs[0]:  # 📊 이미지 분석 탭
                     else:
                         st.error("환자 ID와 이름은 필수 입력 항목입니다.")
 
-            if st.session_state.patients:
-                st.subheader("👥 등록된 환자 목록")
-                patients_df = pd.DataFrame(st.session_state.patients)
-                st.dataframe(patients_df, use_container_width=True)
+            show_patient_registry()
 
             st.divider()
 
@@ -194,59 +818,42 @@ with tabs[0]:  # 📊 이미지 분석 탭
 
             st.divider()
 
-            def generate_report_text():
-                result = st.session_state.analysis_result["result"]
-                abnormality_score = result["abnormality_score"]
-                flags = result["flags"]
-                flag_list = ", ".join(flags) if flags else "특이 소견 없음"
-                patient_id = st.session_state.get("patient_id", "N/A")
-                patient_name = st.session_state.get("patient_name", "N/A")
-                birthdate = st.session_state.get("patient_birthdate", "N/A")
-                evaluation = "면역치료 적합" if abnormality_score > 50 else "면역치료 부적합"
-
-                report_text = f"""
-                LunitCare AI 분석 결과 보고서
-                -----------------------------
-
-                🗓️ 분석 날짜: {time.strftime("%Y-%m-%d")}
-                👤 환자 ID: {patient_id}
-                👤 환자 이름: {patient_name}
-                📅 생년월일: {birthdate}
-
-                🔎 분석 결과
-                - 비정상 점수: {abnormality_score}%
-                - 발견된 소견: {flag_list}
-
-                🩺 치료 적합성 평가
-                - 결과: {evaluation}
-                """
-                return report_text.strip()
-
-            report_text = generate_report_text()
-            st.download_button(
-                label="📄 결과 저장 (PDF)",
-                data=report_text,
-                file_name=f"AI_분석결과_{time.strftime('%Y%m%d')}.txt",
-                mime="text/plain",
-                use_container_width=False,
-                # on_click=lambda: st.session_state.update({"download_success": True})
-            )
+            # 캐시된 보고서는 바로 내려받고, 생성 중이면 스크립트 끝(finish_report_download)에서 버튼을 채움
+            report = current_report()
+            report_pdf = get_report_renderer().cached(report)
+            report_slot, report_note = st.empty(), st.empty()
+            show_report_download(report_slot, report_pdf)
+            if report_pdf is None:
+                pending_report = (report_slot, report_note, report)
 
             # if st.session_state.get("download_success"):
             #     st.success("저장 완료!")
 
+    # 결과 카드를 그리지 않은 경우(분석 실패 등)는 분석 탭을 다 그린 시점에 기록
+    record_latency_sample()
+
 with tabs[1]:  # 📋 결과 히스토리 탭
-    st.subheader("분석 히스토리 (예시 데이터)")
-    data = {
-        "환자 ID": ["PT-1001", "PT-1002", "PT-1003", "PT-1004", "PT-1005"],
-        "검사 유형": ["X-Ray", "CT", "X-Ray", "MRI", "CT"],
-        "분석 날짜": ["2025-04-15", "2025-04-16", "2025-04-17", "2025-04-18", "2025-04-19"],
-        "비정상 점수": [75.3, 12.1, 92.7, 45.6, 8.3],
-        "진단": ["폐 결절", "정상", "폐렴 의심", "요추 디스크", "정상"]
-    }
-    df = pd.DataFrame(data)
-    st.dataframe(df, use_container_width=True)
+    st.subheader("분석 히스토리")
+    show_analysis_history()
 
 with tabs[2]:  # ℹ️ 시스템 정보 탭
     st.subheader("LunitCare AI 시스템 정보 (샘플)")
     st.info("버전: 1.3.0\n모델: Google ViT\n분석 엔진: HuggingFace Transformers 기반\n주요 기능: 의료 영상 AI 진단 보조")
+
+    st.divider()
+    show_latency_panel()
+
+# 생성 중인 PDF 보고서 (모든 요소를 그린 뒤 완료를 기다려 결과 저장 버튼을 채움)
+if pending_report is not None:
+    finish_report_download(*pending_report)
+
+# 진행 중인 일괄 분석 (모든 요소를 그린 뒤 잠시 기다렸다가 재실행하여 결과 표 갱신)
+if batch_pending:
+    time.sleep(BATCH_REFRESH_S)
+    st.rerun()
+
+# 시스템 정보 탭의 자동 새로고침 (모든 요소를 그린 뒤 대기 후 재실행, TELEMETRY_REFRESH_LIMIT 회까지)
+if st.session_state.get("telemetry_autorefresh"):
+    st.session_state.telemetry_refreshes = st.session_state.get("telemetry_refreshes", 0) + 1
+    time.sleep(TELEMETRY_REFRESH_S)
+    st.rerun()
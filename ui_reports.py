@@ -0,0 +1,249 @@
+"""
+LunitCare UI - 분석 결과 PDF 보고서 생성
+
+분석된 이미지 썸네일과 소견을 담은 PDF 보고서를 프로세스 풀에서 생성합니다. 보고서 렌더링은
+Streamlit 스크립트 실행과 분리되어 있어 화면 재실행 시에는 비용이 들지 않습니다.
+
+- 분석이 끝나면 보고서를 미리 제출(prefetch)하고, 결과는 분석 ID(+ 환자 정보) 기준으로 캐시하여
+  다운로드 버튼은 이미 만들어진 바이트를 그대로 사용합니다.
+- 등록된 환자 전체의 보고서는 프로세스 풀에서 병렬로 생성하여 ZIP 하나로 내려받습니다.
+
+한글은 reportlab 의 CID 글꼴(HYGothic-Medium)로 표시하며 글꼴 파일을 내장하지 않으므로, PDF 뷰어에
+한글 글꼴이 있어야 합니다. 작업 프로세스에서 호출되는 함수는 이 모듈의 최상위 함수여야 합니다.
+
+사용법 (ui_app.py 에서 호출):
+    renderer = ReportRenderer()
+    future = renderer.submit(report)          # report: build_report() 형식의 dict
+    pdf_bytes = future.result()
+    archive = build_zip({"PT-0001.pdf": pdf_bytes})
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+# 보고서 작업 프로세스 수 / 캐시할 보고서 수
+REPORT_WORKERS = int(os.getenv("UI_REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_CACHE_ENTRIES = int(os.getenv("UI_REPORT_CACHE_ENTRIES", "256"))
+
+KOREAN_FONT = "HYGothic-Medium"
+REPORT_TITLE = "LunitCare AI 분석 결과 보고서"
+DISCLAIMER = "본 보고서는 AI 판독 보조 결과이며, 최종 진단은 담당 전문의가 판단합니다."
+# 보고서에 넣는 썸네일 최대 크기(cm)
+THUMBNAIL_MAX_CM = 8.0
+
+# build_report() 가 만드는 보고서 항목 중 캐시 키에 포함할 항목
+_KEY_FIELDS = ("analysis_id", "patient_id", "patient_name", "birthdate")
+
+
+def build_report(analysis_id, analysis_result, analyzed_at, patient=None, flags=None, thumbnail=None):
+    """
+    PDF 렌더링 입력(작업 프로세스로 전달할 수 있는 dict) 생성
+
+    Args:
+        analysis_result (dict): /analyze 응답 ({"model_type", "result": {"abnormality_score", "flags"}})
+        patient (dict): {"id", "name", "birthdate"} (없으면 N/A)
+        flags (list): 표시용 소견 이름 (없으면 응답의 flags)
+        thumbnail (bytes): 분석된 이미지 썸네일 (JPEG/PNG)
+    """
+    patient = patient or {}
+    result = analysis_result.get("result", {})
+    score = result.get("abnormality_score", 0)
+    return {
+        "analysis_id": analysis_id,
+        "analyzed_at": analyzed_at,
+        "patient_id": patient.get("id") or "N/A",
+        "patient_name": patient.get("name") or "N/A",
+        "birthdate": patient.get("birthdate") or "N/A",
+        "model_type": analysis_result.get("model_type") or "N/A",
+        "abnormality_score": score,
+        "flags": list(flags if flags is not None else result.get("flags", [])),
+        "evaluation": "면역치료 적합" if score > 50 else "면역치료 부적합",
+        "thumbnail": thumbnail,
+    }
+
+
+def report_key(report):
+    """캐시 키 (분석 ID 와 보고서에 인쇄되는 환자 정보)"""
+    return tuple(report[field] for field in _KEY_FIELDS)
+
+
+def _register_font():
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+    if KOREAN_FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(KOREAN_FONT))
+
+
+def warm_up():
+    """작업 프로세스 초기화 (reportlab import 및 글꼴 등록을 첫 보고서 전에 미리 수행)"""
+    _register_font()
+    return os.getpid()
+
+
+def render_report_pdf(report):
+    """
+    보고서 하나를 PDF 로 렌더링 (작업 프로세스에서 실행)
+
+    Returns:
+        bytes: PDF 파일 내용
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    from xml.sax.saxutils import escape
+
+    _register_font()
+    title_style = ParagraphStyle("title", fontName=KOREAN_FONT, fontSize=18, leading=24, spaceAfter=12)
+    heading_style = ParagraphStyle("heading", fontName=KOREAN_FONT, fontSize=13, leading=18, spaceBefore=10, spaceAfter=6)
+    body_style = ParagraphStyle("body", fontName=KOREAN_FONT, fontSize=10.5, leading=15)
+    note_style = ParagraphStyle("note", parent=body_style, fontSize=8.5, textColor=colors.grey)
+
+    def cell(text):
+        return Paragraph(escape(str(text)), body_style)
+
+    story = [Paragraph(REPORT_TITLE, title_style)]
+    info = [
+        ("분석 ID", report["analysis_id"]),
+        ("분석 일시", report["analyzed_at"]),
+        ("환자 ID", report["patient_id"]),
+        ("환자 이름", report["patient_name"]),
+        ("생년월일", report["birthdate"]),
+        ("분석 모델", report["model_type"]),
+    ]
+    info_table = Table([[cell(label), cell(value)] for label, value in info], colWidths=[3.5 * cm, 12.5 * cm])
+    info_table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#f4f6f8")),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#c8ced6")),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+    story.append(info_table)
+
+    if report.get("thumbnail"):
+        try:
+            reader = ImageReader(io.BytesIO(report["thumbnail"]))
+            width, height = reader.getSize()
+            scale = THUMBNAIL_MAX_CM * cm / max(width, height)
+            story += [Paragraph("분석 이미지", heading_style),
+                      Image(io.BytesIO(report["thumbnail"]), width=width * scale, height=height * scale)]
+        except Exception:
+            # 썸네일을 읽을 수 없으면 이미지 없이 보고서 생성
+            pass
+
+    flags = report["flags"]
+    story += [
+        Paragraph("분석 결과", heading_style),
+        cell(f"비정상 점수: {report['abnormality_score']}%"),
+        cell(f"발견된 소견: {', '.join(flags) if flags else '특이 소견 없음'}"),
+        Paragraph("치료 적합성 평가", heading_style),
+        cell(report["evaluation"]),
+        Spacer(1, 1 * cm),
+        Paragraph(escape(DISCLAIMER), note_style),
+    ]
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, title=REPORT_TITLE, author="LunitCare",
+                            leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _make_executor(workers):
+    """
+    보고서 작업 풀 생성
+
+    Streamlit 은 스크립트를 __main__ 모듈로 실행하므로 spawn/forkserver 작업 프로세스는 시작할 때 대시보드
+    스크립트 전체를 다시 실행합니다. 따라서 fork 로 작업 프로세스를 만들고, fork 가 없는 플랫폼(Windows)
+    에서는 스레드로 대체합니다. 작업 프로세스는 렌더러 생성 시(warm_up 제출) 한 번에 만들어집니다.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lunitcare-report")
+
+
+class ReportRenderer:
+    """
+    PDF 보고서 작업 프로세스 풀과 렌더링 결과 캐시
+
+    submit() 은 같은 보고서(report_key)가 이미 제출되었으면 기존 Future 를 반환하므로, 완료된 Future 가
+    곧 캐시 항목입니다. 오래된 항목부터 max_entries 개까지만 보관합니다.
+
+    작업 프로세스가 비정상 종료되면 풀 전체가 더 이상 작업을 받지 않으므로(BrokenProcessPool), 다음 제출
+    시 풀을 새로 만들고 실패할 Future 들을 캐시에서 비웁니다.
+    """
+
+    def __init__(self, workers=REPORT_WORKERS, max_entries=REPORT_CACHE_ENTRIES):
+        self.workers = workers
+        self.max_entries = max_entries
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self._start_executor()
+
+    def _start_executor(self):
+        self.executor = _make_executor(self.workers)
+        for _ in range(self.workers):
+            self.executor.submit(warm_up)
+
+    def _submit(self, report):
+        """풀에 렌더링 제출 (잠금을 가진 상태에서 호출, 풀이 깨졌으면 새 풀로 한 번 다시 제출)"""
+        try:
+            return self.executor.submit(render_report_pdf, report)
+        except BrokenExecutor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self._futures.clear()
+            self._start_executor()
+            return self.executor.submit(render_report_pdf, report)
+
+    def submit(self, report):
+        """보고서 렌더링 제출 (캐시에 있으면 기존 Future 반환)"""
+        key = report_key(report)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not (future.done() and future.exception() is not None):
+                self._futures.move_to_end(key)
+                return future
+            future = self._submit(report)
+            self._futures[key] = future
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+            return future
+
+    def cached(self, report):
+        """이미 렌더링이 끝난 보고서 바이트 (없으면 None)"""
+        with self._lock:
+            future = self._futures.get(report_key(report))
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def render_many(self, reports):
+        """
+        여러 보고서를 병렬 렌더링 (일괄 생성은 단건 캐시를 밀어내지 않도록 캐시를 거치지 않음)
+
+        Returns:
+            list: 보고서 순서의 Future 목록
+        """
+        with self._lock:
+            return [self._submit(report) for report in reports]
+
+
+def build_zip(files):
+    """
+    {파일 이름: 바이트} 를 ZIP 하나로 묶음 (PDF 는 이미 압축되어 있으므로 무압축 저장)
+
+    Returns:
+        bytes: ZIP 파일 내용
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
@@ -0,0 +1,449 @@
+"""
+LunitCare UI - 로컬 환자 레지스트리 및 분석 이력 (SQLite)
+
+대시보드에서 등록한 환자와 마지막 분석 결과, 그리고 모든 분석 요청의 이력을 로컬 SQLite 데이터베이스에
+저장합니다. 세션 상태와 달리 새로고침/재시작 후에도 유지되며, 화면에는 현재 페이지의 행만 조회합니다.
+
+- 환자 ID 는 기본 키, 등록 시각/이름은 인덱스로 조회하므로 페이지 조회와 접두어 검색 시간은
+  전체 환자 수가 아니라 반환 행 수에 비례합니다.
+- 전체 환자/분석 수는 트리거가 유지하는 카운터 테이블에서 읽으므로 COUNT(*) 전체 스캔이 없습니다.
+- 분석 이력(analyses)은 추가 전용이며, AnalysisLog 의 백그라운드 스레드가 모아서 기록하므로
+  분석 요청 경로에서 디스크 쓰기를 기다리지 않습니다.
+
+사용법 (ui_app.py 에서 호출):
+    conn = connect()
+    register_patient(conn, "PT-0001", "홍길동", "1990-01-01", analysis_result)
+    rows = list_patients(conn, query="PT-00", page=0)
+
+    log = AnalysisLog()
+    log.append(analysis_record(outcome, filename="a.png", patient_id="PT-0001"))
+    rows = query_analyses(conn, status="ok", sort="abnormality_score")
+    next_rows = query_analyses(conn, status="ok", sort="abnormality_score",
+                               after=analysis_cursor(rows[-1], "abnormality_score"))
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.absolute()
+UI_DB = Path(os.getenv("UI_DB_PATH", str(PROJECT_ROOT / "data" / "lunitcare_ui.sqlite")))
+
+PAGE_SIZE = 20
+# 접두어 검색 상한 (범위 조건 col >= q AND col < q || PREFIX_END 로 인덱스 사용)
+PREFIX_END = "\U0010ffff"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    birthdate TEXT,
+    registered_at TEXT NOT NULL,
+    model_type TEXT,
+    abnormality_score REAL,
+    flags TEXT,
+    analysis_id TEXT,
+    analyzed_at TEXT,
+    thumbnail BLOB
+);
+
+CREATE INDEX IF NOT EXISTS idx_patients_registered
+    ON patients (registered_at, patient_id);
+
+CREATE INDEX IF NOT EXISTS idx_patients_name
+    ON patients (name);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO counters (name, value) VALUES ('patients', 0), ('analyses', 0);
+
+CREATE TRIGGER IF NOT EXISTS patients_count_insert AFTER INSERT ON patients
+BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'patients';
+END;
+
+CREATE TRIGGER IF NOT EXISTS patients_count_delete AFTER DELETE ON patients
+BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'patients';
+END;
+
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    analyzed_at TEXT NOT NULL,
+    patient_id TEXT,
+    filename TEXT,
+    model_type TEXT,
+    status TEXT NOT NULL,
+    abnormality_score REAL,
+    flags TEXT,
+    latency_ms REAL,
+    error TEXT
+);
+
+-- 기간 필터와 함께 쓰는 상태/점수 조건까지 인덱스만으로 판정 (테이블 조회 없이 COUNT)
+CREATE INDEX IF NOT EXISTS idx_analyses_analyzed
+    ON analyses (analyzed_at, status, abnormality_score);
+
+CREATE INDEX IF NOT EXISTS idx_analyses_patient
+    ON analyses (patient_id, analyzed_at);
+
+CREATE INDEX IF NOT EXISTS idx_analyses_status
+    ON analyses (status, analyzed_at);
+
+CREATE INDEX IF NOT EXISTS idx_analyses_score
+    ON analyses (abnormality_score);
+
+CREATE INDEX IF NOT EXISTS idx_analyses_latency
+    ON analyses (latency_ms);
+
+-- 상태 필터와 점수/응답 시간 정렬을 함께 쓸 때 정렬 순서대로 찾아 들어감 (키셋 페이지 나누기)
+CREATE INDEX IF NOT EXISTS idx_analyses_status_score
+    ON analyses (status, abnormality_score);
+
+CREATE INDEX IF NOT EXISTS idx_analyses_status_latency
+    ON analyses (status, latency_ms);
+
+CREATE TRIGGER IF NOT EXISTS analyses_append_only BEFORE UPDATE ON analyses
+BEGIN
+    SELECT RAISE(ABORT, 'analyses is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS analyses_count_insert AFTER INSERT ON analyses
+BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'analyses';
+END;
+
+CREATE TRIGGER IF NOT EXISTS analyses_count_delete AFTER DELETE ON analyses
+BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'analyses';
+END;
+"""
+
+# 이전 스키마의 patients 테이블에 추가할 컬럼 (보고서 생성용)
+_PATIENT_MIGRATIONS = {"analysis_id": "TEXT", "analyzed_at": "TEXT", "thumbnail": "BLOB"}
+
+# 목록 조회 컬럼 (최근 등록 순, 썸네일은 보고서 생성 시에만 조회)
+_PATIENT_COLUMNS = "patient_id, name, birthdate, registered_at, model_type, abnormality_score, flags"
+_REPORT_COLUMNS = f"{_PATIENT_COLUMNS}, analysis_id, analyzed_at, thumbnail"
+
+
+def connect(db_path=UI_DB):
+    """
+    레지스트리 데이터베이스 연결 (없으면 스키마 생성)
+
+    Streamlit 은 재실행마다 다른 스레드에서 스크립트를 실행하므로 check_same_thread 를 끄고,
+    같은 연결을 동시에 사용하지 않는 것은 호출자(세션당 연결 하나)가 보장합니다.
+    """
+    Path(db_path).parent.mkdir(exist_ok=True, parents=True)
+    conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=5.0)
+    conn.row_factory = sqlite3.Row
+    # 읽기와 쓰기가 서로 막지 않도록 WAL 사용
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(patients)")}
+    for column, column_type in _PATIENT_MIGRATIONS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE patients ADD COLUMN {column} {column_type}")
+    return conn
+
+
+def register_patient(conn, patient_id, name, birthdate="", analysis_result=None, registered_at=None,
+                     analysis_id=None, analyzed_at=None, thumbnail=None):
+    """
+    환자 등록 (같은 ID 가 있으면 이름/생년월일/분석 결과를 갱신)
+
+    Args:
+        analysis_result (dict): /analyze 응답 (없으면 기존 분석 결과 유지)
+        analysis_id, analyzed_at, thumbnail: 보고서에 넣을 분석 ID/시각/이미지 썸네일
+    """
+    registered_at = registered_at or datetime.now().isoformat(timespec="seconds")
+    model_type = score = flags = None
+    if analysis_result:
+        result = analysis_result.get("result", {})
+        model_type = analysis_result.get("model_type")
+        score = result.get("abnormality_score")
+        flags = json.dumps(result.get("flags", []), ensure_ascii=False)
+    with conn:
+        conn.execute(
+            f"INSERT INTO patients ({_REPORT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (patient_id) DO UPDATE SET name = excluded.name, birthdate = excluded.birthdate, "
+            "model_type = COALESCE(excluded.model_type, model_type), "
+            "abnormality_score = COALESCE(excluded.abnormality_score, abnormality_score), "
+            "flags = COALESCE(excluded.flags, flags), "
+            "analysis_id = COALESCE(excluded.analysis_id, analysis_id), "
+            "analyzed_at = COALESCE(excluded.analyzed_at, analyzed_at), "
+            "thumbnail = COALESCE(excluded.thumbnail, thumbnail)",
+            (patient_id, name, birthdate, registered_at, model_type, score, flags, analysis_id, analyzed_at,
+             thumbnail),
+        )
+
+
+def _search_clause(query):
+    """ID 또는 이름 접두어 검색 조건 (두 인덱스 범위 조회의 합집합)"""
+    query = (query or "").strip()
+    if not query:
+        return "", ()
+    upper = query + PREFIX_END
+    return ("WHERE (patient_id >= ? AND patient_id < ?) OR (name >= ? AND name < ?)",
+            (query, upper, query, upper))
+
+
+def _counter(conn, name):
+    row = conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+    return row["value"] if row else 0
+
+
+def count_patients(conn, query=None):
+    """전체 환자 수(카운터 테이블) 또는 검색 결과 수"""
+    where, params = _search_clause(query)
+    if not where:
+        return _counter(conn, "patients")
+    return conn.execute(f"SELECT COUNT(*) FROM patients {where}", params).fetchone()[0]
+
+
+def list_patients(conn, query=None, page=0, page_size=PAGE_SIZE):
+    """
+    최근 등록 순으로 한 페이지의 환자 조회
+
+    Returns:
+        list: {"patient_id", "name", "birthdate", "registered_at", "model_type", "abnormality_score", "flags"} 목록
+    """
+    where, params = _search_clause(query)
+    rows = conn.execute(
+        f"SELECT {_PATIENT_COLUMNS} FROM patients {where} "
+        "ORDER BY registered_at DESC, patient_id DESC LIMIT ? OFFSET ?",
+        (*params, page_size, page * page_size),
+    ).fetchall()
+    patients = []
+    for row in rows:
+        patient = dict(row)
+        patient["flags"] = json.loads(patient["flags"]) if patient["flags"] else []
+        patients.append(patient)
+    return patients
+
+
+def iter_analyzed_patients(conn):
+    """
+    분석 결과가 있는 등록 환자를 최근 등록 순으로 반환 (보고서 일괄 생성용, 썸네일 포함)
+
+    Yields:
+        dict: list_patients() 항목 + {"analysis_id", "analyzed_at", "thumbnail"}
+    """
+    rows = conn.execute(
+        f"SELECT {_REPORT_COLUMNS} FROM patients WHERE abnormality_score IS NOT NULL "
+        "ORDER BY registered_at DESC, patient_id DESC"
+    )
+    for row in rows:
+        patient = dict(row)
+        patient["flags"] = json.loads(patient["flags"]) if patient["flags"] else []
+        yield patient
+
+
+# 분석 이력 조회 컬럼 / 정렬 가능 컬럼 (모두 인덱스가 있어 정렬 시 전체 정렬 없음)
+_ANALYSIS_COLUMNS = ("analyzed_at, patient_id, filename, model_type, status, abnormality_score, flags, "
+                     "latency_ms, error")
+ANALYSIS_SORTS = ("analyzed_at", "abnormality_score", "latency_ms")
+# 분석 상태
+ANALYSIS_OK = "ok"
+ANALYSIS_ERROR = "error"
+
+# 백그라운드 기록 대기열 크기 / 한 트랜잭션에 모아 쓰는 최대 건수
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 500
+
+
+def analysis_record(outcome, filename=None, patient_id=None, analyzed_at=None):
+    """
+    분석 요청 결과(ui_app.request_analysis 반환값)를 이력 행으로 변환
+
+    Returns:
+        tuple: analyses 테이블 컬럼 순서의 값
+    """
+    analyzed_at = analyzed_at or datetime.now().isoformat(timespec="milliseconds")
+    model_type = score = flags = error = None
+    if outcome.get("ok"):
+        response = outcome["result"]
+        result = response.get("result", {})
+        status = ANALYSIS_OK
+        model_type = response.get("model_type")
+        score = result.get("abnormality_score")
+        flags = json.dumps(result.get("flags", []), ensure_ascii=False)
+    else:
+        status = ANALYSIS_ERROR
+        error = outcome.get("error")
+    return (analyzed_at, patient_id or None, filename, model_type, status, score, flags,
+            outcome.get("elapsed_ms"), error)
+
+
+class AnalysisLog:
+    """
+    분석 이력을 백그라운드 스레드에서 모아 기록하는 추가 전용 로그
+
+    append() 는 대기열에 넣고 바로 반환하며(가득 차면 버리고 dropped 증가), 기록 스레드는 자체 연결로
+    쌓인 행을 한 트랜잭션에 모아 씁니다.
+    """
+
+    def __init__(self, db_path=UI_DB, batch_size=LOG_BATCH_SIZE, queue_size=LOG_QUEUE_SIZE):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="analysis-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        """analysis_record() 로 만든 행을 기록 대기열에 추가 (차단하지 않음)"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """대기열의 행이 모두 기록될 때까지 대기"""
+        self.queue.join()
+
+    def _run(self):
+        conn = connect(self.db_path)
+        while True:
+            records = [self.queue.get()]
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(
+                        f"INSERT INTO analyses ({_ANALYSIS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records
+                    )
+            except sqlite3.Error:
+                self.dropped += len(records)
+            finally:
+                for _ in records:
+                    self.queue.task_done()
+
+
+def _analysis_filters(patient_id=None, since=None, until=None, status=None, min_score=None):
+    """
+    분석 이력 필터 조건
+
+    Args:
+        patient_id (str): 환자 ID 접두어
+        since, until (str): 분석 시각 범위 (ISO 형식, until 은 미포함)
+        status (str): ok / error
+        min_score (float): 최소 비정상 점수
+    """
+    clauses, params = [], []
+    if patient_id:
+        clauses.append("patient_id >= ? AND patient_id < ?")
+        params += [patient_id, patient_id + PREFIX_END]
+    if since:
+        clauses.append("analyzed_at >= ?")
+        params.append(since)
+    if until:
+        clauses.append("analyzed_at < ?")
+        params.append(until)
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if min_score is not None:
+        clauses.append("abnormality_score >= ?")
+        params.append(min_score)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def count_analyses(conn, **filters):
+    """전체 분석 수(카운터 테이블) 또는 필터 결과 수"""
+    where, params = _analysis_filters(**filters)
+    if not where:
+        return _counter(conn, "analyses")
+    return conn.execute(f"SELECT COUNT(*) FROM analyses {where}", params).fetchone()[0]
+
+
+def analysis_cursor(row, sort="analyzed_at"):
+    """query_analyses() 로 조회한 행의 페이지 이동 커서 (정렬 값, id)"""
+    return row[sort], row["id"]
+
+
+def _seek_analyses(conn, sort, ascending, cursor, limit, where, params):
+    """
+    정렬 순서대로 커서 다음 행부터 limit 개 조회 (OFFSET 없이 인덱스에서 바로 찾아 들어감)
+
+    정렬 값이 NULL 인 행(실패한 분석의 점수/응답 시간)은 오름차순에서 맨 앞, 내림차순에서 맨 뒤에
+    오므로, NULL 구간과 값 구간을 따로 조회하여 두 구간 모두 (정렬 컬럼, id) 인덱스 순서를 그대로 씁니다.
+    """
+    op, order = (">", "ASC") if ascending else ("<", "DESC")
+    segments = [("null", f"{sort} IS NULL", f"id {order}"),
+                ("value", f"{sort} IS NOT NULL", f"{sort} {order}, id {order}")]
+    if not ascending:
+        segments.reverse()
+    if cursor is not None:
+        # 커서가 있는 구간 앞의 구간은 이미 지나온 행
+        cursor_segment = "null" if cursor[0] is None else "value"
+        while segments[0][0] != cursor_segment:
+            segments.pop(0)
+
+    rows = []
+    for index, (name, condition, order_by) in enumerate(segments):
+        clauses, seek_params = [condition], []
+        if cursor is not None and index == 0:
+            if name == "null":
+                clauses.append(f"id {op} ?")
+                seek_params.append(cursor[1])
+            else:
+                clauses.append(f"({sort}, id) {op} (?, ?)")
+                seek_params += list(cursor)
+        seek = " AND ".join(clauses)
+        rows += conn.execute(
+            f"SELECT id, {_ANALYSIS_COLUMNS} FROM analyses "
+            f"{f'{where} AND {seek}' if where else f'WHERE {seek}'} ORDER BY {order_by} LIMIT ?",
+            (*params, *seek_params, limit - len(rows)),
+        ).fetchall()
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+def query_analyses(conn, sort="analyzed_at", descending=True, page_size=PAGE_SIZE, after=None, before=None,
+                   last=False, **filters):
+    """
+    필터/정렬된 분석 이력 중 한 페이지만 조회 (키셋 페이지 나누기)
+
+    페이지 위치를 OFFSET 이 아니라 이전 페이지 경계 행의 커서로 지정하므로, 조회 시간이 페이지 깊이와
+    무관하게 반환 행 수에 비례합니다. 커서가 없으면 첫 페이지입니다.
+
+    Args:
+        sort (str): ANALYSIS_SORTS 중 하나
+        after (tuple): 이전 페이지 마지막 행의 analysis_cursor() (다음 페이지 조회)
+        before (tuple): 다음 페이지 첫 행의 analysis_cursor() (이전 페이지 조회)
+        last (bool): 마지막 page_size 개 행 조회 (마지막 페이지)
+        filters: _analysis_filters() 인자
+
+    Returns:
+        list: {"id", "analyzed_at", "patient_id", "filename", "model_type", "status", "abnormality_score",
+               "flags", "latency_ms", "error"} 목록 (정렬 순서)
+    """
+    if sort not in ANALYSIS_SORTS:
+        raise ValueError(f"정렬할 수 없는 컬럼입니다: {sort}")
+    where, params = _analysis_filters(**filters)
+    # 이전/마지막 페이지는 반대 방향으로 찾은 뒤 뒤집음
+    backward = before is not None or last
+    rows = _seek_analyses(conn, sort, descending == backward, before if backward else after, page_size,
+                          where, params)
+    if backward:
+        rows.reverse()
+    analyses = []
+    for row in rows:
+        analysis = dict(row)
+        analysis["flags"] = json.loads(analysis["flags"]) if analysis["flags"] else []
+        analyses.append(analysis)
+    return analyses
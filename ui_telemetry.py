@@ -0,0 +1,129 @@
+"""
+LunitCare UI - 사용자 체감 분석 지연 시간 측정
+
+대시보드에서 판독 요청 한 건이 화면에 결과로 표시되기까지의 시간을 단계별로 나누어 최근 N건을
+고정 크기 링 버퍼(deque)에 보관합니다. 서버 측 지표(processing_time_ms, Server-Timing)와 같은
+요청의 클라이언트 측 시간을 나란히 두어, 서버 밖(대기열, 네트워크, 화면 렌더링)에서 쓰는 시간을
+확인할 수 있습니다.
+
+단계:
+    queue    제출 -> 작업 스레드에서 요청 시작 (스레드 풀 대기)
+    request  HTTP 요청 전체 (클라이언트 측 측정)
+    server   서버 처리 시간 (응답의 processing_time_ms)
+    network  request - server (전송, 직렬화, 프레임워크 오버헤드)
+    render   결과 수신 -> 결과 카드 렌더링 완료 (Streamlit 스크립트 실행 구간)
+    total    제출 -> 결과 표시 (일괄 분석은 렌더링 없이 응답 수신까지)
+
+사용법 (ui_app.py 에서 호출):
+    telemetry = LatencyTelemetry()
+    sample = make_sample(outcome, "a.png", submitted)
+    telemetry.record(sample, rendered_from=render_started)
+    summary = telemetry.summary()
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# 보관할 최근 측정 건수 / 느린 요청 기준(ms)
+TELEMETRY_SAMPLES = int(os.getenv("UI_TELEMETRY_SAMPLES", "1000"))
+SLOW_REQUEST_MS = float(os.getenv("UI_SLOW_REQUEST_MS", "2000"))
+
+STAGES = ("queue", "request", "server", "network", "render", "total")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, pct):
+    """선형 보간 방식의 백분위수 계산 (api_tests/perf/results.py 와 같은 방식)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return float(ordered[low])
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def make_sample(outcome, filename, submitted, mode="single"):
+    """
+    분석 요청 결과(ui_app.request_analysis 반환값)로 측정 샘플 생성
+
+    Args:
+        submitted (float): 제출 시각 (time.perf_counter)
+        mode (str): single / batch
+    """
+    request_ms = outcome.get("elapsed_ms")
+    server_ms = outcome["result"].get("processing_time_ms") if outcome.get("ok") else None
+    started = outcome.get("started")
+    return {
+        "at": datetime.now().strftime("%H:%M:%S"),
+        "filename": filename,
+        "mode": mode,
+        "ok": bool(outcome.get("ok")),
+        "submitted": submitted,
+        "queue_ms": (started - submitted) * 1000 if started is not None else None,
+        "request_ms": request_ms,
+        "server_ms": server_ms,
+        "network_ms": request_ms - server_ms if request_ms is not None and server_ms is not None else None,
+        "render_ms": None,
+        "total_ms": None,
+    }
+
+
+class LatencyTelemetry:
+    """최근 측정 샘플의 링 버퍼 (여러 세션/작업 스레드에서 함께 기록)"""
+
+    def __init__(self, maxlen=TELEMETRY_SAMPLES):
+        self.samples = deque(maxlen=maxlen)
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def record(self, sample, rendered_from=None):
+        """
+        샘플의 렌더링/전체 시간을 확정하여 버퍼에 추가 (가득 차면 가장 오래된 샘플이 밀려남)
+
+        Args:
+            rendered_from (float): 결과 수신 시각 (time.perf_counter, 없으면 렌더링 미측정)
+        """
+        now = time.perf_counter()
+        sample = dict(sample)
+        if rendered_from is not None:
+            sample["render_ms"] = (now - rendered_from) * 1000
+        sample["total_ms"] = (now - sample.pop("submitted")) * 1000
+        with self._lock:
+            self.samples.append(sample)
+            self.recorded += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.samples)
+
+    def summary(self, samples=None):
+        """
+        단계별 백분위수
+
+        Returns:
+            dict: {단계: {"count", "p50", "p90", "p95", "p99", "max"}} (측정값이 없는 단계는 제외)
+        """
+        samples = self.snapshot() if samples is None else samples
+        summary = {}
+        for stage in STAGES:
+            values = [sample[f"{stage}_ms"] for sample in samples if sample[f"{stage}_ms"] is not None]
+            if not values:
+                continue
+            stats = {"count": len(values), "max": max(values)}
+            for pct in PERCENTILES:
+                stats[f"p{pct}"] = percentile(values, pct)
+            summary[stage] = stats
+        return summary
+
+    def slow_requests(self, threshold_ms=SLOW_REQUEST_MS, limit=10, samples=None):
+        """전체 시간이 기준을 넘은 최근 요청 (최신순)"""
+        samples = self.snapshot() if samples is None else samples
+        slow = [sample for sample in samples if sample["total_ms"] >= threshold_ms]
+        return slow[::-1][:limit]